@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+
+from fetcher import CONGESTION_STATUSES, RETRY_STATUSES, backoff_delay
+from planner import ListCursor
+from title_cache import MISSING_SYNOPSIS
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for engine='async'
+    aiohttp = None
+
+
+class AsyncFetchEngine:
+    """asyncio/aiohttp engine running ContentRecommender's search and detail fetches concurrently.
+
+    In-flight limits come from the connector; rate limiting and retries follow recommender.fetcher.
+    One event loop (on its own thread) and one keep-alive session serve every search, from any
+    thread. Fetches share the recommender's batch memo, response cache and stale-while-revalidate
+    with the threaded engine; SQLite cache access runs in worker threads, off the loop.
+    """
+
+    def __init__(self, recommender, max_concurrency=20, per_host=8):
+        if aiohttp is None:
+            raise ImportError("The async engine requires aiohttp: pip install aiohttp")
+        self.recommender = recommender
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def search(self, plan, limit, user=None):
+        """Run the two-phase search for a SearchPlan (see planner.py) and return the top `limit` result dicts"""
+        return asyncio.run_coroutine_threadsafe(self._search(plan, limit, user), self._running_loop()).result()
+
+    def _running_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='async-engine', daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _client(self):
+        """The engine's session, created on first use; only ever called on the engine's loop"""
+        if self._session is None:
+            # The connector enforces both the global and the per-host in-flight limits
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host)
+            self._session = aiohttp.ClientSession(headers=self.recommender.headers, connector=connector)
+        return self._session
+
+    def close(self):
+        """Close the session, stop the loop and close it"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+
+        async def close_session():
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+        asyncio.run_coroutine_threadsafe(close_session(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    async def _search(self, plan, limit, user=None):
+        rec = self.recommender
+        session = self._client()
+        # Phase 1: all search pages at once (the combined one later if the planner may derive it)
+        with rec.metrics.span('search_pages'):
+            # Checking the cache, ranking (personal history) and indexing touch SQLite: off the loop
+            defer = await asyncio.to_thread(rec.planner.should_defer, plan)
+            page_items = rec._page_items(limit, user)
+            searches = [(url, None if defer else page_items, genres) for url, _, genres in plan.per_genre]
+            if plan.combined and not defer:
+                searches.append((plan.combined[0], page_items, plan.combined[2]))
+            first_pages = await asyncio.gather(*(self._scrape_search_page(session, url, max_items)
+                                                 for url, max_items, _ in searches))
+            fetched = [(url, page, genres) for (url, _, genres), page in zip(searches, first_pages)]
+
+            issued, derived, pages = len(searches), False, []
+            if defer:
+                combined = rec.planner.derive(plan, first_pages, page_items)
+                derived = combined is not None
+                if derived:
+                    pages.append((combined, plan.combined[2]))
+                else:
+                    issued += 1
+                    combined = await self._scrape_search_page(session, plan.combined[0], page_items)
+                    fetched.append((plan.combined[0], combined, plan.combined[2]))
+
+            # Further result pages only while the lists read so far cannot fill the ranking pool
+            cursors = [ListCursor(url, genres, page_items, page) for url, page, genres in fetched]
+            candidates = rec._merge_candidates([(c.items, c.genres) for c in cursors] + pages)
+            more = rec._lists_to_extend(cursors, candidates, limit, user)
+            while more:
+                next_pages = await asyncio.gather(*(self._scrape_search_page(session, cursor.next_url(), None)
+                                                    for cursor in more))
+                for cursor, page in zip(more, next_pages):
+                    cursor.add(page)
+                issued += len(more)
+                candidates = rec._merge_candidates([(c.items, c.genres) for c in cursors] + pages)
+                more = rec._lists_to_extend(cursors, candidates, limit, user)
+            rec.planner.record(plan, issued, derived)
+        with rec.metrics.span('rank'):
+            top_results = await asyncio.to_thread(rec._select_top, candidates, limit, user)
+
+        # Phase 2: detail pages for the survivors only
+        with rec.metrics.span('details'):
+            synopses = await asyncio.gather(*(self._get_synopsis(session, item['link']) for item in top_results))
+            for item, synopsis in zip(top_results, synopses):
+                item['synopsis'] = synopsis
+
+        await asyncio.to_thread(rec._index_similarity, top_results)
+        return top_results
+
+    async def _fetch(self, session, url, kind, timeout):
+        """Async counterpart of ContentRecommender._fetch: concurrent fetches of a URL share one download"""
+        memo = self.recommender.fetch_memo
+        if memo is None:
+            return await self._fetch_cached(session, url, kind, timeout)
+        body, future, owner = memo.claim(url)
+        if future is None:
+            return body
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            body = await self._fetch_cached(session, url, kind, timeout)
+        except BaseException as e:
+            memo.settle(url, future, error=e)
+            raise
+        memo.settle(url, future, body)
+        return body
+
+    async def _fetch_cached(self, session, url, kind, timeout):
+        """Async counterpart of ContentRecommender._fetch_cached, sharing the same response cache"""
+        rec = self.recommender
+        body, cached = await asyncio.to_thread(rec._cached_response, url, kind, timeout)
+        if body is not None:
+            return body
+
+        headers = cached.conditional_headers() if cached else {}
+        rec._count_upstream(kind)
+        start = time.perf_counter()
+        response, body = await self._get(session, url, kind, headers, timeout)
+        rec.metrics.request(kind, time.perf_counter() - start, len(body), response.status)
+        return await asyncio.to_thread(rec._store_response, url, kind, cached, response.status, body, response.headers)
+
+    async def _get(self, session, url, kind, headers, timeout):
+        """GET honouring the fetcher's per-host rate limit and retry policy; returns (response, body)"""
+        fetcher = self.recommender.fetcher
+        bucket = fetcher.bucket(url)
+        for attempt in range(fetcher.retries + 1):
+            if bucket:
+                wait = bucket.reserve()
+                if wait:
+                    await asyncio.sleep(wait)
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == fetcher.retries:
+                    raise
+                fetcher.metrics.retry(kind, type(e).__name__)
+                await asyncio.sleep(backoff_delay(attempt + 1))
+                continue
+
+            if response.status not in RETRY_STATUSES or attempt == fetcher.retries:
+                return response, body
+            fetcher.metrics.retry(kind, str(response.status))
+            retry_after = response.headers.get('Retry-After') if response.status in CONGESTION_STATUSES else None
+            await asyncio.sleep(backoff_delay(attempt + 1, retry_after=retry_after))
+
+    async def _scrape_search_page(self, session, url, max_items=10):
+        try:
+            body = await self._fetch(session, url, 'search', timeout=10)
+            # Parsing also writes the title cache
+            return await asyncio.to_thread(self.recommender._parse_search_page, body, max_items)
+        except Exception as e:
+            self.recommender.metrics.error('search_page', e)
+            self.recommender._warn(f"Error scraping {url}: {str(e)}")
+            return []
+
+    async def _get_synopsis(self, session, url):
+        cached = await asyncio.to_thread(self.recommender._cached_synopsis, url)
+        if cached:
+            return cached
+
+        try:
+            body = await self._fetch(session, url, 'detail', timeout=5)
+            return await asyncio.to_thread(self.recommender._parse_synopsis, body, url)
+        except Exception as e:
+            self.recommender.metrics.error('detail_page', e)
+            return MISSING_SYNOPSIS
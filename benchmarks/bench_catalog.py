@@ -0,0 +1,75 @@
+"""Build/load/query timings of the offline catalog, from the sample TSVs or scaled up to millions of rows.
+
+    python benchmarks/bench_catalog.py --scale 5000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from catalog import COLUMNS, OfflineCatalog  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+QUERIES = [
+    (['action'], 'M'),
+    (['drama', 'romance'], 'B'),
+    (['crime', 'thriller', 'mystery'], 'S'),
+    (['sci-fi', 'film noir'], 'M'),
+]
+
+
+def scaled(catalog, rows):
+    """Tile the sample catalog up to `rows` titles, jittering ratings and votes so top-k is not trivial"""
+    rng = np.random.default_rng(0)
+    columns = {name: np.resize(getattr(catalog, name), rows) for name in COLUMNS if name != 'title_offsets'}
+    columns['title_offsets'] = catalog.title_offsets
+    columns['tconst'] = np.arange(1, rows + 1, dtype=np.uint32)
+    columns['rating'] = np.clip(columns['rating'] + rng.normal(0, 0.3, rows), 1, 10).round(1).astype(np.float32)
+    columns['votes'] = (columns['votes'] * rng.uniform(0.5, 2, rows)).astype(np.uint32)
+    return OfflineCatalog(columns, catalog.titles_blob, dict(catalog.meta, titles=rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--basics', default=os.path.join(FIXTURES_DIR, 'title.basics.sample.tsv.gz'))
+    parser.add_argument('--ratings', default=os.path.join(FIXTURES_DIR, 'title.ratings.sample.tsv.gz'))
+    parser.add_argument('--scale', type=int, default=0, help='tile the catalog up to this many titles')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = OfflineCatalog.build(args.basics, args.ratings)
+    print(f"build: {len(catalog)} titles in {(time.perf_counter() - start) * 1000:.1f} ms")
+    if args.scale:
+        catalog = scaled(catalog, args.scale)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        catalog.save(directory)
+        print(f"save:  {len(catalog)} titles in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        catalog = OfflineCatalog.load(directory)
+        print(f"load:  {(time.perf_counter() - start) * 1000:.2f} ms (memory-mapped)")
+
+        for genres, content_type in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = catalog.search(genres, content_type)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            top = results[0]['title'] if results else '-'
+            print(f"query {','.join(genres):>25}/{content_type}: p50 {timings[len(timings) // 2] * 1000:7.2f} ms  "
+                  f"max {timings[-1] * 1000:7.2f} ms  top: {top}")
+        del catalog
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Compare the threaded and async fetch engines against the local stand-in IMDb server.
+
+    python benchmarks/bench_engines.py --latency 0.1 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from movie_recommendation_3 import ContentRecommender  # noqa: E402
+from standin_server import start_server  # noqa: E402
+
+QUERIES = [
+    (['action', 'drama', 'crime'], 'M'),
+    (['comedy'], 'S'),
+    (['sci-fi', 'thriller'], 'B'),
+    (['western', 'history', 'romance'], 'M'),
+]
+
+
+def run_engine(engine, server, repeat):
+    recommender = ContentRecommender(base_url=server.base_url, cache_path=None, engine=engine)
+    timings = []
+    try:
+        for _ in range(repeat):
+            for genres, content_type in QUERIES:
+                plan = recommender.planner.plan(genres, content_type)
+                start = time.perf_counter()
+                if engine == 'async':
+                    results = recommender.async_engine.search(plan, recommender.top_n)
+                else:
+                    results = recommender._search_threaded(plan, recommender.top_n)
+                timings.append(time.perf_counter() - start)
+                assert results, f"no results for {genres}/{content_type}"
+    finally:
+        recommender.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.1, help='injected upstream latency in seconds')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--engines', default='threads,async')
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency)
+    print(f"Stand-in server on {server.base_url}, latency {args.latency * 1000:.0f} ms")
+    for engine in args.engines.split(','):
+        server.requests.clear()
+        timings = sorted(run_engine(engine, server, args.repeat))
+        mean = sum(timings) / len(timings)
+        requests_per_query = sum(server.requests.values()) / len(timings)
+        print(f"{engine:>8}: mean {mean * 1000:7.1f} ms  p50 {timings[len(timings) // 2] * 1000:7.1f} ms  "
+              f"max {timings[-1] * 1000:7.1f} ms  {requests_per_query:.1f} requests/query")
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
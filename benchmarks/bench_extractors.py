@@ -0,0 +1,53 @@
+"""Pages-per-second micro-benchmark of every installed extractor backend on the saved fixture pages.
+
+    python benchmarks/bench_extractors.py --seconds 2
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors import available_extractors, get_extractor  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+
+def load_pages(kind):
+    pattern = 'search_*.html' if kind == 'search' else 'title_*.html'
+    pages = []
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, pattern))):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+def pages_per_second(parse, pages, seconds):
+    parsed = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for page in pages:
+            assert parse(page), "backend returned nothing for a fixture page"
+        parsed += len(pages)
+    return parsed / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help='time budget per backend and page kind')
+    args = parser.parse_args()
+
+    search_pages, detail_pages = load_pages('search'), load_pages('detail')
+    print(f"{len(search_pages)} search pages, {len(detail_pages)} detail pages from {PAGES_DIR}")
+    print(f"{'backend':>12} {'search pages/s':>15} {'detail pages/s':>15}")
+    for name in available_extractors() + ['auto']:
+        extractor = get_extractor(name)
+        search_rate = pages_per_second(extractor.parse_search, search_pages, args.seconds)
+        detail_rate = pages_per_second(extractor.parse_synopsis, detail_pages, args.seconds)
+        print(f"{name:>12} {search_rate:>15.1f} {detail_rate:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Throughput of the upstream fetcher against a stand-in that sheds load with 429s past its capacity.
+
+Compares a fixed in-flight limit without retries (the old behaviour) with the adaptive limiter.
+
+    python benchmarks/bench_fetcher.py --capacity 6 --threads 32 --requests 400
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetcher import Fetcher  # noqa: E402
+from movie_recommendation_3 import ContentRecommender  # noqa: E402
+from standin_server import start_server  # noqa: E402
+
+
+def run(server, fetcher, threads, urls):
+    server.requests.clear()
+
+    def get(url):
+        return fetcher.get(url, 5, url_class='detail').status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        statuses = list(executor.map(get, urls))
+    elapsed = time.perf_counter() - start
+    ok = statuses.count(200)
+    return elapsed, ok, server.requests.get('throttled', 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='injected upstream latency in seconds')
+    parser.add_argument('--capacity', type=int, default=6, help='concurrent requests the stand-in accepts')
+    parser.add_argument('--threads', type=int, default=32, help='client threads')
+    parser.add_argument('--requests', type=int, default=400)
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency, capacity=args.capacity)
+    headers = ContentRecommender(cache_path=None).headers
+    urls = [f"{server.base_url}/title/{t['tconst']}/" for t in server.catalog.titles[:args.requests]]
+
+    configs = {
+        'fixed': Fetcher(headers, max_in_flight=args.threads, initial_in_flight=args.threads, retries=0),
+        'adaptive': Fetcher(headers, max_in_flight=args.threads),
+    }
+    print(f"{'fetcher':>9} {'seconds':>8} {'ok/s':>8} {'failed':>7} {'429s':>6} {'final limit':>12}")
+    for name, fetcher in configs.items():
+        if name == 'fixed':
+            # Pin the limit so it behaves like a plain pool
+            fetcher.limiter.minimum = args.threads
+        elapsed, ok, throttled = run(server, fetcher, args.threads, urls)
+        print(f"{name:>9} {elapsed:>8.2f} {ok / elapsed:>8.1f} {len(urls) - ok:>7} {throttled:>6} "
+              f"{fetcher.limiter.limit:>12.1f}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Latency of genre/title lookups and autocomplete over a large synthetic title set.
+
+Titles are drawn from a Zipf-weighted vocabulary so that common words ("the", "of") have huge
+postings like real titles do. Queries are typed prefixes of existing titles, full titles, titles
+with one or two typos, and misspelled genres.
+
+    python benchmarks/bench_lookup.py --titles 300000
+"""
+import argparse
+import itertools
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lookup import LookupIndex  # noqa: E402
+
+GENRES = ['biography', 'drama', 'gangster', 'musical', 'romance', 'sci-fi', 'epic', 'mystery', 'history',
+          'documentary', 'action', 'animation', 'comedy', 'family', 'adventure', 'film noir', 'fantasy',
+          'music', 'western', 'horror', 'thriller', 'crime', 'sport']
+
+
+def vocabulary(n, rng):
+    words = ['the', 'of', 'a', 'and', 'in', 'night', 'love', 'man', 'last', 'dark', 'city', 'story']
+    while len(words) < n:
+        words.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    return words
+
+
+def typo(text, rng, n=1):
+    chars = list(text)
+    for _ in range(n):
+        if not chars:
+            break
+        i = rng.randrange(1, len(chars) - 1) if len(chars) > 2 else 0
+        operation = rng.choice('sdit')
+        if operation == 's':
+            chars[i] = rng.choice(string.ascii_lowercase)
+        elif operation == 'd':
+            del chars[i]
+        elif operation == 'i':
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+        elif i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return ''.join(chars)
+
+
+def timed_queries(index, queries, **options):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.lookup(query, **options)
+        samples.append(time.perf_counter() - start)
+    samples = np.asarray(samples) * 1000
+    return f"p50 {np.percentile(samples, 50):6.3f} ms  p99 {np.percentile(samples, 99):6.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=300000)
+    parser.add_argument('--words', type=int, default=60000, help='vocabulary size')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(args.words, rng)
+    cumulative = list(itertools.accumulate(1 / (i + 1) for i in range(len(words))))
+    titles = [' '.join(rng.choices(words, cum_weights=cumulative, k=rng.randint(1, 5))).title() for _ in range(args.titles)]
+
+    index = LookupIndex()
+    start = time.perf_counter()
+    for genre in GENRES:
+        index.add_genre(genre)
+    for i, title in enumerate(titles):
+        index.add_title(i + 1, title, int(rng.paretovariate(1.2) * 100))
+    print(f"indexed {args.titles} titles ({len(index.words)} distinct words) in {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lookup.npz')
+        start = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        index = LookupIndex.load(path)
+        print(f"save {saved:.2f}s, load {time.perf_counter() - start:.2f}s, {os.path.getsize(path) / 1e6:.1f} MB")
+
+    sample = rng.sample(titles, args.queries)
+    prefixes = [t[:rng.randint(1, len(t))] for t in sample]
+    print(f"autocomplete prefix   {timed_queries(index, prefixes)}")
+    print(f"exact title           {timed_queries(index, sample, prefix=False)}")
+    print(f"title, one typo       {timed_queries(index, [typo(t, rng) for t in sample], prefix=False)}")
+    print(f"title, two typos      {timed_queries(index, [typo(t, rng, 2) for t in sample], prefix=False)}")
+    print(f"misspelled genre      {timed_queries(index, [typo(rng.choice(GENRES), rng) for _ in range(args.queries)], kind='genre')}")
+
+    found = sum(any(r['name'] == t for r in index.lookup(typo(t, rng), 10, prefix=False)) for t in sample)
+    print(f"a title with one typo is in the top 10 for {found / len(sample):.1%} of queries")
+
+
+if __name__ == '__main__':
+    main()
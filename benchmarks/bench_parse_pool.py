@@ -0,0 +1,61 @@
+"""Pages parsed per second by the process-pool parse stage for a range of worker counts.
+
+I/O threads hand the saved fixture pages to the parser concurrently, like the fetch stage does;
+"inline" is the in-thread extractor for comparison.
+
+    python benchmarks/bench_parse_pool.py --backend soup --workers 1,2,4,8 --threads 16
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_extractors import load_pages  # noqa: E402
+from extractors import get_extractor  # noqa: E402
+from parse_pool import ParsePool  # noqa: E402
+
+
+def throughput(parser, pages, threads, seconds):
+    """Pages/s with `threads` callers parsing search and detail pages as fast as they can"""
+    jobs = [(parser.parse_search if kind == 'search' else parser.parse_synopsis, page) for kind, page in pages]
+    parsed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while time.perf_counter() - start < seconds:
+            for result in executor.map(lambda job: job[0](job[1]), jobs):
+                assert result, "parser returned nothing for a fixture page"
+            parsed += len(jobs)
+    return parsed / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', default='soup', help='extractor the workers run (see extractors.py)')
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, os.cpu_count() or 1)),
+                        help='comma separated worker counts')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent I/O threads submitting pages')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3.0, help='time budget per configuration')
+    args = parser.parse_args()
+
+    pages = [('search', p) for p in load_pages('search')] + [('detail', p) for p in load_pages('detail')]
+    # Repeat the fixtures so every configuration sees enough concurrent work to batch
+    pages = pages * max(1, (args.threads * 4) // len(pages))
+    print(f"{len(pages)} pages per round, backend {args.backend}, {args.threads} submitting threads, "
+          f"{os.cpu_count()} cores")
+
+    inline = throughput(get_extractor(args.backend), pages, args.threads, args.seconds)
+    print(f"{'inline':>8}: {inline:8.1f} pages/s")
+    for workers in sorted({int(n) for n in args.workers.split(',')}):
+        pool = ParsePool(args.backend, workers=workers, batch_size=args.batch_size)
+        rate = throughput(pool, pages, args.threads, args.seconds)
+        print(f"{workers:>8}: {rate:8.1f} pages/s  x{rate / inline:.2f}  "
+              f"{pool.pages / max(pool.batches, 1):.1f} pages/batch")
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Train and evaluate the personalization engine on synthetic interactions, on one CPU.
+
+Leave-one-out: one clicked title per user is hidden, the model is trained on everything else, and
+each user's hidden title is re-ranked among --pool - 1 random titles they never saw. Reports hit
+rate @10 against a popularity baseline, training time, fold-in latency, and re-rank latency
+against the per-query budget.
+
+    python benchmarks/bench_personalization.py --users 2000 --titles 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from personalization import Personalizer, synthetic_interactions  # noqa: E402
+
+
+def percentile_ms(samples, q):
+    return np.percentile(np.asarray(samples) * 1000, q)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--titles', type=int, default=5000)
+    parser.add_argument('--per-user', type=int, default=40, help='titles shown to each user')
+    parser.add_argument('--factors', type=int, default=32)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--pool', type=int, default=100, help='candidates re-ranked per evaluation query')
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    events, _ = synthetic_interactions(args.users, args.titles, per_user=args.per_user, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+
+    # Hide the last click of every user who has at least two
+    clicks = {}
+    for event in events:
+        if event[2] == 'clicked':
+            clicks.setdefault(event[0], []).append(event[1])
+    held_out = {user: titles[-1] for user, titles in clicks.items() if len(titles) > 1}
+    training = [e for e in events if not (e[2] in ('clicked', 'rated') and held_out.get(e[0]) == e[1])]
+
+    personalizer = Personalizer.open(None, budget_ms=args.budget_ms)
+    start = time.perf_counter()
+    personalizer.log.record_many(training)
+    print(f"{len(training)} events from {args.users} users over {args.titles} titles "
+          f"(logged in {time.perf_counter() - start:.1f}s)")
+    model = personalizer.train(factors=args.factors, iterations=args.iterations)
+    print(f"trained {args.factors} factors x {args.iterations} iterations in {model.fit_seconds:.2f}s")
+
+    popularity = {}
+    for user, tconst, kind, _, _ in training:
+        if kind == 'clicked':
+            popularity[tconst] = popularity.get(tconst, 0) + 1
+    all_titles = model.tconsts
+    seen = {}
+    for user, tconst, _, _, _ in events:
+        seen.setdefault(user, set()).add(tconst)
+
+    hits = baseline_hits = 0
+    fold_in, rerank = [], []
+    for user, target in held_out.items():
+        negatives = [int(t) for t in rng.choice(all_titles, size=args.pool * 2, replace=False) if int(t) not in seen[user]]
+        pool = [target] + negatives[:args.pool - 1]
+        # The ranker's view: popularity decides the base order and score
+        candidates = sorted(({'tconst': f"tt{t:07d}", 'score': popularity.get(t, 0)} for t in pool),
+                            key=lambda c: -c['score'])
+        baseline_hits += any(c['tconst'] == f"tt{target:07d}" for c in candidates[:10])
+
+        start = time.perf_counter()
+        personalizer.profile(user)
+        fold_in.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        top = personalizer.rerank(user, candidates, 10)
+        rerank.append(time.perf_counter() - start)
+        hits += any(c['tconst'] == f"tt{target:07d}" for c in top)
+
+    n = len(held_out)
+    print(f"hit rate @10 over {n} users, pool {args.pool}: personalized {hits / n:.3f}, "
+          f"popularity {baseline_hits / n:.3f}, random {10 / args.pool:.3f}")
+    print(f"fold-in  p50 {percentile_ms(fold_in, 50):.2f} ms  p99 {percentile_ms(fold_in, 99):.2f} ms")
+    print(f"re-rank  p50 {percentile_ms(rerank, 50):.2f} ms  p99 {percentile_ms(rerank, 99):.2f} ms  "
+          f"(budget {args.budget_ms} ms, stats {personalizer.stats})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Ranking cost as the candidate pool grows: vectorized Ranker.top_k vs the old full sorted() over dicts.
+
+    python benchmarks/bench_ranking.py --sizes 40,1000,50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import Ranker  # noqa: E402
+
+GENRES = ['action', 'drama', 'crime']
+
+
+def make_candidates(n, seed=0):
+    rng = random.Random(seed)
+    return [{
+        'tconst': f"tt{i:07d}",
+        'rating': f"{rng.uniform(1, 10):.1f}" if rng.random() > 0.02 else "N/A",
+        'votes': int(rng.lognormvariate(8, 2)),
+        'matched_genres': rng.sample(GENRES, rng.randint(1, 3)),
+    } for i in range(n)]
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='40,1000,10000,50000')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10} {'sorted()':>12} {'rating':>12} {'bayesian':>12}")
+    for n in map(int, args.sizes.split(',')):
+        candidates = make_candidates(n)
+        baseline = best_of(lambda: sorted(candidates, key=lambda x: x['rating'], reverse=True)[:args.k], args.repeat)
+        timings = [best_of(lambda: Ranker(strategy).top_k(candidates, args.k), args.repeat)
+                   for strategy in ('rating', 'bayesian')]
+        print(f"{n:>10} " + ' '.join(f"{t * 1000:>9.2f} ms" for t in [baseline] + timings))
+
+
+if __name__ == '__main__':
+    main()
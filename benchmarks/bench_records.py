@@ -0,0 +1,108 @@
+"""Memory and serialization cost of the compact RecordStore versus result dicts + JSON.
+
+Synthetic search results (realistic field shapes, shared placeholder synopses, repeated
+genres) are held both ways; the script reports retained memory per 100k titles and
+encode/decode throughput.
+
+    python benchmarks/bench_records.py --titles 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import IMDB_GENRES  # noqa: E402
+from records import RecordStore  # noqa: E402
+
+WORDS = ("the a of night last city man woman love war dark secret house story return king lost day "
+         "girl boy blood road world life death family time summer winter dream fire water").split()
+
+
+def synthetic_results(n, seed=0):
+    rng = random.Random(seed)
+    results = []
+    for i in range(n):
+        tconst = f"tt{rng.randrange(1, 30000000):07d}"
+        year = rng.randrange(1920, 2025)
+        results.append({
+            'tconst': tconst,
+            'title': ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(1, 5))).title(),
+            'year': f"{year}–{year + rng.randrange(1, 9)}" if rng.random() < 0.15 else str(year),
+            'rating': f"{rng.uniform(1, 10):.1f}",
+            'votes': rng.randrange(5, 3000000),
+            'synopsis': ("Synopsis not available" if rng.random() < 0.2 else
+                         ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(15, 35))).capitalize() + '.'),
+            'link': f"https://www.imdb.com/title/{tconst}/",
+            'image_url': f"https://m.media-amazon.com/images/M/MV5B{rng.getrandbits(120):030x}._V1_.jpg",
+            'genres': rng.sample(IMDB_GENRES, rng.randrange(1, 4)),
+        })
+    return results
+
+
+def retained(build):
+    """(object, bytes still allocated by build() once it returns)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return built, size
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    per_100k = 100000 / args.titles
+
+    source = json.dumps(synthetic_results(args.titles))
+    dicts, dict_bytes = retained(lambda: json.loads(source))
+
+    def build_store():
+        store = RecordStore()
+        for result in dicts:
+            store.add(result)
+        return store
+
+    store, store_bytes = retained(build_store)
+    print(f"{args.titles} titles, retained memory per 100k:")
+    print(f"  dicts        {dict_bytes * per_100k / 1e6:8.1f} MB")
+    print(f"  RecordStore  {store_bytes * per_100k / 1e6:8.1f} MB  ({dict_bytes / store_bytes:.1f}x smaller)")
+
+    json_encode, encoded_json = best_of(args.repeat, lambda: json.dumps(dicts).encode('utf-8'))
+    json_decode, _ = best_of(args.repeat, lambda: json.loads(encoded_json))
+    store_encode, encoded_store = best_of(args.repeat, store.encode)
+    store_decode, decoded = best_of(args.repeat, lambda: RecordStore.decode(encoded_store))
+    assert len(decoded) == len(store)
+    sample = dicts[len(dicts) // 2]
+    assert decoded.get(sample['tconst']).to_result()['title'] == sample['title']
+
+    print(f"{'':14}{'size':>10}{'encode':>12}{'decode':>12}   (per 100k titles)")
+    for name, size, encode, decode in (('dicts + JSON', len(encoded_json), json_encode, json_decode),
+                                       ('RecordStore', len(encoded_store), store_encode, store_decode)):
+        print(f"  {name:12}{size * per_100k / 1e6:7.1f} MB{encode * per_100k * 1000:9.1f} ms"
+              f"{decode * per_100k * 1000:9.1f} ms")
+    build, _ = best_of(1, build_store)
+    print(f"building the store from result dicts: {build * per_100k * 1000:.1f} ms per 100k")
+
+
+if __name__ == '__main__':
+    main()
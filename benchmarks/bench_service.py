@@ -0,0 +1,94 @@
+"""Load test the HTTP service against the local stand-in IMDb server.
+
+Many concurrent clients replay a skewed mix of queries (a few popular combos asked over and over)
+and the script reports client-side latency percentiles, the service's own /stats and how many
+requests actually reached the stand-in upstream.
+
+    python benchmarks/bench_service.py --clients 32 --requests 400 --latency 0.05
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from movie_recommendation_3 import ContentRecommender  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from service import RecommendationService  # noqa: E402
+from standin_server import start_server  # noqa: E402
+
+# (genres, content type, relative popularity)
+QUERY_MIX = [
+    ('action,drama', 'M', 30),
+    ('drama,action', 'M', 10),
+    ('comedy', 'S', 15),
+    ('action,comedy', 'M', 10),
+    ('sci-fi,thriller', 'B', 10),
+    ('crime,drama,mystery', 'M', 5),
+    ('horror', 'M', 5),
+    ('western,history,romance', 'M', 2),
+    ('animation,family', 'B', 2),
+]
+
+
+def percentile(values, q):
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32, help='concurrent client threads')
+    parser.add_argument('--requests', type=int, default=400, help='total requests to send')
+    parser.add_argument('--latency', type=float, default=0.05, help='injected upstream latency in seconds')
+    parser.add_argument('--result-ttl', type=float, default=60, help='service result cache TTL (0 only coalesces)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    upstream = start_server(latency=args.latency)
+    recommender = ContentRecommender(base_url=upstream.base_url, cache_path=None, quiet=True, metrics=Metrics())
+    service = RecommendationService(('127.0.0.1', 0), recommender, result_ttl=args.result_ttl)
+    threading.Thread(target=service.serve_forever, daemon=True).start()
+
+    rng = random.Random(args.seed)
+    queries = rng.choices([q[:2] for q in QUERY_MIX], weights=[q[2] for q in QUERY_MIX], k=args.requests)
+
+    def call(query):
+        genres, content_type = query
+        start = time.perf_counter()
+        with urlopen(f"{service.base_url}/recommend?{urlencode({'genres': genres, 'type': content_type})}") as response:
+            results = json.load(response)['results']
+        assert results, f"no results for {genres}/{content_type}"
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        timings = sorted(executor.map(call, queries))
+    elapsed = time.perf_counter() - start
+
+    with urlopen(f"{service.base_url}/stats") as response:
+        stats = json.load(response)
+    with urlopen(f"{service.base_url}/metrics") as response:
+        exposition = response.read().decode('utf-8')
+    service.shutdown()
+    upstream.shutdown()
+
+    print(f"{args.requests} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"({args.requests / elapsed:.1f} req/s), upstream latency {args.latency * 1000:.0f} ms")
+    print(f"client latency: p50 {percentile(timings, 0.5) * 1000:.1f} ms  p90 {percentile(timings, 0.9) * 1000:.1f} ms  "
+          f"p99 {percentile(timings, 0.99) * 1000:.1f} ms  max {timings[-1] * 1000:.1f} ms")
+    print(f"queries computed {stats['queries']['computed']}, shared or cached {stats['queries']['shared_or_cached']}")
+    print(f"upstream requests {sum(upstream.requests.values())} {upstream.requests}, "
+          f"fetches shared between queries {stats['upstream']['shared_fetches']}")
+    print(json.dumps(stats['latency'], indent=2))
+    print(exposition)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Similarity index build time and "more like this" query latency for each search backend.
+
+Documents are the fixture catalog plots, optionally padded with recombined synthetic plots.
+
+    python benchmarks/bench_similarity.py --docs 50000 --queries 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity import BACKENDS, SimilarityIndex  # noqa: E402
+
+CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'catalog.json')
+
+
+def make_documents(count, seed=0):
+    with open(CATALOG) as f:
+        titles = json.load(f)
+    docs = [(t['tconst'], f"{t['title']} {t['plot']}", t['genres']) for t in titles]
+    rng = random.Random(seed)
+    sentences = [s for t in titles for s in t['plot'].split('. ')]
+    while len(docs) < count:
+        a, b = rng.sample(titles, 2)
+        docs.append((f"tt9{len(docs):07d}", f"{rng.choice(sentences)}. {rng.choice(sentences)}", a['genres'][:1] + b['genres'][:1]))
+    return docs[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    docs = make_documents(args.docs)
+    rng = random.Random(1)
+    queries = [rng.choice(docs)[0] for _ in range(args.queries)]
+    exact = {}
+    for backend in BACKENDS:
+        index = SimilarityIndex(backend=backend)
+        start = time.perf_counter()
+        for tconst, text, genres in docs:
+            index.add(tconst, text, genres)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.similar(queries[0], args.k)  # first query pays for postings/IDF
+        first = time.perf_counter() - start
+
+        timings, recall = [], []
+        for tconst in queries:
+            start = time.perf_counter()
+            found = [t for t, _ in index.similar(tconst, args.k)]
+            timings.append(time.perf_counter() - start)
+            if backend == 'brute':
+                exact[tconst] = set(found)
+            elif exact.get(tconst):
+                recall.append(len(exact[tconst] & set(found)) / len(exact[tconst]))
+        timings.sort()
+        line = (f"{backend:>6}: {len(docs)} docs, add {build * 1000:8.1f} ms, first query {first * 1000:7.1f} ms, "
+                f"p50 {timings[len(timings) // 2] * 1000:6.2f} ms, p99 {timings[int(len(timings) * 0.99)] * 1000:6.2f} ms")
+        if recall:
+            line += f", recall@{args.k} {sum(recall) / len(recall):.2f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Cold-start versus warm-daemon latency, against the local stand-in IMDb server.
+
+Measures, as medians over --runs:
+
+  * import time of the full CLI module versus the thin client
+  * a one-shot CLI query (fresh interpreter, recommender, session and connections every time)
+  * the daemon: its startup, the first query, and warm queries both from a fresh client
+    process (what a shell user sees) and over an already open connection
+
+    python benchmarks/bench_startup.py --runs 5 --latency 0.02
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from recommend_client import DaemonClient  # noqa: E402
+from standin_server import start_server  # noqa: E402
+
+QUERY = ['action', 'drama']
+
+
+def timed(command, stdin=None):
+    start = time.perf_counter()
+    subprocess.run(command, input=stdin, cwd=HERE, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def median_ms(samples):
+    return f"{statistics.median(samples) * 1000:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.02, help='injected upstream latency in seconds')
+    args = parser.parse_args()
+
+    upstream = start_server(latency=args.latency)
+    cli = [sys.executable, os.path.join(HERE, 'movie_recommendation_3.py'), '--no-cache', '--base-url', upstream.base_url]
+    client = [sys.executable, os.path.join(HERE, 'recommend_client.py')]
+
+    print(f"import movie_recommendation_3: {median_ms([timed([sys.executable, '-c', 'import movie_recommendation_3']) for _ in range(args.runs)])}")
+    print(f"import recommend_client:       {median_ms([timed([sys.executable, '-c', 'import recommend_client']) for _ in range(args.runs)])}")
+
+    query_line = json.dumps({'genres': QUERY, 'content_type': 'M'}).encode('utf-8')
+    one_shot = [timed(cli + ['--bulk', '-'], stdin=query_line) for _ in range(args.runs)]
+    print(f"one-shot CLI query:            {median_ms(one_shot)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'daemon.sock')
+        # --result-ttl 0: every query is recomputed, so warm numbers reflect warm state, not a stored answer
+        start = time.perf_counter()
+        daemon = subprocess.Popen(cli + ['--daemon', path, '--result-ttl', '0'], cwd=HERE,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                try:
+                    connection = DaemonClient(path)
+                    break
+                except OSError:
+                    if daemon.poll() is not None:
+                        raise RuntimeError("the daemon exited during startup")
+                    time.sleep(0.01)
+            print(f"daemon startup:                {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+            with connection:
+                start = time.perf_counter()
+                connection.request('recommend', genres=QUERY, content_type='M')
+                print(f"daemon first query:            {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+                via_process = [timed(client + QUERY + ['--type', 'M', '--socket', path]) for _ in range(args.runs)]
+                print(f"warm query, client process:    {median_ms(via_process)}")
+
+                samples, daemon_side = [], []
+                for _ in range(args.runs * 10):
+                    start = time.perf_counter()
+                    response = connection.request('recommend', genres=QUERY, content_type='M')
+                    samples.append(time.perf_counter() - start)
+                    daemon_side.append(response['seconds'])
+                print(f"warm query, open connection:   {median_ms(samples)} (daemon side {median_ms(daemon_side).strip()})")
+                connection.request('shutdown')
+            daemon.wait(timeout=10)
+        finally:
+            if daemon.poll() is None:
+                daemon.kill()
+            upstream.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Reproducible hot-path benchmark suite against the local stand-in IMDb server.
+
+Measures end-to-end query latency (cold and warm cache), upstream requests per query, parse
+throughput of the real search/detail parsing code, peak Python memory of a query batch and the
+cost of a poster thumbnail. Results are written as JSON and can be compared with a stored baseline;
+the exit status is 1 when any metric regressed by more than the tolerance.
+
+    python benchmarks/bench_suite.py --output results.json --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_suite.py --baseline benchmarks/baseline.json --tolerance 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from movie_recommendation_3 import ContentRecommender  # noqa: E402
+from standin_server import start_server  # noqa: E402
+from bench_extractors import load_pages, pages_per_second  # noqa: E402
+from thumbnails import ThumbnailPipeline  # noqa: E402
+
+QUERIES = [
+    (['action', 'drama', 'crime'], 'M'),
+    (['comedy'], 'S'),
+    (['sci-fi', 'thriller'], 'B'),
+    (['western', 'history', 'romance'], 'M'),
+    (['animation', 'family'], 'B'),
+]
+
+# Whether a bigger number is better; everything else counts as lower-is-better
+HIGHER_IS_BETTER = {'parse.search_pages_per_s', 'parse.detail_pages_per_s'}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def run_queries(recommender, server, repeat):
+    """(per-query seconds, upstream requests per query by URL class) for `repeat` passes over QUERIES"""
+    server.requests.clear()
+    timings = []
+    for _ in range(repeat):
+        for genres, content_type in QUERIES:
+            start = time.perf_counter()
+            results = recommender.recommend(genres, content_type)
+            timings.append(time.perf_counter() - start)
+            assert results, f"no results for {genres}/{content_type}"
+    per_query = {kind: count / len(timings) for kind, count in server.requests.items()}
+    return timings, per_query
+
+
+def bench_queries(server, repeat):
+    metrics = {}
+
+    # Cold: no persistent cache, every query scrapes the stand-in
+    cold = ContentRecommender(base_url=server.base_url, cache_path=None, quiet=True)
+    tracemalloc.start()
+    timings, per_query = run_queries(cold, server, repeat)
+    metrics['memory.query_batch_peak_kib'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    metrics['query.cold_p50_ms'] = round(percentile(timings, 0.5) * 1000, 2)
+    metrics['query.cold_p90_ms'] = round(percentile(timings, 0.9) * 1000, 2)
+    metrics['query.cold_mean_ms'] = round(sum(timings) / len(timings) * 1000, 2)
+    metrics['requests.cold_per_query'] = round(sum(per_query.values()), 2)
+    for kind, count in sorted(per_query.items()):
+        metrics[f"requests.cold_{kind}_per_query"] = round(count, 2)
+
+    # Warm: an in-memory cache that has already seen every query once
+    warm = ContentRecommender(base_url=server.base_url, cache_path=':memory:', quiet=True)
+    run_queries(warm, server, 1)
+    timings, per_query = run_queries(warm, server, repeat)
+    metrics['query.warm_p50_ms'] = round(percentile(timings, 0.5) * 1000, 2)
+    metrics['query.warm_p90_ms'] = round(percentile(timings, 0.9) * 1000, 2)
+    metrics['requests.warm_per_query'] = round(sum(per_query.values()), 2)
+    return metrics, cold
+
+
+def bench_parsing(recommender, seconds):
+    """Pages/s through the recommender's own parse + cleanup code (the configured extractor)"""
+    search_pages, detail_pages = load_pages('search'), load_pages('detail')
+    return {
+        'parse.search_pages_per_s': round(pages_per_second(
+            lambda page: recommender._parse_search_page(page), search_pages, seconds), 1),
+        'parse.detail_pages_per_s': round(pages_per_second(
+            lambda page: recommender._parse_synopsis(page, f"{recommender.base_url}/title/tt0000000/"),
+            detail_pages, seconds), 1),
+    }
+
+
+def bench_thumbnails(recommender, server, count):
+    """Cost of a poster thumbnail: fetch + decode + resize + encode, then an LRU hit"""
+    urls = [f"{server.base_url}/images/M/{t['tconst']}._V1_QL75_UX140_CR0,1,140,207_.jpg"
+            for t in server.catalog.titles[:count]]
+    server.poster(server.catalog.titles[0]['tconst'], 100)  # fail early if Pillow is missing
+    # Render every poster once on the server side so the first measured fetch is not an outlier
+    for url in urls:
+        recommender._fetch_cached(url.replace('UX140', 'UX100'), 'image', timeout=5)
+
+    pipeline = ThumbnailPipeline(lambda url: recommender._fetch_cached(url, 'image', timeout=5), workers=1)
+    bytes_before = server.bytes_sent
+    start = time.perf_counter()
+    for url in urls:
+        assert pipeline.get(url), f"no thumbnail for {url}"
+    cold = (time.perf_counter() - start) / count
+    fetched = (server.bytes_sent - bytes_before) / count
+
+    start = time.perf_counter()
+    for url in urls:
+        pipeline.get(url)
+    warm = (time.perf_counter() - start) / count
+    return {
+        'thumbnail.cold_ms': round(cold * 1000, 3),
+        'thumbnail.warm_us': round(warm * 1000000, 2),
+        'thumbnail.bytes_per_poster': round(fetched),
+    }
+
+
+def compare(metrics, baseline, tolerance):
+    """[(metric, baseline value, new value, relative change, regressed)] for metrics in both runs"""
+    rows = []
+    for name, old in sorted(baseline.items()):
+        new = metrics.get(name)
+        if new is None or not old:
+            continue
+        change = (new - old) / abs(old)
+        worse = -change if name in HIGHER_IS_BETTER else change
+        rows.append((name, old, new, change, worse > tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.02, help='injected upstream latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.01, help='extra random upstream delay, up to this many seconds')
+    parser.add_argument('--seed', type=int, default=0, help='jitter seed')
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the query set')
+    parser.add_argument('--parse-seconds', type=float, default=1.0, help='time budget per parse benchmark')
+    parser.add_argument('--thumbnails', type=int, default=20, help='posters to thumbnail')
+    parser.add_argument('--output', metavar='FILE', help='write the results JSON here (default stdout)')
+    parser.add_argument('--baseline', metavar='FILE', help='compare with a previous results JSON')
+    parser.add_argument('--save-baseline', metavar='FILE', help='also store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed relative slowdown before failing')
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency, jitter=args.jitter, seed=args.seed)
+    metrics, recommender = bench_queries(server, args.repeat)
+    try:
+        metrics.update(bench_thumbnails(recommender, server, args.thumbnails))
+    except ImportError:
+        print("⚠️ Pillow is not installed, skipping the thumbnail benchmark", file=sys.stderr)
+    metrics.update(bench_parsing(recommender, args.parse_seconds))
+    server.shutdown()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'extractor': type(recommender.extractor).__name__,
+            'settings': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline', 'save_baseline')},
+        },
+        'metrics': metrics,
+    }
+
+    regressed = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(metrics, baseline['metrics'], args.tolerance)
+        report['comparison'] = {name: {'baseline': old, 'value': new, 'change': round(change, 4), 'regressed': bad}
+                                for name, old, new, change, bad in rows}
+        regressed = [row for row in rows if row[4]]
+        for name, old, new, change, bad in rows:
+            print(f"{'❌' if bad else '  '} {name:<36} {old:>12} -> {new:>12} ({change:+.1%})", file=sys.stderr)
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(data + '\n')
+
+    if regressed:
+        print(f"{len(regressed)} metric(s) regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
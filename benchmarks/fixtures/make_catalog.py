@@ -0,0 +1,74 @@
+"""Regenerate catalog.json (the stand-in IMDb server's titles) and the matching sample TSV dumps.
+
+The catalog is synthetic but deterministic (fixed seed) so benchmark numbers stay comparable.
+"""
+import gzip
+import json
+import os
+import random
+
+GENRES = [
+    'Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Documentary', 'Drama',
+    'Family', 'Fantasy', 'Film-Noir', 'History', 'Horror', 'Music', 'Musical', 'Mystery',
+    'Romance', 'Sci-Fi', 'Sport', 'Thriller', 'War', 'Western'
+]
+ADJECTIVES = ['Silent', 'Broken', 'Golden', 'Last', 'Hidden', 'Crimson', 'Lonely', 'Endless', 'Savage', 'Quiet',
+              'Electric', 'Frozen', 'Wild', 'Midnight', 'Lost', 'Burning', 'Distant', 'Iron', 'Paper', 'Velvet']
+NOUNS = ['River', 'Empire', 'Garden', 'Signal', 'Harbor', 'Kingdom', 'Witness', 'Horizon', 'Machine', 'Frontier',
+         'Station', 'Orchard', 'Circus', 'Lighthouse', 'Verdict', 'Summer', 'Dynasty', 'Archive', 'Crossing', 'Echo']
+SUBJECTS = ['a retired detective', 'two estranged sisters', 'a young pilot', 'an ambitious chef', 'a small-town sheriff',
+            'a disgraced scientist', 'a band of outlaws', 'a grieving father', 'a rookie reporter', 'an exiled prince',
+            'a teenage hacker', 'a travelling circus', 'a boxing coach', 'a ship captain', 'a family of farmers']
+ACTIONS = ['uncovers a conspiracy', 'must survive a brutal winter', 'chases a legendary treasure',
+           'fights to save the family business', 'confronts a ruthless crime boss', 'falls for an unlikely stranger',
+           'races against time to stop a disaster', 'investigates a string of disappearances',
+           'returns home after twenty years', 'leads a rebellion against tyranny', 'trains for the championship',
+           'discovers a portal to another world']
+SETTINGS = ['in post-war Europe', 'on a remote island', 'in near-future Tokyo', 'across the American West',
+            'aboard a deep-space freighter', 'in 1920s Chicago', 'in a haunted Victorian mansion',
+            'during the gold rush', 'in the streets of Mumbai', 'beneath the Arctic ice']
+
+
+def make_catalog(count=1500, seed=7):
+    rng = random.Random(seed)
+    titles = []
+    for i in range(count):
+        rating = round(min(9.7, max(1.5, rng.gauss(6.6, 1.1))), 1)
+        titles.append({
+            'tconst': f"tt{1000000 + i * 37:07d}",
+            'title': f"The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}" + (f" {rng.randint(2, 4)}" if rng.random() < 0.08 else ""),
+            'year': rng.randint(1940, 2025),
+            'type': 'tvSeries' if rng.random() < 0.3 else 'movie',
+            'genres': sorted(rng.sample(GENRES, rng.choice([1, 2, 2, 3, 3]))),
+            'rating': rating,
+            'votes': int(rng.lognormvariate(9, 2)) + 5,
+            'plot': f"{rng.choice(SUBJECTS).capitalize()} {rng.choice(ACTIONS)} {rng.choice(SETTINGS)}. "
+                    f"When {rng.choice(SUBJECTS)} {rng.choice(ACTIONS)}, old loyalties are tested and "
+                    f"nothing will ever be the same.",
+        })
+    return titles
+
+
+def write_tsv(path, header, rows):
+    # mtime=0 keeps the gzip bytes identical between regenerations
+    with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+        f.write(('\n'.join('\t'.join(map(str, row)) for row in [header] + rows) + '\n').encode('utf-8'))
+
+
+if __name__ == '__main__':
+    here = os.path.dirname(os.path.abspath(__file__))
+    titles = make_catalog()
+    with open(os.path.join(here, 'catalog.json'), 'w') as f:
+        # One title per line keeps diffs of regenerated fixtures readable
+        f.write('[\n' + ',\n'.join(json.dumps(t) for t in titles) + '\n]\n')
+
+    # The same titles in the layout of IMDb's title.basics / title.ratings datasets
+    write_tsv(os.path.join(here, 'title.basics.sample.tsv.gz'),
+              ['tconst', 'titleType', 'primaryTitle', 'originalTitle', 'isAdult', 'startYear', 'endYear',
+               'runtimeMinutes', 'genres'],
+              [[t['tconst'], t['type'], t['title'], t['title'], 0, t['year'], '\\N', 118, ','.join(t['genres'])]
+               for t in titles])
+    write_tsv(os.path.join(here, 'title.ratings.sample.tsv.gz'),
+              ['tconst', 'averageRating', 'numVotes'],
+              [[t['tconst'], t['rating'], t['votes']] for t in titles])
+    print(f"Wrote catalog.json and sample TSVs to {here}")
@@ -0,0 +1,319 @@
+"""Local stand-in for www.imdb.com serving recorded pages from fixtures/catalog.json.
+
+Search pages (/search/title/) and detail pages (/title/ttNNNN/) are rendered with the same markup
+the live site uses, and posters (/images/M/...) honour the CDN's UX<width> size modifier, so
+ContentRecommender can run against it unchanged:
+
+    python benchmarks/standin_server.py --port 8000 --latency 0.05 --jitter 0.02
+    ContentRecommender(base_url="http://127.0.0.1:8000", cache_path=None)
+"""
+import argparse
+import hashlib
+import html
+import json
+import io
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_CATALOG = os.path.join(FIXTURES_DIR, 'catalog.json')
+PAGE_SIZE = 50
+POSTER_WIDTH_RE = re.compile(r'_UX(\d+)')
+FULL_POSTER_WIDTH = 675
+
+TITLE_TYPES = {'feature': 'movie', 'tv_series': 'tvSeries'}
+
+
+def format_votes(votes):
+    if votes >= 1000000:
+        return f"{votes / 1000000:.1f}M".replace('.0M', 'M')
+    if votes >= 1000:
+        return f"{votes // 1000}K"
+    return str(votes)
+
+
+class StandinCatalog:
+    """In-memory title catalog with the filtering and sorting the search endpoint needs"""
+
+    def __init__(self, path=DEFAULT_CATALOG):
+        with open(path) as f:
+            self.titles = json.load(f)
+        self.by_tconst = {t['tconst']: t for t in self.titles}
+
+    def search(self, genres, title_type, start=1):
+        matches = [
+            t for t in self.titles
+            if all(g in (x.lower() for x in t['genres']) for g in genres)
+            and (title_type is None or t['type'] == title_type)
+        ]
+        matches.sort(key=lambda t: (-t['rating'], -t['votes']))
+        return matches[start - 1:start - 1 + PAGE_SIZE], len(matches)
+
+
+def render_search_item(index, title, host):
+    return (
+        '<li class="ipc-metadata-list-summary-item"><div class="sc-9a2a0028-3">'
+        f'<div class="ipc-poster"><img alt="{html.escape(title["title"])}" class="ipc-image" loading="lazy" '
+        f'src="{host}/images/M/{title["tconst"]}._V1_QL75_UX140_CR0,1,140,207_.jpg" width="140"></div>'
+        f'<div class="ipc-title"><a href="/title/{title["tconst"]}/?ref_=sr_t_{index}" class="ipc-title-link-wrapper">'
+        f'<h3 class="ipc-title__text">{index}. {html.escape(title["title"])}</h3></a></div>'
+        f'<div class="dli-title-metadata"><span class="dli-title-metadata-item">{title["year"]}</span>'
+        '<span class="dli-title-metadata-item">1h 58m</span></div>'
+        '<span class="ipc-rating-star ipc-rating-star--base ipc-rating-star--imdb ratingGroup--imdb-rating" '
+        f'aria-label="IMDb rating: {title["rating"]}"><svg width="24" height="24"></svg>'
+        f'<span class="ipc-rating-star--rating">{title["rating"]}</span>'
+        f'<span class="ipc-rating-star--voteCount">&nbsp;(<!-- -->{format_votes(title["votes"])}<!-- -->)</span></span>'
+        '</div></li>'
+    )
+
+
+def render_next_data(page_props):
+    """The JSON blob Next.js embeds in every IMDb page"""
+    data = json.dumps({'props': {'pageProps': page_props}, 'page': '/', 'buildId': 'standin'}).replace('</', '<\\/')
+    return f'<script id="__NEXT_DATA__" type="application/json">{data}</script>'
+
+
+def search_next_data(titles, total, host):
+    return {'searchResults': {'titleResults': {'total': total, 'titleListItems': [{
+        'titleId': t['tconst'],
+        'titleText': t['title'],
+        'releaseYear': {'year': t['year']},
+        'ratingSummary': {'aggregateRating': t['rating'], 'voteCount': t['votes']},
+        'primaryImage': {'url': f"{host}/images/M/{t['tconst']}._V1_.jpg", 'width': 1000, 'height': 1480},
+        'titleType': {'id': t['type']},
+        'genres': t['genres'],
+        'plot': t['plot'],
+    } for t in titles]}}}
+
+
+def detail_next_data(title):
+    return {'tconst': title['tconst'], 'aboveTheFoldData': {
+        'id': title['tconst'],
+        'titleText': {'text': title['title']},
+        'releaseYear': {'year': title['year']},
+        'titleType': {'id': title['type']},
+        'genres': {'genres': [{'text': g, 'id': g} for g in title['genres']]},
+        'ratingsSummary': {'aggregateRating': title['rating'], 'voteCount': title['votes']},
+        'plot': {'plotText': {'plainText': title['plot']}},
+    }}
+
+
+def render_search_page(titles, start, total, host):
+    items = ''.join(render_search_item(start + i, t, host) for i, t in enumerate(titles))
+    return (
+        '<!DOCTYPE html><html><head><title>Advanced search</title></head><body>'
+        f'<div class="sc-13add9d7-3">{start}-{start + len(titles) - 1} of {total}</div>'
+        f'<ul class="ipc-metadata-list ipc-metadata-list--dividers-between">{items}</ul>'
+        f'{render_next_data(search_next_data(titles, total, host))}'
+        '</body></html>'
+    )
+
+
+def render_detail_page(title):
+    return (
+        f'<!DOCTYPE html><html><head><title>{html.escape(title["title"])} ({title["year"]}) - IMDb</title></head><body>'
+        f'<h1 data-testid="hero__pageTitle"><span class="hero__primary-text">{html.escape(title["title"])}</span></h1>'
+        f'<span role="presentation" data-testid="plot-xl">{html.escape(title["plot"])}</span>'
+        '<section data-testid="Storyline"><div class="ipc-html-content ipc-html-content--base">'
+        f'<div class="ipc-html-content-inner-div">{html.escape(title["plot"])}—Anonymous</div></div></section>'
+        f'{render_next_data(detail_next_data(title))}'
+        '</body></html>'
+    )
+
+
+def save_pages(directory, catalog_path=DEFAULT_CATALOG, host='http://127.0.0.1:8000'):
+    """Write a fixed set of rendered search and detail pages to disk for the parser benchmarks"""
+    catalog = StandinCatalog(catalog_path)
+    os.makedirs(directory, exist_ok=True)
+    for genres, title_type in [(['action'], 'movie'), (['drama'], None), (['comedy'], 'tvSeries')]:
+        titles, total = catalog.search(genres, title_type)
+        name = f"search_{'_'.join(genres)}_{title_type or 'all'}.html"
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write(render_search_page(titles, 1, total, host))
+    for title in catalog.titles[:5]:
+        with open(os.path.join(directory, f"title_{title['tconst']}.html"), 'w') as f:
+            f.write(render_detail_page(title))
+
+
+def render_poster(tconst, width):
+    """Deterministic JPEG poster for a title at a given width (2:3 like real posters); needs Pillow"""
+    from PIL import Image, ImageDraw
+
+    seed = int(hashlib.md5(tconst.encode('utf-8')).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    height = width * 3 // 2
+    img = Image.new('RGB', (width, height), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    # Some shapes and noise so the JPEG is about as costly to decode as a real poster
+    for _ in range(24):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(1, width), y0 + rng.randrange(1, height)
+        draw.ellipse((x0, y0, x1, y1), fill=tuple(rng.randrange(256) for _ in range(3)))
+    noise = Image.effect_noise((width, height), 32).convert('RGB')
+    img = Image.blend(img, noise, 0.15)
+    buffered = io.BytesIO()
+    img.save(buffered, format='JPEG', quality=85)
+    return buffered.getvalue()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if not server.enter():
+            # Over capacity: shed load the way IMDb's CDN does
+            server.count('throttled')
+            self._send(b'Too many requests', status=429, headers={'Retry-After': '1'})
+            return
+        try:
+            self._get()
+        finally:
+            server.leave()
+
+    def _get(self):
+        server = self.server
+        delay = server.delay()
+        if delay:
+            time.sleep(delay)
+
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        host = f"http://{self.headers.get('Host')}"
+
+        if parts.path.rstrip('/') == '/search/title':
+            genres = [g.lower() for value in query.get('genres', []) for g in value.split(',')]
+            title_type = TITLE_TYPES.get(query.get('title_type', [''])[0])
+            start = int(query.get('start', ['1'])[0])
+            titles, total = server.catalog.search(genres, title_type, start)
+            server.count('search')
+            self._send(render_search_page(titles, start, total, host).encode('utf-8'))
+        elif parts.path.startswith('/title/'):
+            title = server.catalog.by_tconst.get(parts.path.split('/')[2])
+            server.count('detail')
+            if title is None:
+                self._send(b'Not found', status=404)
+            else:
+                self._send(render_detail_page(title).encode('utf-8'))
+        elif parts.path.startswith('/images/M/'):
+            server.count('image')
+            tconst = parts.path.rsplit('/', 1)[1].split('.')[0]
+            if tconst not in server.catalog.by_tconst:
+                self._send(b'Not found', status=404)
+                return
+            match = POSTER_WIDTH_RE.search(parts.path)
+            self._send(server.poster(tconst, int(match.group(1)) if match else FULL_POSTER_WIDTH),
+                       content_type='image/jpeg')
+        else:
+            server.count('other')
+            self._send(b'Not found', status=404)
+
+    def _send(self, body, status=200, content_type='text/html; charset=utf-8', headers=None):
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.sent(len(body))
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, catalog_path=DEFAULT_CATALOG, latency=0.0, jitter=0.0, seed=0, capacity=None):
+        super().__init__(address, StandinHandler)
+        self.catalog = StandinCatalog(catalog_path)
+        self.latency = latency
+        self.jitter = jitter
+        self.capacity = capacity
+        self.active = 0
+        self.requests = {}
+        self.bytes_sent = 0
+        self._posters = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def enter(self):
+        """Admit a request unless `capacity` requests are already being served"""
+        with self._lock:
+            if self.capacity and self.active >= self.capacity:
+                return False
+            self.active += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def sent(self, nbytes):
+        with self._lock:
+            self.bytes_sent += nbytes
+
+    def delay(self):
+        """Seconds to hold the next response: the base latency plus up to `jitter` extra"""
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._rng.uniform(0, self.jitter)
+
+    def poster(self, tconst, width):
+        key = (tconst, width)
+        if key not in self._posters:
+            self._posters[key] = render_poster(tconst, width)
+        return self._posters[key]
+
+    def count(self, url_class):
+        with self._lock:
+            self.requests[url_class] = self.requests.get(url_class, 0) + 1
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(port=0, catalog_path=DEFAULT_CATALOG, latency=0.0, jitter=0.0, seed=0, capacity=None):
+    """Start a stand-in server on a background thread and return it (see server.base_url)"""
+    server = StandinServer(('127.0.0.1', port), catalog_path, latency, jitter, seed, capacity)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of delay added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds of random delay')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the jitter')
+    parser.add_argument('--capacity', type=int, help='answer 429 beyond this many concurrent requests')
+    parser.add_argument('--save-pages', metavar='DIR', help='write the parser benchmark fixture pages and exit')
+    args = parser.parse_args()
+
+    if args.save_pages:
+        save_pages(args.save_pages, args.catalog)
+        raise SystemExit(0)
+
+    server = StandinServer(('127.0.0.1', args.port), args.catalog, args.latency, args.jitter, args.seed, args.capacity)
+    print(f"Stand-in IMDb serving on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,204 @@
+"""Bulk recommendation mode: one query per input line in, one JSON result per line out.
+
+Input lines are either JSON objects ({"genres": ["action", "drama"], "content_type": "M", "limit": 10})
+or the short form "action, drama | M | 10" (content type and limit optional). Blank lines and lines
+starting with # are skipped.
+"""
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+
+class FetchMemo:
+    """Batch-wide URL memo: concurrent and repeated fetches of one URL share a single upstream call.
+
+    Finished bodies are kept in a bounded LRU so a long batch does not hold every page in memory,
+    and for at most `ttl` seconds when one is given (long-running services).
+    """
+
+    def __init__(self, max_items=2048, ttl=None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._done = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, load):
+        body, future, owner = self.claim(url)
+        if future is None:
+            return body
+        if not owner:
+            return future.result()
+
+        try:
+            body = load()
+        except BaseException as e:
+            self.settle(url, future, error=e)
+            raise
+        self.settle(url, future, body)
+        return body
+
+    def claim(self, url):
+        """(body, None, False) when a finished body is stored, else (None, future, owner).
+
+        The one owner must load the URL and settle() the future; everyone else waits on it (the
+        async engine awaits it through asyncio.wrap_future instead of blocking).
+        """
+        with self._lock:
+            if url in self._done:
+                expires, body = self._done[url]
+                if expires is None or expires > time.monotonic():
+                    self._done.move_to_end(url)
+                    self.hits += 1
+                    return body, None, False
+                del self._done[url]
+            future = self._inflight.get(url)
+            owner = future is None
+            if owner:
+                future = self._inflight[url] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None, future, owner
+
+    def settle(self, url, future, body=None, error=None):
+        """Finish an owned load: keep the body (nothing on error) and wake the waiters"""
+        with self._lock:
+            del self._inflight[url]
+            if error is None:
+                self._done[url] = (None if self.ttl is None else time.monotonic() + self.ttl, body)
+                while len(self._done) > self.max_items:
+                    self._done.popitem(last=False)
+        if error is None:
+            future.set_result(body)
+        else:
+            future.set_exception(error)
+
+    def forget(self, matches):
+        """Drop finished entries whose key matches (in-flight loads are left to finish)"""
+        with self._lock:
+            for key in [key for key in self._done if matches(key)]:
+                del self._done[key]
+
+
+def parse_query(line, default_limit=10):
+    """(genres, content_type, limit) for an input line, or None for blank/comment lines"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line.startswith('{'):
+        data = json.loads(line)
+        genres = data['genres']
+        if isinstance(genres, str):
+            genres = genres.split(',')
+        content_type = data.get('content_type', 'B')
+        limit = data.get('limit', default_limit)
+    else:
+        fields = [f.strip() for f in line.split('|')]
+        genres = re.split(r',|\s+and\s+', fields[0])
+        content_type = fields[1] if len(fields) > 1 and fields[1] else 'B'
+        limit = int(fields[2]) if len(fields) > 2 and fields[2] else default_limit
+
+    genres = tuple(sorted({g.strip().lower() for g in genres if g.strip()}))
+    return genres, content_type.strip().upper(), int(limit)
+
+
+def run_bulk(recommender, lines, out, workers=4, default_limit=10, report=sys.stderr, window=None,
+             max_answers=1024):
+    """Answer the queries in `lines` as they are read, writing one JSON line to `out` as each finishes.
+
+    At most `window` queries (default 2 * workers) are in flight, so reading stdin never runs ahead
+    of the workers. Identical queries (after normalising genre order and case) run once while in
+    flight, and the last `max_answers` answers are reused for repeats. Returns the stats.
+    """
+    memo = recommender.fetch_memo = FetchMemo()
+    upstream_before = recommender.upstream_requests
+    searches_before = dict(recommender.planner.stats)
+    start = time.perf_counter()
+
+    slots = threading.BoundedSemaphore(window or 2 * workers)
+    lock = threading.Lock()
+    waiting = {}  # query -> line numbers waiting for it
+    answers = OrderedDict()  # query -> finished record, most recent last
+    counts = {'queries': 0, 'unique_queries': 0}
+
+    def write(record, numbers):
+        for number in numbers:
+            out.write(json.dumps(dict(record, line=number), ensure_ascii=False) + '\n')
+        out.flush()
+
+    def answer(query):
+        genres, content_type, limit = query
+        query_start = time.perf_counter()
+        results = recommender.recommend(list(genres), content_type, limit)
+        return results, time.perf_counter() - query_start
+
+    def finish(query, future):
+        genres, content_type, limit = query
+        record = {'query': {'genres': list(genres), 'content_type': content_type, 'limit': limit}}
+        try:
+            results, elapsed = future.result()
+            record.update(results=results, elapsed_ms=round(elapsed * 1000, 1))
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+        try:
+            with lock:
+                answers[query] = record
+                while len(answers) > max_answers:
+                    answers.popitem(last=False)
+                write(record, waiting.pop(query))
+        finally:
+            slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for number, line in enumerate(lines, 1):
+                try:
+                    query = parse_query(line, default_limit)
+                except (ValueError, KeyError) as e:
+                    with lock:
+                        write({'error': f"Unparseable query: {e}"}, [number])
+                    continue
+                if query is None:
+                    continue
+                with lock:
+                    counts['queries'] += 1
+                    if query in answers:
+                        answers.move_to_end(query)
+                        write(answers[query], [number])
+                        continue
+                    if query in waiting:
+                        waiting[query].append(number)
+                        continue
+                    waiting[query] = [number]
+                    counts['unique_queries'] += 1
+                slots.acquire()
+                executor.submit(answer, query).add_done_callback(partial(finish, query))
+    finally:
+        recommender.fetch_memo = None
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'queries': counts['queries'],
+        'unique_queries': counts['unique_queries'],
+        'seconds': round(elapsed, 3),
+        'queries_per_second': round(counts['queries'] / elapsed, 2) if elapsed else None,
+        'upstream_requests': recommender.upstream_requests - upstream_before,
+        'shared_fetches': memo.hits,
+        'searches': {k: v - searches_before[k] for k, v in recommender.planner.stats.items()},
+    }
+    if report:
+        print(f"📊 {stats['queries']} queries ({stats['unique_queries']} unique) in {stats['seconds']}s, "
+              f"{stats['queries_per_second']} queries/s, {stats['upstream_requests']} upstream requests, "
+              f"{stats['shared_fetches']} fetches shared across queries, "
+              f"{stats['searches']['upstream']} search pages downloaded for {stats['searches']['requested']} naive searches",
+              file=report)
+    return stats
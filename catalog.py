@@ -0,0 +1,223 @@
+"""Offline title catalog built from IMDb's bulk datasets (https://datasets.imdbws.com/).
+
+    python catalog.py build title.basics.tsv.gz title.ratings.tsv.gz ~/.cache/imdb-recommender/catalog
+    python catalog.py query ~/.cache/imdb-recommender/catalog action,drama M
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+
+from ranking import Ranker, popcount32
+
+IMDB_GENRES = [
+    'Action', 'Adult', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Documentary', 'Drama',
+    'Family', 'Fantasy', 'Film-Noir', 'Game-Show', 'History', 'Horror', 'Music', 'Musical', 'Mystery', 'News',
+    'Reality-TV', 'Romance', 'Sci-Fi', 'Short', 'Sport', 'Talk-Show', 'Thriller', 'War', 'Western'
+]
+GENRE_BITS = {genre.lower(): 1 << i for i, genre in enumerate(IMDB_GENRES)}
+
+TITLE_TYPES = [
+    'movie', 'tvSeries', 'tvMiniSeries', 'tvMovie', 'tvSpecial', 'short', 'tvShort',
+    'video', 'videoGame', 'tvEpisode', 'tvPilot'
+]
+TITLE_TYPE_CODES = {name: code for code, name in enumerate(TITLE_TYPES)}
+
+# Episodes alone are most of title.basics and never show up in genre searches
+DEFAULT_INCLUDE_TYPES = ('movie', 'tvSeries', 'tvMiniSeries', 'tvMovie', 'tvSpecial')
+
+# Content type letters used by ContentRecommender, matching its title_type search filters
+CONTENT_TYPES = {
+    'M': ('movie',),
+    'S': ('tvSeries', 'tvMiniSeries'),
+    'B': ('movie', 'tvSeries', 'tvMiniSeries'),
+}
+
+COLUMNS = ['tconst', 'year', 'rating', 'votes', 'genres', 'title_type', 'title_idx', 'title_offsets']
+
+
+def _open_tsv(path):
+    """Iterate the data rows of a (optionally gzipped) IMDb TSV as lists of fields"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        f.readline()  # header
+        for line in f:
+            yield line.rstrip('\n').split('\t')
+
+
+def genre_mask(genres):
+    """Bitmask for a list of genre names; accepts IMDb names or search params (e.g. 'sci-fi', 'film noir')"""
+    mask = 0
+    for genre in genres:
+        key = genre.lower().replace(' ', '-')
+        if key not in GENRE_BITS:
+            raise ValueError(f"Unknown IMDb genre {genre!r}")
+        mask |= GENRE_BITS[key]
+    return mask
+
+
+class OfflineCatalog:
+    """Columnar, memory-mappable store of IMDb titles answering genre searches without the network"""
+
+    def __init__(self, columns, titles_blob, meta=None):
+        self.tconst = columns['tconst']
+        self.year = columns['year']
+        self.rating = columns['rating']
+        self.votes = columns['votes']
+        self.genres = columns['genres']
+        self.title_type = columns['title_type']
+        self.title_idx = columns['title_idx']
+        self.title_offsets = columns['title_offsets']
+        self.titles_blob = titles_blob
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.tconst)
+
+    @classmethod
+    def build(cls, basics_path, ratings_path, include_types=DEFAULT_INCLUDE_TYPES):
+        """Stream-load title.basics and title.ratings into compact columns"""
+        ratings = {}
+        for row in _open_tsv(ratings_path):
+            ratings[int(row[0][2:])] = (float(row[1]), int(row[2]))
+
+        include = {TITLE_TYPE_CODES[t] for t in include_types}
+        tconst, year, rating, votes = array('I'), array('h'), array('f'), array('I')
+        genres, title_type, title_idx = array('I'), array('B'), array('I')
+        interned = {}
+        for row in _open_tsv(basics_path):
+            code = TITLE_TYPE_CODES.get(row[1])
+            if code not in include:
+                continue
+
+            number = int(row[0][2:])
+            title = row[2]
+            title_rating, title_votes = ratings.get(number, (float('nan'), 0))
+            tconst.append(number)
+            year.append(int(row[5]) if row[5] != '\\N' else 0)
+            rating.append(title_rating)
+            votes.append(title_votes)
+            genres.append(sum(GENRE_BITS.get(g.lower(), 0) for g in row[8].split(',')) if row[8] != '\\N' else 0)
+            title_type.append(code)
+            title_idx.append(interned.setdefault(title, len(interned)))
+
+        # Interned titles live in one UTF-8 blob addressed by offsets
+        encoded = [title.encode('utf-8') for title in interned]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(e) for e in encoded])
+        columns = {
+            'tconst': np.frombuffer(tconst, dtype=np.uint32),
+            'year': np.frombuffer(year, dtype=np.int16),
+            'rating': np.frombuffer(rating, dtype=np.float32),
+            'votes': np.frombuffer(votes, dtype=np.uint32),
+            'genres': np.frombuffer(genres, dtype=np.uint32),
+            'title_type': np.frombuffer(title_type, dtype=np.uint8),
+            'title_idx': np.frombuffer(title_idx, dtype=np.uint32),
+            'title_offsets': offsets,
+        }
+        meta = {'built_at': time.time(), 'titles': len(tconst), 'unique_titles': len(encoded),
+                'genres': IMDB_GENRES, 'title_types': TITLE_TYPES}
+        return cls(columns, np.frombuffer(b''.join(encoded), dtype=np.uint8), meta)
+
+    def save(self, directory):
+        """Write the snapshot as one .npy file per column plus the title blob"""
+        os.makedirs(directory, exist_ok=True)
+        for name in COLUMNS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        self.titles_blob.tofile(os.path.join(directory, 'titles.blob'))
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f)
+
+    @classmethod
+    def load(cls, directory):
+        """Memory-map a saved snapshot; nothing is read until a column is touched"""
+        columns = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in COLUMNS}
+        blob_path = os.path.join(directory, 'titles.blob')
+        blob = np.memmap(blob_path, dtype=np.uint8, mode='r') if os.path.getsize(blob_path) else np.zeros(0, np.uint8)
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        return cls(columns, blob, meta)
+
+    def title_at(self, i):
+        """Primary title of the row at index i"""
+        idx = self.title_idx[i]
+        start, end = int(self.title_offsets[idx]), int(self.title_offsets[idx + 1])
+        return self.titles_blob[start:end].tobytes().decode('utf-8')
+
+    def tconst_at(self, i):
+        return f"tt{int(self.tconst[i]):07d}"
+
+    def matching(self, genres, content_type='B', min_votes=1000):
+        """Row indices of titles having any of the genres, of the content type and with enough votes"""
+        selected = (self.genres & np.uint32(genre_mask(genres))) != 0
+        selected &= np.isin(self.title_type, [TITLE_TYPE_CODES[t] for t in CONTENT_TYPES[content_type]])
+        if min_votes:
+            selected &= self.votes >= min_votes
+        return np.flatnonzero(selected)
+
+    def search(self, genres, content_type='B', limit=10, min_votes=1000, ranker=None, base_url="https://www.imdb.com"):
+        """Top titles for the genres as ContentRecommender result dicts, scored by `ranker` (raw rating by default)"""
+        ranker = ranker or Ranker('rating')
+        rows = self.matching(genres, content_type, min_votes)
+        rows = rows[~np.isnan(self.rating[rows])]
+        if len(rows) == 0:
+            return []
+
+        votes = self.votes[rows]
+        overlaps = popcount32(self.genres[rows] & np.uint32(genre_mask(genres)))
+        scores = ranker.score(self.rating[rows], votes, overlaps)
+        top = ranker.top_indices(scores, votes, limit)
+
+        results = []
+        for i in top:
+            record = self.record(rows[i], base_url)
+            record['score'] = round(float(scores[i]), 3)
+            results.append(record)
+        return results
+
+    def record(self, i, base_url="https://www.imdb.com"):
+        tconst = self.tconst_at(i)
+        return {
+            'tconst': tconst,
+            'title': self.title_at(i),
+            'year': str(int(self.year[i])) if self.year[i] else "N/A",
+            'rating': f"{float(self.rating[i]):.1f}",
+            'votes': int(self.votes[i]),
+            'synopsis': None,
+            'link': f"{base_url}/title/{tconst}/",
+            'image_url': None,
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='build a snapshot from the IMDb TSV dumps')
+    build.add_argument('basics')
+    build.add_argument('ratings')
+    build.add_argument('directory')
+    query = commands.add_parser('query', help='run a genre search against a snapshot')
+    query.add_argument('directory')
+    query.add_argument('genres', help='comma separated, e.g. action,drama')
+    query.add_argument('content_type', nargs='?', default='B', choices=sorted(CONTENT_TYPES))
+    query.add_argument('--limit', type=int, default=10)
+    query.add_argument('--min-votes', type=int, default=1000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'build':
+        catalog = OfflineCatalog.build(args.basics, args.ratings)
+        catalog.save(args.directory)
+        print(f"Built {len(catalog)} titles in {time.perf_counter() - start:.1f}s -> {args.directory}")
+    else:
+        catalog = OfflineCatalog.load(args.directory)
+        results = catalog.search(args.genres.split(','), args.content_type, args.limit, args.min_votes)
+        elapsed = (time.perf_counter() - start) * 1000
+        for rec in results:
+            print(f"{rec['rating']}  {rec['title']} ({rec['year']})  {rec['tconst']}")
+        print(f"{len(results)} results in {elapsed:.1f} ms", file=sys.stderr)
@@ -0,0 +1,129 @@
+"""Daemon mode: one warm ContentRecommender behind a Unix domain socket.
+
+Clients (see recommend_client.py) send one JSON object per line and get one JSON line back:
+
+    {"op": "recommend", "genres": ["action", "drama"], "content_type": "M", "limit": 10, "thumbnails": false}
+    {"op": "recommend", "genres": ["comedy"], "user": "alice"}      (personalized, needs --personalize)
+    {"op": "feedback", "user": "alice", "tconst": "tt0468569", "kind": "rated", "value": 8}
+    {"op": "similar", "tconst": "tt0468569", "k": 10}
+    {"op": "lookup", "q": "the drak kni", "kind": "title", "k": 10}   (typo-tolerant autocomplete)
+    {"op": "stats"} / {"op": "ping"} / {"op": "shutdown"}
+
+Responses are {"ok": true, ...} or {"ok": false, "error": "..."}. The imports, connection pools,
+caches and similarity index are paid for once when the daemon starts instead of on every
+invocation, and identical queries share answers exactly like the HTTP service.
+"""
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from recommend_client import DEFAULT_SOCKET_PATH
+from service import RecommenderEndpoints
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Answers requests on one client connection until it closes"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            start = time.perf_counter()
+            op = 'unknown'
+            try:
+                request = json.loads(line)
+                op = request.get('op', 'recommend')
+                handler = self.server.ops.get(op)
+                if handler is None:
+                    raise ValueError(f"Unknown op {op!r}")
+                response = dict(handler(request), ok=True)
+            except (KeyError, ValueError) as e:
+                response = {'ok': False, 'error': f"Bad request: {e}"}
+            except Exception as e:
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            elapsed = time.perf_counter() - start
+            response['seconds'] = round(elapsed, 6)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            self.server.latency.record(op, elapsed)
+
+
+class RecommendationDaemon(RecommenderEndpoints, socketserver.ThreadingUnixStreamServer):
+    """Threaded Unix socket server sharing one ContentRecommender between all clients"""
+    daemon_threads = True
+
+    def __init__(self, path, recommender, result_ttl=60, fetch_ttl=300):
+        self._claim(path)
+        super().__init__(path, DaemonHandler)
+        os.chmod(path, 0o600)
+        self.path = path
+        self.share_recommender(recommender, result_ttl, fetch_ttl)
+        self.ops = {
+            'recommend': self.handle_recommend,
+            'feedback': self.handle_feedback,
+            'similar': self.handle_similar,
+            'lookup': self.handle_lookup,
+            'stats': self.handle_stats,
+            'ping': lambda request: {'pid': os.getpid()},
+            'shutdown': self.handle_shutdown,
+        }
+
+    @staticmethod
+    def _claim(path):
+        """Remove a socket left behind by a dead daemon; refuse to start next to a live one"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if not os.path.exists(path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        finally:
+            probe.close()
+
+    def handle_recommend(self, request):
+        answer = super().handle_recommend(request)
+        if not request.get('thumbnails'):
+            return answer
+        # Cached answers are shared between clients, so add thumbnails to copies
+        results = [dict(item) for item in answer['results']]
+        thumbnails = self.recommender.thumbnails
+        thumbnails.prefetch(item['image_url'] for item in results)
+        for item in results:
+            item['thumbnail'] = thumbnails.get(item['image_url']) if item['image_url'] else None
+        return dict(answer, results=results)
+
+    def handle_stats(self, request):
+        return dict(super().handle_stats(request), pid=os.getpid())
+
+    def handle_shutdown(self, request):
+        # shutdown() waits for serve_forever to return, so it cannot run on a handler thread's own stack
+        threading.Thread(target=self.shutdown, daemon=True).start()
+        return {'stopping': True}
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def run_daemon(recommender, path=DEFAULT_SOCKET_PATH, result_ttl=60):
+    """Serve on a Unix socket in the foreground until interrupted or asked to shut down"""
+    daemon = RecommendationDaemon(path, recommender, result_ttl=result_ttl)
+    print(f"🎬 Recommender daemon (pid {os.getpid()}) listening on {path}", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+        recommender.fetch_memo = None
+        recommender.close()
@@ -0,0 +1,309 @@
+import json
+import re
+
+try:
+    from lxml import html as lxml_html
+    from lxml.cssselect import CSSSelector
+except ImportError:  # optional fast DOM backend
+    lxml_html = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # optional fast DOM backend
+    HTMLParser = None
+
+# Selectors shared by every DOM backend
+ITEM_SELECTOR = '.ipc-metadata-list-summary-item'
+TITLE_SELECTOR = '.ipc-title__text'
+LINK_SELECTOR = 'a.ipc-title-link-wrapper'
+YEAR_SELECTOR = '.dli-title-metadata-item'
+RATING_SELECTOR = '.ipc-rating-star'
+VOTES_SELECTOR = '.ipc-rating-star--voteCount'
+IMAGE_SELECTOR = 'img.ipc-image'
+SYNOPSIS_SELECTORS = [
+    '.ipc-html-content-inner-div',
+    '.plot_summary .summary_text',
+    '.canwrap .plotxl'
+]
+
+NEXT_DATA_RE = re.compile(rb'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', re.S)
+
+
+class Extractor:
+    """Turns raw IMDb page bodies into plain data.
+
+    parse_search returns one dict per result item with title, year, rating, votes, link (the raw
+    href), image_url and, where the page reports them, genres (None otherwise); parse_synopsis
+    returns the raw plot text. Both return an empty list / None when the page does not contain
+    what the backend looks for, so backends can be chained.
+    """
+    name = None
+
+    def parse_search(self, body):
+        raise NotImplementedError
+
+    def parse_synopsis(self, body):
+        raise NotImplementedError
+
+
+class SoupExtractor(Extractor):
+    """BeautifulSoup backend, the slowest but always available"""
+    name = 'soup'
+
+    def __init__(self, parser='html.parser'):
+        self.parser = parser
+
+    def _soup(self, body):
+        # Imported on first use: with 'auto' most pages are answered by the JSON backend before this one
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(body, self.parser)
+
+    def parse_search(self, body):
+        results = []
+        soup = self._soup(body)
+        for item in soup.select(ITEM_SELECTOR):
+            title_elem = item.select_one(TITLE_SELECTOR)
+            link_elem = item.select_one(LINK_SELECTOR)
+            if not title_elem or not link_elem:
+                continue
+
+            year_elem = item.select_one(YEAR_SELECTOR)
+            rating_elem = item.select_one(RATING_SELECTOR)
+            votes_elem = item.select_one(VOTES_SELECTOR)
+            image_elem = item.select_one(IMAGE_SELECTOR)
+            results.append({
+                'title': title_elem.get_text(strip=True),
+                'year': year_elem.get_text(strip=True) if year_elem else "N/A",
+                'rating': rating_elem.get_text(strip=True).split()[0] if rating_elem else "N/A",
+                'votes': votes_elem.get_text(strip=True) if votes_elem else None,
+                'link': link_elem['href'],
+                'image_url': image_elem.get('src') if image_elem else None,
+            })
+        return results
+
+    def parse_synopsis(self, body):
+        soup = self._soup(body)
+        for selector in SYNOPSIS_SELECTORS:
+            synopsis_elem = soup.select_one(selector)
+            if synopsis_elem:
+                return synopsis_elem.get_text(strip=True)
+        return None
+
+
+class LxmlExtractor(Extractor):
+    """lxml backend using the same CSS selectors, compiled once to XPath"""
+    name = 'lxml'
+
+    def __init__(self):
+        if lxml_html is None:
+            raise ImportError("The lxml extractor requires lxml and cssselect: pip install lxml cssselect")
+        self.item = CSSSelector(ITEM_SELECTOR)
+        self.title = CSSSelector(TITLE_SELECTOR)
+        self.link = CSSSelector(LINK_SELECTOR)
+        self.year = CSSSelector(YEAR_SELECTOR)
+        self.rating = CSSSelector(RATING_SELECTOR)
+        self.votes = CSSSelector(VOTES_SELECTOR)
+        self.image = CSSSelector(IMAGE_SELECTOR)
+        self.synopsis = [CSSSelector(selector) for selector in SYNOPSIS_SELECTORS]
+
+    @staticmethod
+    def _first(selector, node):
+        found = selector(node)
+        return found[0] if found else None
+
+    @staticmethod
+    def _text(node):
+        return ''.join(part.strip() for part in node.itertext())
+
+    def parse_search(self, body):
+        results = []
+        root = lxml_html.fromstring(body)
+        for item in self.item(root):
+            title_elem = self._first(self.title, item)
+            link_elem = self._first(self.link, item)
+            if title_elem is None or link_elem is None:
+                continue
+
+            year_elem = self._first(self.year, item)
+            rating_elem = self._first(self.rating, item)
+            votes_elem = self._first(self.votes, item)
+            image_elem = self._first(self.image, item)
+            results.append({
+                'title': self._text(title_elem),
+                'year': self._text(year_elem) if year_elem is not None else "N/A",
+                'rating': self._text(rating_elem).split()[0] if rating_elem is not None else "N/A",
+                'votes': self._text(votes_elem) if votes_elem is not None else None,
+                'link': link_elem.get('href'),
+                'image_url': image_elem.get('src') if image_elem is not None else None,
+            })
+        return results
+
+    def parse_synopsis(self, body):
+        root = lxml_html.fromstring(body)
+        for selector in self.synopsis:
+            synopsis_elem = self._first(selector, root)
+            if synopsis_elem is not None:
+                return self._text(synopsis_elem)
+        return None
+
+
+class SelectolaxExtractor(Extractor):
+    """selectolax (Lexbor/Modest) backend using the same CSS selectors"""
+    name = 'selectolax'
+
+    def __init__(self):
+        if HTMLParser is None:
+            raise ImportError("The selectolax extractor requires selectolax: pip install selectolax")
+
+    @staticmethod
+    def _text(node):
+        return node.text(strip=True)
+
+    def parse_search(self, body):
+        results = []
+        tree = HTMLParser(body)
+        for item in tree.css(ITEM_SELECTOR):
+            title_elem = item.css_first(TITLE_SELECTOR)
+            link_elem = item.css_first(LINK_SELECTOR)
+            if title_elem is None or link_elem is None:
+                continue
+
+            year_elem = item.css_first(YEAR_SELECTOR)
+            rating_elem = item.css_first(RATING_SELECTOR)
+            votes_elem = item.css_first(VOTES_SELECTOR)
+            image_elem = item.css_first(IMAGE_SELECTOR)
+            results.append({
+                'title': self._text(title_elem),
+                'year': self._text(year_elem) if year_elem is not None else "N/A",
+                'rating': self._text(rating_elem).split()[0] if rating_elem is not None else "N/A",
+                'votes': self._text(votes_elem) if votes_elem is not None else None,
+                'link': link_elem.attributes.get('href'),
+                'image_url': image_elem.attributes.get('src') if image_elem is not None else None,
+            })
+        return results
+
+    def parse_synopsis(self, body):
+        tree = HTMLParser(body)
+        for selector in SYNOPSIS_SELECTORS:
+            synopsis_elem = tree.css_first(selector)
+            if synopsis_elem is not None:
+                return self._text(synopsis_elem)
+        return None
+
+
+class NextDataExtractor(Extractor):
+    """Reads the __NEXT_DATA__ JSON blob IMDb embeds in every page, without building a DOM"""
+    name = 'nextdata'
+
+    @staticmethod
+    def _load(body):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        match = NEXT_DATA_RE.search(body)
+        if not match:
+            return None
+        try:
+            return json.loads(match.group(1))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _dig(data, *path):
+        for key in path:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+
+    def parse_search(self, body):
+        data = self._load(body)
+        items = self._dig(data, 'props', 'pageProps', 'searchResults', 'titleResults', 'titleListItems')
+        if not items:
+            return []
+
+        results = []
+        for item in items:
+            if not item.get('titleId') or not item.get('titleText'):
+                continue
+            year = item.get('releaseYear')
+            if isinstance(year, dict):
+                year = year.get('year')
+            rating = self._dig(item, 'ratingSummary', 'aggregateRating')
+            results.append({
+                'title': item['titleText'],
+                'year': str(year) if year else "N/A",
+                'rating': str(rating) if rating is not None else "N/A",
+                'votes': self._dig(item, 'ratingSummary', 'voteCount'),
+                'link': f"/title/{item['titleId']}/",
+                'image_url': self._dig(item, 'primaryImage', 'url'),
+                'genres': self._genres(item.get('genres')),
+            })
+        return results
+
+    @staticmethod
+    def _genres(genres):
+        """Genre names from ["Drama"] or {"genres": [{"text": "Drama"}]} (None when absent)"""
+        if isinstance(genres, dict):
+            genres = genres.get('genres')
+        if not isinstance(genres, list):
+            return None
+        return [g.get('text') if isinstance(g, dict) else g for g in genres]
+
+    def parse_synopsis(self, body):
+        data = self._load(body)
+        return self._dig(data, 'props', 'pageProps', 'aboveTheFoldData', 'plot', 'plotText', 'plainText')
+
+
+class ChainExtractor(Extractor):
+    """Tries several backends in order and returns the first non-empty result"""
+    name = 'auto'
+
+    def __init__(self, backends):
+        self.backends = backends
+
+    def parse_search(self, body):
+        for backend in self.backends:
+            results = backend.parse_search(body)
+            if results:
+                return results
+        return []
+
+    def parse_synopsis(self, body):
+        for backend in self.backends:
+            synopsis = backend.parse_synopsis(body)
+            if synopsis:
+                return synopsis
+        return None
+
+
+EXTRACTORS = {
+    'soup': SoupExtractor,
+    'lxml': LxmlExtractor,
+    'selectolax': SelectolaxExtractor,
+    'nextdata': NextDataExtractor,
+}
+
+
+def available_extractors():
+    """Names of the backends whose dependencies are installed"""
+    names = ['nextdata']
+    if HTMLParser is not None:
+        names.append('selectolax')
+    if lxml_html is not None:
+        names.append('lxml')
+    names.append('soup')
+    return names
+
+
+def get_extractor(name='auto'):
+    """Build an extractor by name; 'auto' chains embedded JSON, the fastest DOM backend, then BeautifulSoup"""
+    if name != 'auto':
+        return EXTRACTORS[name]()
+
+    backends = [NextDataExtractor()]
+    if HTMLParser is not None:
+        backends.append(SelectolaxExtractor())
+    elif lxml_html is not None:
+        backends.append(LxmlExtractor())
+    backends.append(SoupExtractor())
+    return ChainExtractor(backends)
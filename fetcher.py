@@ -0,0 +1,174 @@
+"""Upstream fetch layer: sized keep-alive pools, compression, adaptive concurrency, retries and rate limits.
+
+Every GET from the threaded engine goes through Fetcher.get(), which
+
+  * waits for a per-host token bucket (rate limit, optional)
+  * takes a slot from the AIMD concurrency limiter, which halves the number of requests in flight
+    on 429/5xx/timeouts/latency spikes and adds one back per healthy round trip
+  * retries connection errors, timeouts, 429 and 5xx with full-jitter exponential backoff,
+    honouring Retry-After
+"""
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from metrics import NullMetrics
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+# Statuses that mean "slow down", as opposed to an unlucky request
+CONGESTION_STATUSES = frozenset((429, 503))
+
+
+class AIMDLimiter:
+    """Additive-increase/multiplicative-decrease cap on requests in flight (TCP congestion control style).
+
+    Each healthy response grows the limit by 1/limit (about +1 per round of requests); congestion
+    multiplies it by `backoff`, at most once per `cooldown` seconds so one burst of failures only
+    counts once. A response slower than `latency_factor` times the smoothed latency counts as
+    congestion too.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=32, backoff=0.5, latency_factor=3.0, cooldown=1.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.smoothed_latency = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency=None, congested=False):
+        """Give the slot back and adapt the limit to how the request went"""
+        with self._cond:
+            self.in_flight -= 1
+            if latency is not None and not congested:
+                if self.smoothed_latency is None:
+                    self.smoothed_latency = latency
+                congested = latency > self.latency_factor * self.smoothed_latency
+                self.smoothed_latency += 0.1 * (latency - self.smoothed_latency)
+
+            now = time.monotonic()
+            if congested:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def backoff_delay(attempt, base=0.25, cap=8.0, retry_after=None):
+    """Full-jitter exponential backoff for retry `attempt` (1, 2, ...); Retry-After wins when given"""
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), cap * 4)
+        except ValueError:
+            pass  # an HTTP date; fall back to our own schedule
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class Fetcher:
+    """Shared upstream GET for all executor threads (see module docstring)"""
+
+    def __init__(self, headers, max_in_flight=10, initial_in_flight=None, rate_limit=None, burst=None,
+                 retries=3, connect_timeout=3.05, metrics=None):
+        self.retries = retries
+        self.connect_timeout = connect_timeout
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.metrics = metrics or NullMetrics()
+        self.limiter = AIMDLimiter(initial=initial_in_flight or max(1, max_in_flight // 2), maximum=max_in_flight)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        # Let the server compress pages; gzip/deflate always, br/zstd when their decoders are installed
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        # One keep-alive connection per possible in-flight request, so none is opened and thrown away
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_in_flight, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def bucket(self, url):
+        """The token bucket of a URL's host (None without a rate limit)"""
+        if not self.rate_limit:
+            return None
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_limit, self.burst)
+            return self._buckets[host]
+
+    def get(self, url, timeout, headers=None, url_class='other'):
+        """GET with rate limiting, adaptive concurrency and retries; returns the final Response"""
+        bucket = self.bucket(url)
+        for attempt in range(self.retries + 1):
+            if bucket:
+                wait = bucket.reserve()
+                if wait:
+                    time.sleep(wait)
+
+            self.limiter.acquire()
+            start = time.perf_counter()
+            response, latency, congested = None, None, False
+            try:
+                response = self.session.get(url, headers=headers, timeout=(self.connect_timeout, timeout))
+                latency = time.perf_counter() - start
+                congested = response.status_code in RETRY_STATUSES
+            except requests.RequestException as e:
+                # Only network trouble is worth retrying (and means congestion); InvalidSchema,
+                # TooManyRedirects, decoding errors etc. fail straight away
+                congested = isinstance(e, (requests.ConnectionError, requests.Timeout))
+                if not congested or attempt == self.retries:
+                    raise
+                self.metrics.retry(url_class, type(e).__name__)
+            finally:
+                # Whatever happened, the slot goes back
+                self.limiter.release(latency, congested=congested)
+
+            if response is None:
+                time.sleep(backoff_delay(attempt + 1))
+                continue
+            status = response.status_code
+            self.metrics.concurrency(self.limiter.limit)
+            if status not in RETRY_STATUSES or attempt == self.retries:
+                return response
+            self.metrics.retry(url_class, str(status))
+            retry_after = response.headers.get('Retry-After') if status in CONGESTION_STATUSES else None
+            response.close()
+            time.sleep(backoff_delay(attempt + 1, retry_after=retry_after))
@@ -0,0 +1,385 @@
+"""Typo-tolerant lookup and autocomplete over genres (with aliases) and every title seen.
+
+Keys are normalized (case, accents and punctuation folded, so "Film-Noir" == "film noir") and
+split into words. The word vocabulary is kept sorted, a flattened prefix trie: the words starting
+with a prefix are one bisect away. Each word has a postings array of the entries containing it,
+kept in popularity order, and a character-trigram index over the vocabulary finds the candidates
+for a misspelled word, which are then confirmed by edit distance.
+
+A query matches the entries that contain every query word, either exactly, as a prefix (the last
+word, while typing) or within a small edit distance. Candidates are visited most popular first and
+the scan stops as soon as nothing left can beat the current top k.
+
+Genres are also kept in a tiny index of their own, so genre lookups (resolve_genre, kind='genre')
+never scan the trigrams and postings of the title vocabulary.
+"""
+import bisect
+import difflib
+import heapq
+import math
+import os
+import re
+import threading
+import unicodedata
+from array import array
+
+import numpy as np
+
+from records import tconst_number
+
+GENRE, TITLE = 0, 1
+KIND_NAMES = ('genre', 'title')
+# Genres outrank titles whenever both match
+GENRE_POPULARITY = 100.0
+# Penalties added to an entry's popularity-based score
+PREFIX_PENALTY = 0.25
+EDIT_PENALTY = 1.5
+MISSING_WORD_PENALTY = 4.0
+# Bounds that keep short prefixes and common words cheap
+MAX_PREFIX_WORDS = 64
+MAX_CANDIDATES = 2000
+COMMON_GRAM = 5000
+# Shorter genre inputs are rejected rather than guessed at
+MIN_GENRE_CHARS = 3
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """'Amélie (2001)' -> 'amelie 2001', 'Film-Noir' -> 'film noir'"""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return ' '.join(WORD_RE.findall(folded))
+
+
+def trigrams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(word):
+    """Typos tolerated in a word of this length"""
+    return 0 if len(word) <= 2 else 1 if len(word) <= 5 else 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent swaps count once), or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class LookupIndex:
+    """Genre and title lookup index (see module docstring); persisted as .npz like the similarity index"""
+
+    def __init__(self, path=None, genre_index=True):
+        self.path = path
+        # Genres only, rebuilt from the genre entries on load
+        self.genre_index = LookupIndex(genre_index=False) if genre_index else None
+        # Entries: kind, tconst (0 for genres), popularity, display name and word ids
+        self.kinds = array('B')
+        self.values = array('q')
+        self.popularity = array('f')
+        self.displays = []
+        self.entry_words = []
+        self.entry_of = {}
+        # Vocabulary
+        self.words = []
+        self.word_id = {}
+        self.sorted_words = []
+        self.postings = []
+        self.word_best = array('f')
+        self.grams = {}
+        self._unsorted = set()
+        self._prefix_words = {}
+        self._lock = threading.RLock()
+        self._unsaved = False
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def _word(self, word):
+        found = self.word_id.get(word)
+        if found is None:
+            found = self.word_id[word] = len(self.words)
+            self.words.append(word)
+            bisect.insort(self.sorted_words, word)
+            self.postings.append(array('I'))
+            self.word_best.append(0.0)
+            for gram in trigrams(word):
+                self.grams.setdefault(gram, array('I')).append(found)
+            self._prefix_words.clear()
+        return found
+
+    def add(self, kind, key, display, popularity=0.0, aliases=()):
+        """Insert or update an entry; `aliases` are further names it is found by"""
+        display = ' '.join(display.split())
+        with self._lock:
+            entry = self.entry_of.get((kind, key))
+            if entry is None:
+                entry = self.entry_of[(kind, key)] = len(self.kinds)
+                self.kinds.append(kind)
+                self.values.append(key if kind == TITLE else 0)
+                self.popularity.append(popularity)
+                self.displays.append(display)
+                self.entry_words.append(())
+            elif popularity > self.popularity[entry] or display != self.displays[entry]:
+                self.popularity[entry] = max(popularity, self.popularity[entry])
+                self.displays[entry] = display
+            else:
+                return entry
+
+            words = set(self.entry_words[entry])
+            for name in (display, *aliases):
+                for word in normalize(name).split():
+                    word = self._word(word)
+                    if word not in words:
+                        words.add(word)
+                        self.postings[word].append(entry)
+            for word in words:
+                self.word_best[word] = max(self.word_best[word], self.popularity[entry])
+                self._unsorted.add(word)
+            self.entry_words[entry] = tuple(words)
+            self._unsaved = True
+            if kind == GENRE and self.genre_index is not None:
+                self.genre_index.add(kind, key, display, popularity, aliases)
+            return entry
+
+    def add_genre(self, name, aliases=()):
+        return self.add(GENRE, name, name, GENRE_POPULARITY, aliases)
+
+    def add_title(self, tconst, title, votes=0):
+        """Index a title; popularity grows with its vote count"""
+        return self.add(TITLE, tconst_number(tconst), title, math.log1p(votes or 0))
+
+    def _postings(self, word):
+        """Entries containing a word, most popular first"""
+        if word in self._unsorted:
+            popularity = self.popularity
+            self.postings[word] = array('I', sorted(self.postings[word], key=lambda e: -popularity[e]))
+            self._unsorted.discard(word)
+        return self.postings[word]
+
+    def _completions(self, prefix):
+        """Ids of the (most popular) vocabulary words starting with prefix"""
+        cached = self._prefix_words.get(prefix)
+        if cached is not None:
+            return cached
+        lo = bisect.bisect_left(self.sorted_words, prefix)
+        hi = bisect.bisect_left(self.sorted_words, prefix + '\U0010ffff', lo)
+        ids = [self.word_id[w] for w in self.sorted_words[lo:hi]]
+        if len(ids) > MAX_PREFIX_WORDS:
+            ids = heapq.nlargest(MAX_PREFIX_WORDS, ids, key=self.word_best.__getitem__)
+        if len(prefix) <= 2:
+            self._prefix_words[prefix] = ids
+        return ids
+
+    def _near(self, token, prefix):
+        """{word id: edits} of vocabulary words within max_edits(token) of it (of their first letters if prefix)"""
+        limit = max_edits(token)
+        if not limit:
+            return {}
+        grams = trigrams(token)
+        if prefix:
+            grams.discard(f"{token[-2:]}$")
+        postings = [self.grams[g] for g in grams if g in self.grams]
+        informative = [p for p in postings if len(p) <= COMMON_GRAM] or postings
+        shared = {}
+        for posting in informative:
+            for word in posting:
+                shared[word] = shared.get(word, 0) + 1
+        needed = max(1, len(informative) - 3 * limit)
+        near = {}
+        for word, count in shared.items():
+            if count < needed:
+                continue
+            text = self.words[word]
+            distance = edit_distance(token, text[:len(token)] if prefix else text, limit)
+            if prefix and distance > limit:
+                distance = edit_distance(token, text, limit)
+            if distance <= limit:
+                near[word] = distance
+        return near
+
+    def _matches(self, token, prefix):
+        """{word id: penalty} for the vocabulary words a query word can stand for"""
+        matches = {}
+        if prefix:
+            for word in self._completions(token):
+                matches[word] = PREFIX_PENALTY
+        exact = self.word_id.get(token)
+        if exact is not None:
+            matches[exact] = 0.0
+        if not matches:
+            matches = {word: EDIT_PENALTY * edits for word, edits in self._near(token, prefix).items()}
+        return matches
+
+    def lookup(self, text, k=10, kind=None, prefix=True):
+        """Best k entries for free text: [{'kind', 'name', 'tconst' (titles), 'score'}], best first.
+
+        With prefix=True the last word may be incomplete (autocomplete); kind limits the results
+        to 'genre' or 'title'.
+        """
+        tokens = normalize(text).split()
+        if not tokens or k <= 0:
+            return []
+        if kind not in (None, *KIND_NAMES):
+            raise ValueError(f"kind must be 'genre' or 'title', not {kind!r}")
+        wanted = None if kind is None else KIND_NAMES.index(kind)
+        if wanted == GENRE and self.genre_index is not None:
+            return self.genre_index.lookup(text, k, kind, prefix)
+        with self._lock:
+            per_token = [self._matches(token, prefix and i == len(tokens) - 1) for i, token in enumerate(tokens)]
+            missing = sum(1 for m in per_token if not m)
+            per_token = [m for m in per_token if m]
+            if not per_token:
+                return []
+
+            # Drive the scan from the query word with the fewest candidate entries
+            per_token.sort(key=lambda m: sum(len(self.postings[w]) for w in m))
+            driver, others = per_token[0], per_token[1:]
+            streams = [((-self.popularity[e], e) for e in self._postings(w)) for w in driver]
+            base_penalty = missing * MISSING_WORD_PENALTY
+
+            best, seen = [], set()
+            for scanned, (negative_popularity, entry) in enumerate(heapq.merge(*streams)):
+                if scanned >= MAX_CANDIDATES or (len(best) == k and -negative_popularity - base_penalty <= best[0][0]):
+                    break
+                if entry in seen or (wanted is not None and self.kinds[entry] != wanted):
+                    continue
+                seen.add(entry)
+                words = self.entry_words[entry]
+                penalty = base_penalty + min(driver[w] for w in words if w in driver)
+                for matches in others:
+                    found = [matches[w] for w in words if w in matches]
+                    if not found:
+                        break
+                    penalty += min(found)
+                else:
+                    score = -negative_popularity - penalty
+                    if len(best) < k:
+                        heapq.heappush(best, (score, -entry))
+                    elif score > best[0][0]:
+                        heapq.heapreplace(best, (score, -entry))
+
+        results = []
+        for score, entry in sorted(best, reverse=True):
+            entry = -entry
+            result = {'kind': KIND_NAMES[self.kinds[entry]], 'name': self.displays[entry], 'score': round(score, 3)}
+            if self.kinds[entry] == TITLE:
+                result['tconst'] = f"tt{self.values[entry]:07d}"
+            results.append(result)
+        return results
+
+    def resolve_genre(self, text):
+        """Canonical genre for a possibly misspelled or aliased one ('comdy', 'Film-Noir', 'scifi').
+
+        Whole words only (no autocomplete), so 'a' or 'the' do not silently become a genre; None
+        when the text is too short or nothing matches well enough. Genres matching equally well are
+        told apart by how much of the text they share ('musicl' is musical rather than music).
+        """
+        typed = normalize(text)
+        if len(typed.replace(' ', '')) < MIN_GENRE_CHARS:
+            return None
+        results = self.lookup(text, 5, kind='genre', prefix=False)
+        if not results or results[0]['score'] <= GENRE_POPULARITY - MISSING_WORD_PENALTY:
+            return None
+        tied = [r['name'] for r in results if r['score'] == results[0]['score']]
+        # max() keeps the first of equal ratios, so the outcome never depends on more than the index
+        return max(tied, key=lambda name: difflib.SequenceMatcher(None, typed, normalize(name)).ratio())
+
+    # --- Persistence ---
+
+    def save(self, path=None):
+        """Persist entries, vocabulary, postings and trigrams; the sorted vocabulary is rebuilt on load"""
+        path = path or self.path
+        # Packed (copied) under the lock, written outside it so lookups and adds carry on meanwhile
+        with self._lock:
+            for word in list(self._unsorted):
+                self._postings(word)
+            gram_keys = list(self.grams)
+            arrays = dict(kinds=np.frombuffer(self.kinds, dtype=np.uint8).copy(),
+                          values=np.frombuffer(self.values, dtype=np.int64).copy(),
+                          popularity=np.frombuffer(self.popularity, dtype=np.float32).copy(),
+                          displays=_pack_strings(self.displays), words=_pack_strings(self.words),
+                          word_best=np.frombuffer(self.word_best, dtype=np.float32).copy(),
+                          **_pack_arrays('entry_words', [array('I', w) for w in self.entry_words]),
+                          **_pack_arrays('postings', self.postings),
+                          gram_keys=_pack_strings(gram_keys),
+                          **_pack_arrays('grams', [self.grams[g] for g in gram_keys]))
+            self._unsaved = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._unsaved = True
+            raise
+
+    def save_if_changed(self):
+        if self.path and self._unsaved:
+            self.save()
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or start an empty one if the file does not exist yet"""
+        index = cls(path)
+        if not os.path.exists(path):
+            return index
+        with np.load(path) as saved:
+            index.kinds = array('B', saved['kinds'].tobytes())
+            index.values = array('q', saved['values'].tobytes())
+            index.popularity = array('f', saved['popularity'].tobytes())
+            index.displays = _unpack_strings(saved['displays'])
+            index.words = _unpack_strings(saved['words'])
+            index.word_best = array('f', saved['word_best'].tobytes())
+            index.entry_words = [tuple(w) for w in _unpack_arrays(saved, 'entry_words')]
+            index.postings = _unpack_arrays(saved, 'postings')
+            index.grams = dict(zip(_unpack_strings(saved['gram_keys']), _unpack_arrays(saved, 'grams')))
+        index.word_id = {word: i for i, word in enumerate(index.words)}
+        index.sorted_words = sorted(index.words)
+        index.entry_of = {(kind, value if kind == TITLE else display): entry for entry, (kind, value, display)
+                          in enumerate(zip(index.kinds, index.values, index.displays))}
+        for entry, kind in enumerate(index.kinds):
+            if kind == GENRE:
+                index.genre_index.add(GENRE, index.displays[entry], index.displays[entry], index.popularity[entry],
+                                      [index.words[w] for w in index.entry_words[entry]])
+        return index
+
+
+def _pack_strings(strings):
+    return np.frombuffer('\n'.join(strings).encode('utf-8'), dtype=np.uint8)
+
+
+def _unpack_strings(packed):
+    text = packed.tobytes().decode('utf-8')
+    return text.split('\n') if text else []
+
+
+def _pack_arrays(name, arrays):
+    """Concatenated uint32 values plus CSR offsets, as npz keyword arguments"""
+    indptr = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(a) for a in arrays], out=indptr[1:])
+    data = np.frombuffer(b''.join(a.tobytes() for a in arrays), dtype=np.uint32)
+    return {f'{name}_data': data, f'{name}_indptr': indptr}
+
+
+def _unpack_arrays(saved, name):
+    data, indptr = saved[f'{name}_data'].tobytes(), saved[f'{name}_indptr'].tolist()
+    arrays = []
+    for lo, hi in zip(indptr, indptr[1:]):
+        column = array('I')
+        column.frombytes(data[lo * 4:hi * 4])
+        arrays.append(column)
+    return arrays
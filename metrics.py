@@ -0,0 +1,222 @@
+"""Optional hot-path instrumentation for ContentRecommender.
+
+Pass ContentRecommender(metrics=Metrics()) to collect per-stage timings, upstream latency per URL
+class (search/detail/image), bytes downloaded, cache hit ratios and error counts by type. The
+default NullMetrics does nothing, so an uninstrumented recommender only pays for a method call.
+
+Stages: query, search_pages, rank, details, parse_search, parse_detail, thumbnail_render.
+
+Custom hooks: subclass NullMetrics (or Metrics) and override span/request/cache/error, or pass
+Metrics(listeners=[fn]) to receive every observation as fn(event, labels, value).
+"""
+import json
+import threading
+import time
+from contextlib import nullcontext
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = 'imdb_recommender'
+
+_NULL_SPAN = nullcontext()
+
+
+class NullMetrics:
+    """The do-nothing metrics hook used when instrumentation is off"""
+    enabled = False
+
+    def span(self, stage):
+        """Context manager timing one stage"""
+        return _NULL_SPAN
+
+    def request(self, url_class, seconds, nbytes, status):
+        """One upstream HTTP request finished"""
+
+    def cache(self, kind, outcome):
+        """A response cache lookup: outcome is 'hit', 'stale' (served while refreshing), 'revalidated' or 'miss'"""
+
+    def error(self, stage, error):
+        """A swallowed exception in a stage"""
+
+    def increment(self, name, labels, value=1):
+        """Add to a counter"""
+
+    def retry(self, url_class, reason):
+        """An upstream request is retried after a status code or exception (reason)"""
+
+    def concurrency(self, limit):
+        """The adaptive in-flight limit changed (or was confirmed)"""
+
+    def to_json(self):
+        return {}
+
+    def to_prometheus(self):
+        return ''
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None if empty or past the last bucket)"""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank and self.count:
+                return bound
+        return None
+
+
+class _Span:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe('stage_seconds', {'stage': self.stage}, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics(NullMetrics):
+    """Thread-safe in-process counters and latency histograms with JSON and Prometheus export"""
+    enabled = True
+
+    def __init__(self, listeners=()):
+        self.listeners = list(listeners)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def span(self, stage):
+        return _Span(self, stage)
+
+    def request(self, url_class, seconds, nbytes, status):
+        labels = {'url_class': url_class}
+        self.observe('upstream_request_seconds', labels, seconds)
+        self.increment('upstream_requests_total', dict(labels, status=str(status)))
+        self.increment('upstream_bytes_total', labels, nbytes)
+
+    def cache(self, kind, outcome):
+        self.increment('cache_lookups_total', {'kind': kind, 'outcome': outcome})
+
+    def error(self, stage, error):
+        self.increment('errors_total', {'stage': stage, 'type': type(error).__name__})
+
+    def retry(self, url_class, reason):
+        self.increment('upstream_retries_total', {'url_class': url_class, 'reason': reason})
+
+    def concurrency(self, limit):
+        self.set('upstream_concurrency_limit', {}, round(limit, 2))
+
+    def set(self, name, labels, value):
+        with self._lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+        self._notify(name, labels, value)
+
+    def increment(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._notify(name, labels, value)
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+        self._notify(name, labels, value)
+
+    def _notify(self, name, labels, value):
+        for listener in self.listeners:
+            listener(name, labels, value)
+
+    def cache_hit_ratios(self):
+        """{kind: share of lookups answered without downloading the body again}"""
+        totals, hits = {}, {}
+        with self._lock:
+            for (name, labels), value in self.counters.items():
+                if name != 'cache_lookups_total':
+                    continue
+                labels = dict(labels)
+                totals[labels['kind']] = totals.get(labels['kind'], 0) + value
+                if labels['outcome'] != 'miss':
+                    hits[labels['kind']] = hits.get(labels['kind'], 0) + value
+        return {kind: round(hits.get(kind, 0) / total, 4) for kind, total in totals.items()}
+
+    def to_json(self):
+        """Snapshot as plain dicts: counters, histograms (count, sum, approximate p50/p90/p99) and cache ratios"""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            gauges = [{'name': name, 'labels': dict(labels), 'value': value}
+                      for (name, labels), value in sorted(self.gauges.items())]
+            histograms = [{'name': name, 'labels': dict(labels), 'count': h.count, 'sum': round(h.sum, 6),
+                           'p50': h.quantile(0.5), 'p90': h.quantile(0.9), 'p99': h.quantile(0.99)}
+                          for (name, labels), h in sorted(self.histograms.items())]
+        return {'uptime_seconds': round(time.time() - self.started, 1), 'counters': counters, 'gauges': gauges,
+                'histograms': histograms, 'cache_hit_ratio': self.cache_hit_ratios()}
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines, typed = [], set()
+        with self._lock:
+            for kind, values in (('counter', self.counters), ('gauge', self.gauges)):
+                for (name, labels), value in sorted(values.items()):
+                    metric = f"{PREFIX}_{name}"
+                    if metric not in typed:
+                        typed.add(metric)
+                        lines.append(f"# TYPE {metric} {kind}")
+                    lines.append(f"{metric}{_labels(labels)} {value}")
+
+            for (name, labels), h in sorted(self.histograms.items()):
+                metric = f"{PREFIX}_{name}"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(h.buckets + (float('inf'),), h.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{metric}_sum{_labels(labels)} {h.sum}")
+                lines.append(f"{metric}_count{_labels(labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Dump to a file: Prometheus text for *.prom, JSON otherwise"""
+        with open(path, 'w') as f:
+            if path.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_json(), f, indent=2)
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
@@ -1,103 +1,59 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
-from PIL import Image
-import io
-import base64
+import os
+import sys
+import argparse
+import json
 from urllib.parse import urljoin
+from title_cache import TitleCache, DEFAULT_CACHE_PATH, MISSING_SYNOPSIS
+from extractors import get_extractor
+from catalog import OfflineCatalog
+from ranking import Ranker, parse_rating, parse_votes
+from similarity import SimilarityIndex
+from thumbnails import ThumbnailPipeline
+from bulk import run_bulk
+from service import serve
+from daemon import run_daemon
+from recommend_client import DEFAULT_SOCKET_PATH
+from metrics import Metrics, NullMetrics
+from fetcher import Fetcher
+from planner import ListCursor, QueryPlanner
+from warmer import BackgroundRefresher, CacheWarmer
+from parse_pool import ParsePool
+from records import RecordStore, TitleRecord, format_years, tconst_number
+from personalization import Personalizer
+from lookup import LookupIndex
+from snapshots import SnapshotSaver
 
 class ContentRecommender:
-    def __init__(self):
+    def __init__(self, max_workers=10, top_n=10, cache_path=DEFAULT_CACHE_PATH, cache_ttls=None,
+                 engine='threads', async_limit=20, async_per_host=8, base_url="https://www.imdb.com",
+                 extractor='auto', catalog_path=None, ranking='bayesian', similarity_backend='brute',
+                 quiet=False, metrics=None, max_in_flight=None, rate_limit=None, retries=3,
+                 stale_while_revalidate=0, parse_workers=0, personalize=False):
         self.valid_genres = [
             'biography', 'drama', 'gangster', 'musical', 'romance',
             'sci-fi', 'epic', 'mystery', 'history', 'documentary',
             'action', 'animation', 'comedy', 'family', 'adventure',
             'film noir', 'fantasy', 'music', 'western', 'horror',
-            'thriller', 'crime', 'sport'
+            'thriller', 'crime', 'sport', 'anime'
         ]
-        self.base_url = "https://www.imdb.com"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
-        self.emoji_map = {
-            'movie': '🎬',
-            'tv': '📺',
-            'both': '🎥',
-            'star': '⭐',
-            'clapper': '🎬',
-            'popcorn': '🍿',
-            'tv_show': '📺',
-            'camera': '📷'
+        # Other names each genre is found by when typed
+        self.genre_aliases = {
+            'biography': ['biopic'],
+            'gangster': ['mob', 'mafia'],
+            'sci-fi': ['scifi', 'science fiction'],
+            'documentary': ['docs'],
+            'animation': ['animated', 'cartoon'],
+            'comedy': ['funny'],
+            'horror': ['scary'],
+            'romance': ['romantic'],
+            'sport': ['sports'],
         }
-
-    def get_user_preferences(self):
-        """Prompt user for genre preferences and validate input"""
-        print("\n🎬 Welcome to your personalized content recommender! 🎬")
-        print("I'll help you discover movies and series based on your taste.\n")
-
-        while True:
-            # Display genres horizontally
-            genre_display = ", ".join([f"{i+1}. {genre.capitalize()}" for i, genre in enumerate(self.valid_genres)])
-            print(f"\nAvailable genres: {genre_display}")
-
-            user_input = input("\nEnter 1-3 genres (comma separated): ").lower().strip()
-            genres = re.split(r',|\s+and\s+', user_input)
-            genres = [g.strip() for g in genres if g.strip()]
-
-            if not 1 <= len(genres) <= 3:
-                print("⚠️ Please select 1-3 genres only.")
-                continue
-
-            invalid = [g for g in genres if g not in self.valid_genres]
-            if invalid:
-                print(f"⚠️ Invalid genres: {', '.join(invalid)}. Please choose from the list.")
-                continue
-
-            # Ask for content type
-            print("\nWhat type of content are you interested in?")
-            print(f"🎬 M - Movies only")
-            print(f"📺 S - TV Series and Web Series")
-            print(f"🎥 B - Both Movies and TV Series")
-
-            content_type = input("\nEnter your choice (M/S/B): ").upper().strip()
-            while content_type not in ['M', 'S', 'B']:
-                print("⚠️ Please enter M, S, or B")
-                content_type = input("Enter your choice (M/S/B): ").upper().strip()
-
-            return genres, content_type
-
-    def search_imdb(self, genres, content_type):
-        """Search IMDb for content matching user preferences"""
-        results = []
-        search_urls = self._create_search_urls(genres, content_type)
-
-        print(f"\n🔍 Searching IMDb for {', '.join(genres)} content... This may take a moment.")
-
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = [executor.submit(self._scrape_search_page, url) for url in search_urls]
-
-            for future in futures:
-                try:
-                    page_results = future.result()
-                    results.extend(page_results)
-                except Exception as e:
-                    print(f"⚠️ Search error: {str(e)}")
-
-        # Remove duplicates and sort by rating
-        unique_results = {item['title']: item for item in results}.values()
-        sorted_results = sorted(unique_results, key=lambda x: x['rating'], reverse=True)
-
-        return sorted_results[:10]
-
-    def _create_search_urls(self, genres, content_type):
-        """Create IMDb search URLs based on genres and content type"""
-        urls = []
-        genre_params = {
+        # IMDb search parameter for each genre (several genres share one IMDb genre)
+        self.genre_params = {
             'biography': 'genres=biography',
             'drama': 'genres=drama',
             'gangster': 'genres=crime',
@@ -113,196 +69,99 @@ class ContentRecommender:
             'comedy': 'genres=comedy',
             'family': 'genres=family',
             'adventure': 'genres=adventure',
-            'film-noir': 'genres=film-noir',
+            'film noir': 'genres=film-noir',
             'fantasy': 'genres=fantasy',
             'music': 'genres=music',
             'western': 'genres=western',
             'horror': 'genres=horror',
             'thriller': 'genres=thriller',
             'crime': 'genres=crime',
-            'sport': 'genres=sport'
+            'sport': 'genres=sport',
+            'anime': 'genres=animation'  # IMDb files anime under animation
         }
-
-        # Determine title type based on content type
-        title_type = ""
-        if content_type == 'M':
-            title_type = "&title_type=feature"
-        elif content_type == 'S':
-            title_type = "&title_type=tv_series"
-
-        # Create individual genre searches
-        for genre in genres:
-            param = genre_params.get(genre, f'genres={genre}')
-            urls.append(f"{self.base_url}/search/title/?{param}{title_type}&sort=user_rating,desc")
-
-        # Create combined genre search
-        combined_params = '&'.join([genre_params[g] for g in genres if g in genre_params])
-        if combined_params:
-            urls.append(f"{self.base_url}/search/title/?{combined_params}{title_type}&sort=user_rating,desc")
-
-        return urls
-
-    def _scrape_search_page(self, url):
-        """Scrape a single IMDb search results page"""
-        results = []
-        try:
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Find all movie items
-            items = soup.select('.ipc-metadata-list-summary-item')
-
-            for item in items[:10]:  # Limit to first 10 results per page
-                try:
-                    title_elem = item.select_one('.ipc-title__text')
-                    if not title_elem:
-                        continue
-
-                    title = title_elem.get_text(strip=True)
-                    link = item.select_one('a.ipc-title-link-wrapper')['href']
-                    full_link = f"{self.base_url}{link.split('?')[0]}"
-
-                    # Extract year
-                    year_elem = item.select_one('.dli-title-metadata-item')
-                    year = year_elem.get_text(strip=True) if year_elem else "N/A"
-
-                    # Extract rating
-                    rating_elem = item.select_one('.ipc-rating-star')
-                    rating = rating_elem.get_text(strip=True).split()[0] if rating_elem else "N/A"
-
-                    # Extract image
-                    image_elem = item.select_one('img.ipc-image')
-                    image_url = image_elem.get('src') if image_elem else None
-
-                    # Get synopsis
-                    synopsis = self._get_synopsis(full_link)
-
-                    results.append({
-                        'title': title,
-                        'year': year,
-                        'rating': rating,
-                        'synopsis': synopsis,
-                        'link': full_link,
-                        'image_url': image_url
-                    })
-
-                except Exception as e:
-                    print(f"⚠️ Error processing item: {str(e)}")
-                    continue
-
-        except Exception as e:
-            print(f"⚠️ Error scraping {url}: {str(e)}")
-
-        return results
-
-    def _get_synopsis(self, url):
-        """Get movie synopsis from its detail page"""
-        try:
-            response = self.session.get(url, timeout=5)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Try multiple selectors for synopsis
-            synopsis_selectors = [
-                '.ipc-html-content-inner-div',
-                '.plot_summary .summary_text',
-                '.canwrap .plotxl'
-            ]
-
-            for selector in synopsis_selectors:
-                synopsis_elem = soup.select_one(selector)
-                if synopsis_elem:
-                    synopsis = synopsis_elem.get_text(strip=True)
-                    # Clean up common synopsis text
-                    synopsis = re.sub(r'Written by.*$', '', synopsis)
-                    synopsis = re.sub(r'—.*$', '', synopsis)
-                    return synopsis[:200] + "..." if len(synopsis) > 200 else synopsis
-
-            return "Synopsis not available"
-        except:
-            return "Synopsis not available"
-
-    def _resize_image(self, image_url, size=(100, 150)):
-        """Resize image to small thumbnail"""
-        try:
-            response = self.session.get(image_url, timeout=5)
-            img = Image.open(io.BytesIO(response.content))
-            img.thumbnail(size)
-
-            # Convert to base64 for terminal display
-            buffered = io.BytesIO()
-            img.save(buffered, format="JPEG")
-            img_str = base64.b64encode(buffered.getvalue()).decode('utf-8')
-            return img_str
-        except:
-            return None
-
-    def display_recommendations(self, recommendations):
-        """Display formatted recommendations with images"""
-        if not recommendations:
-            print("⚠️ No matches found. Try different genres.")
-            return
-
-        print(f"\n🎉 Here are your personalized recommendations: 🎉")
-
-        for i, rec in enumerate(recommendations, 1):
-            print(f"\n{i}. {rec['title']} ({rec['year']})")
-            print(f"   {self.emoji_map['star']} IMDb Rating: {rec['rating']}/10")
-            print(f"   {self.emoji_map['star']} Synopsis: {rec['synopsis']}")
-            print(f"   {self.emoji_map['star']} Link: {rec['link']}")
-
-            # Display image if available
-            if rec['image_url']:
-                print(f"   {self.emoji_map['camera']} Image: {rec['image_url']}")
-
-                # Try to display a small thumbnail in terminal
-                img_data = self._resize_image(rec['image_url'])
-                if img_data:
-                    print("\n   [Small thumbnail preview]")
-                    # This will display the image in terminals that support base64 images
-                    print(f"\033]1337;File=inline=1;width=30;height=40;:{img_data}\a")
-
-    def run(self):
-        """Main recommendation workflow"""
-        while True:
-            # Get user preferences
-            genres, content_type = self.get_user_preferences()
-
-            # Search and display recommendations
-            recommendations = self.search_imdb(genres, content_type)
-            self.display_recommendations(recommendations)
-
-            # Ask if user wants to search again
-            choice = input(f"\n{self.emoji_map['popcorn']} Would you like to search again? (yes/no): ").lower()
-            if choice not in ['yes', 'y']:
-                print(f"\n{self.emoji_map['clapper']} Enjoy your viewing! {self.emoji_map['popcorn']}")
-                break
-
-if __name__ == "__main__":
-    recommender = ContentRecommender()
-    recommender.run()
-
-import requests
-from bs4 import BeautifulSoup
-import re
-from concurrent.futures import ThreadPoolExecutor
-import time
-
-class ContentRecommender:
-    def __init__(self):
-        self.valid_genres = [
-            'biography', 'drama', 'gangster', 'musical', 'romance',
-            'sci-fi', 'epic', 'mystery', 'history', 'documentary',
-            'action', 'animation', 'comedy', 'family', 'adventure',
-            'film noir', 'fantasy', 'music', 'western', 'horror',
-            'thriller', 'crime', 'sport', 'anime'  # Added anime genre
-        ]
-        self.base_url = "https://www.imdb.com"
+        self.base_url = base_url
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept-Language': 'en-US,en;q=0.9',
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.max_workers = max_workers
+        self.top_n = top_n
+        # quiet=True keeps scraping warnings off the console (headless/batch use)
+        self.quiet = quiet
+        # Instrumentation hooks (see metrics.py); NullMetrics costs next to nothing
+        self.metrics = metrics or NullMetrics()
+        # Upstream GETs: pooled keep-alive connections, AIMD concurrency, retries, optional per-host rate limit
+        self.fetcher = Fetcher(self.headers, max_in_flight=max_in_flight or max_workers, rate_limit=rate_limit,
+                               retries=retries, metrics=self.metrics)
+        self.session = self.fetcher.session
+        self.upstream_requests = 0
+        self.fetch_memo = None
+        self._stats_lock = threading.Lock()
+        # Persistent title/response cache, pass cache_path=None to always hit the network
+        self.cache = TitleCache(cache_path, ttls=cache_ttls) if cache_path else None
+        # Serve responses up to this many seconds past their TTL while a background refresh runs
+        self.stale_while_revalidate = stale_while_revalidate
+        self.refresher = BackgroundRefresher(self)
+        self.warmer = None
+
+        # Fetch engine: 'threads' (ThreadPoolExecutor over self.fetcher) or 'async' (aiohttp)
+        if engine not in ('threads', 'async'):
+            raise ValueError(f"Unknown engine {engine!r}, expected 'threads' or 'async'")
+        self.engine = engine
+        self.async_engine = None
+        if engine == 'async':
+            # asyncio and aiohttp take a good part of the start-up time to import; only pay for them here
+            from async_engine import AsyncFetchEngine
+            self.async_engine = AsyncFetchEngine(self, async_limit, async_per_host)
+
+        # Page parser backend: 'auto', 'nextdata', 'selectolax', 'lxml' or 'soup' (see extractors.py),
+        # run in parse_workers separate processes when given (see parse_pool.py)
+        self.extractor = ParsePool(extractor, parse_workers) if parse_workers else get_extractor(extractor)
+
+        # Offline mode: answer searches from a snapshot built by catalog.py instead of scraping
+        self.catalog = OfflineCatalog.load(catalog_path) if catalog_path else None
+
+        # Decides which search pages a query needs (alias dedupe, locally derived intersections)
+        self.planner = QueryPlanner(self)
+
+        # Candidate scoring: 'rating' or 'bayesian' (vote-weighted), see ranking.py
+        self.ranker = Ranker(ranking, canonical=self.planner.imdb_genre)
+
+        # "More like this" index over every synopsis fetched so far, persisted next to the cache
+        on_disk = cache_path and cache_path != ':memory:'
+        similarity_path = os.path.join(os.path.dirname(cache_path), 'similarity.npz') if on_disk else None
+        self.similarity = (SimilarityIndex.load(similarity_path, similarity_backend) if similarity_path
+                           else SimilarityIndex(backend=similarity_backend))
+
+        # Every title seen so far in compact columnar form (see records.py), persisted next to the cache
+        self.records = (RecordStore.load(os.path.join(os.path.dirname(cache_path), 'titles.rec')) if on_disk
+                        else RecordStore())
+
+        # Typo-tolerant genre/title lookup and autocomplete (see lookup.py), persisted next to the cache
+        self.lookup = (LookupIndex.load(os.path.join(os.path.dirname(cache_path), 'lookup.npz')) if on_disk
+                       else LookupIndex())
+        for genre in self.valid_genres:
+            self.lookup.add_genre(genre, self.genre_aliases.get(genre, ()))
+        if len(self.lookup) == len(self.valid_genres):
+            # New index: seed it with every title already in the record store
+            for record in self.records:
+                if record.title:
+                    self.lookup.add_title(record.tconst, record.title, record.votes)
+
+        # The three indexes above are written in the background, never on the request path
+        self.snapshots = SnapshotSaver([self.similarity, self.records, self.lookup], metrics=self.metrics)
+
+        # Per-user feedback log and re-ranking model (see personalization.py), off unless asked for
+        self.personalizer = (Personalizer.open(os.path.dirname(cache_path) if on_disk else None) if personalize
+                             else None)
+
+        # Poster thumbnails, built concurrently and kept in an LRU backed by a disk cache
+        self.thumbnails = ThumbnailPipeline(
+            lambda url: self._fetch(url, 'image', timeout=5),
+            cache_dir=os.path.join(os.path.dirname(cache_path), 'thumbnails') if on_disk else None,
+            metrics=self.metrics
+        )
+
         self.emoji_map = {
             'movie': '🎬',
             'tv': '📺',
@@ -311,7 +170,7 @@ class ContentRecommender:
             'clapper': '🎬',
             'popcorn': '🍿',
             'tv_show': '📺',
-            'anime': '🎌'  # Added emoji for anime
+            'camera': '📷'
         }
 
     def get_user_preferences(self):
@@ -332,10 +191,16 @@ class ContentRecommender:
                 print("⚠️ Please select 1-3 genres only.")
                 continue
 
-            invalid = [g for g in genres if g not in self.valid_genres]
+            # Accept misspellings and aliases ("comdy", "scifi"), say so when a genre was reinterpreted
+            resolved = [self.lookup.resolve_genre(g) for g in genres]
+            invalid = [g for g, r in zip(genres, resolved) if r is None]
             if invalid:
                 print(f"⚠️ Invalid genres: {', '.join(invalid)}. Please choose from the list.")
                 continue
+            for typed, genre in zip(genres, resolved):
+                if typed != genre:
+                    print(f"🔎 Taking '{typed}' as {genre.capitalize()}")
+            genres = list(dict.fromkeys(resolved))
 
             # Ask for content type
             print("\nWhat type of content are you interested in?")
@@ -352,173 +217,421 @@ class ContentRecommender:
 
     def search_imdb(self, genres, content_type):
         """Search IMDb for content matching user preferences"""
-        results = []
-        search_urls = self._create_search_urls(genres, content_type)
-
         print(f"\n🔍 Searching IMDb for {', '.join(genres)} content... This may take a moment.")
+        return self.recommend(genres, content_type)
+
+    def stream_imdb(self, genres, content_type, user=None):
+        """Like search_imdb, but returns a generator yielding each result as soon as it is known"""
+        picked = f", picked for {user}" if user is not None else ""
+        print(f"\n🔍 Searching IMDb for {', '.join(genres)} content{picked}...")
+        return self.iter_recommendations(genres, content_type, user=user, thumbnails=True)
+
+    def recommend(self, genres, content_type, limit=None, user=None):
+        """Headless search: ranked result dicts for 1+ genres and content type M/S/B, nothing printed.
+        With a user (and personalize=True) the candidates are re-ranked for them and logged as shown."""
+        self._check_query(genres, content_type)
+        limit = limit or self.top_n
+        if user is not None and self.personalizer is None:
+            raise ValueError("Personalization is off, create the recommender with personalize=True")
+
+        with self.metrics.span('query'):
+            if self.catalog is not None:
+                results = self._search_catalog(genres, content_type, limit, user)
+            else:
+                plan = self.planner.plan(genres, content_type)
+                if self.engine == 'async':
+                    results = self.async_engine.search(plan, limit, user)
+                else:
+                    results = self._search_threaded(plan, limit, user)
+        if user is not None:
+            self.personalizer.record_shown(user, results)
+        return results
 
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = [executor.submit(self._scrape_search_page, url) for url in search_urls]
-
-            for future in futures:
+    def feedback(self, user, tconst, kind, value=None):
+        """Record that a user clicked, rated (value 1-10) or dismissed a title (see personalization.py)"""
+        if self.personalizer is None:
+            raise ValueError("Personalization is off, create the recommender with personalize=True")
+        self.personalizer.record(user, tconst, kind, value)
+
+    def iter_recommendations(self, genres, content_type, limit=None, user=None, thumbnails=False):
+        """Generator version of recommend(): the same results in the same order, each yielded as soon as
+        its synopsis arrives while the later ones are still being fetched. Candidate pool, ranking
+        and personalization are shared with recommend(); streaming always uses the thread pool,
+        whatever the configured engine. thumbnails=True starts every poster thumbnail as soon as
+        the results are ranked."""
+        self._check_query(genres, content_type)
+        limit = limit or self.top_n
+        if user is not None and self.personalizer is None:
+            raise ValueError("Personalization is off, create the recommender with personalize=True")
+
+        if self.catalog is not None:
+            results = self._search_catalog(genres, content_type, limit, user)
+            if thumbnails:
+                self.thumbnails.prefetch(item['image_url'] for item in results)
+            yield from results
+        else:
+            plan = self.planner.plan(genres, content_type)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                candidates = self._gather_candidates(plan, limit, user, executor)
+                with self.metrics.span('rank'):
+                    results = self._select_top(candidates, limit, user)
+                if thumbnails:
+                    self.thumbnails.prefetch(item['image_url'] for item in results)
+                # All detail pages are requested at once; results go out in rank order as they complete
+                synopses = [executor.submit(self._get_synopsis, item['link']) for item in results]
+                for item, synopsis in zip(results, synopses):
+                    item['synopsis'] = synopsis.result()
+                    yield item
+            self._index_similarity(results)
+        if user is not None:
+            self.personalizer.record_shown(user, results)
+
+    def close(self):
+        """Write the pending index snapshots and stop the async engine and parse workers; call once done with the recommender"""
+        self.snapshots.close()
+        if self.async_engine is not None:
+            self.async_engine.close()
+        if isinstance(self.extractor, ParsePool):
+            self.extractor.close()
+
+    def _check_query(self, genres, content_type):
+        if not genres:
+            raise ValueError("At least one genre is required")
+        if content_type not in ('M', 'S', 'B'):
+            raise ValueError(f"content_type must be M, S or B, not {content_type!r}")
+
+    def _warn(self, message):
+        """Report a non-fatal scraping problem"""
+        if not self.quiet:
+            print(f"⚠️ {message}")
+
+    def _search_threaded(self, plan, limit, user=None):
+        """Two-phase search of a SearchPlan on a thread pool sharing self.fetcher"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Rank before touching any detail page so only the survivors cost a request
+            candidates = self._gather_candidates(plan, limit, user, executor)
+            with self.metrics.span('rank'):
+                top_results = self._select_top(candidates, limit, user)
+
+            # Phase 2: fetch synopses in parallel for the final top-N
+            with self.metrics.span('details'):
+                synopses = executor.map(self._get_synopsis, [item['link'] for item in top_results])
+                for item, synopsis in zip(top_results, synopses):
+                    item['synopsis'] = synopsis
+
+        self._index_similarity(top_results)
+        return top_results
+
+    def _gather_candidates(self, plan, limit, user, executor):
+        """Phase 1 of a threaded search: the merged lightweight candidates from the list pages only"""
+        fetched = []
+        page_items = self._page_items(limit, user)
+        with self.metrics.span('search_pages'):
+            # When the combined list will be derived, the per-genre pages are read in full for it
+            defer = self.planner.should_defer(plan)
+            futures = [(executor.submit(self._scrape_search_page, url, None if defer else page_items), url, url_genres)
+                       for url, _, url_genres in plan.per_genre]
+            if plan.combined and not defer:
+                futures.append((executor.submit(self._scrape_search_page, plan.combined[0], page_items),
+                                plan.combined[0], plan.combined[2]))
+
+            for future, url, url_genres in futures:
                 try:
-                    page_results = future.result()
-                    results.extend(page_results)
+                    fetched.append((url, future.result(), url_genres))
                 except Exception as e:
-                    print(f"⚠️ Search error: {str(e)}")
-
-        # Remove duplicates and sort by rating
-        unique_results = {item['title']: item for item in results}.values()
-        sorted_results = sorted(unique_results, key=lambda x: x['rating'], reverse=True)
-
-        return sorted_results[:10]
-
-    def _create_search_urls(self, genres, content_type):
-        """Create IMDb search URLs based on genres and content type"""
-        urls = []
-        genre_params = {
-            'biography': 'genres=biography',
-            'drama': 'genres=drama',
-            'gangster': 'genres=crime',
-            'musical': 'genres=musical',
-            'romance': 'genres=romance',
-            'sci-fi': 'genres=sci-fi',
-            'epic': 'genres=adventure',
-            'mystery': 'genres=mystery',
-            'history': 'genres=history',
-            'documentary': 'genres=documentary',
-            'action': 'genres=action',
-            'animation': 'genres=animation',
-            'comedy': 'genres=comedy',
-            'family': 'genres=family',
-            'adventure': 'genres=adventure',
-            'film-noir': 'genres=film-noir',
-            'fantasy': 'genres=fantasy',
-            'music': 'genres=music',
-            'western': 'genres=western',
-            'horror': 'genres=horror',
-            'thriller': 'genres=thriller',
-            'crime': 'genres=crime',
-            'sport': 'genres=sport',
-            'anime': 'genres=animation'  # Map anime to animation for IMDb search
-        }
-
-        # Determine title type based on content type
-        title_type = ""
-        if content_type == 'M':
-            title_type = "&title_type=feature"
-        elif content_type == 'S':
-            title_type = "&title_type=tv_series"
-
-        # Create individual genre searches
-        for genre in genres:
-            param = genre_params.get(genre, f'genres={genre}')
-            urls.append(f"{self.base_url}/search/title/?{param}{title_type}&sort=user_rating,desc")
-
-        # Create combined genre search
-        combined_params = '&'.join([genre_params[g] for g in genres if g in genre_params])
-        if combined_params:
-            urls.append(f"{self.base_url}/search/title/?{combined_params}{title_type}&sort=user_rating,desc")
+                    self.metrics.error('search_pages', e)
+                    self._warn(f"Search error: {str(e)}")
+
+            issued, derived, pages = len(futures), False, []
+            if defer:
+                combined = self.planner.derive(plan, [page for _, page, _ in fetched], page_items)
+                derived = combined is not None
+                if derived:
+                    pages.append((combined, plan.combined[2]))
+                else:
+                    issued += 1
+                    fetched.append((plan.combined[0], self._scrape_search_page(plan.combined[0], page_items),
+                                    plan.combined[2]))
+
+            # Further result pages only while the lists read so far cannot fill the ranking pool
+            cursors = [ListCursor(url, url_genres, page_items, page) for url, page, url_genres in fetched]
+            candidates = self._merge_candidates([(c.items, c.genres) for c in cursors] + pages)
+            more = self._lists_to_extend(cursors, candidates, limit, user)
+            while more:
+                next_pages = executor.map(lambda cursor: self._scrape_search_page(cursor.next_url(), None), more)
+                for cursor, page in zip(more, next_pages):
+                    cursor.add(page)
+                issued += len(more)
+                candidates = self._merge_candidates([(c.items, c.genres) for c in cursors] + pages)
+                more = self._lists_to_extend(cursors, candidates, limit, user)
+            self.planner.record(plan, issued, derived)
+        return candidates
+
+    def _lists_to_extend(self, cursors, candidates, limit, user=None):
+        """Lists whose next page is needed: none once the merged candidates fill the ranking pool"""
+        if len(candidates) >= self._pool_size(limit, user):
+            return []
+        return [cursor for cursor in cursors if cursor.open]
+
+    def _search_catalog(self, genres, content_type, limit, user=None):
+        """Answer a search from the offline catalog; synopses come from the title cache, never the network"""
+        imdb_genres = [self.genre_params.get(g, f'genres={g}').split('=', 1)[1] for g in genres]
+        results = self.catalog.search(imdb_genres, content_type, self._pool_size(limit, user), ranker=self.ranker,
+                                      base_url=self.base_url)
+        if user is not None:
+            results = self.personalizer.rerank(user, results, limit)
+        for item in results:
+            item['synopsis'] = self._cached_synopsis(item['link']) or MISSING_SYNOPSIS
+        return results
 
-        return urls
+    def _index_similarity(self, results):
+        """Feed newly fetched synopses into the similarity index and schedule saving it, the records and lookup"""
+        for item in results:
+            if item['tconst'] in self.similarity or item.get('synopsis') in (None, MISSING_SYNOPSIS):
+                continue
+            self.similarity.add(item['tconst'], f"{item['title']} {item['synopsis']}", item.get('matched_genres') or ())
+        self.snapshots.touch()
 
-    def _scrape_search_page(self, url):
-        """Scrape a single IMDb search results page"""
+    def similar_to(self, tconst, k=10):
+        """Titles whose synopsis and genres are most similar to an already seen title (ttNNNN)"""
         results = []
-        try:
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Find all movie items
-            items = soup.select('.ipc-metadata-list-summary-item')
-
-            for item in items[:10]:  # Limit to first 10 results per page
-                try:
-                    title_elem = item.select_one('.ipc-title__text')
-                    if not title_elem:
-                        continue
+        for other, score in self.similarity.similar(tconst, k):
+            record = (self.cache.get_title(other) if self.cache else None) or {'tconst': other}
+            record['similarity'] = score
+            results.append(record)
+        return results
 
-                    title = title_elem.get_text(strip=True)
-                    link = item.select_one('a.ipc-title-link-wrapper')['href']
-                    full_link = f"{self.base_url}{link.split('?')[0]}"
+    def find_titles(self, text, k=10):
+        """Titles seen so far whose name matches free text, typos allowed and the last word may be partial"""
+        results = []
+        for match in self.lookup.lookup(text, k, kind='title'):
+            record = self.records.get(match['tconst'])
+            match['year'] = format_years(record.year, record.end_year) if record else None
+            results.append(match)
+        return results
 
-                    # Extract year
-                    year_elem = item.select_one('.dli-title-metadata-item')
-                    year = year_elem.get_text(strip=True) if year_elem else "N/A"
+    def _merge_candidates(self, pages):
+        """Merge (candidates, genres) search pages, deduplicated by IMDb title ID"""
+        candidates = {}
+        for page, page_genres in pages:
+            for item in page:
+                # The same title often shows up in several genre lists, remember which ones
+                candidate = candidates.setdefault(item['tconst'], item)
+                matched = candidate.setdefault('matched_genres', [])
+                matched.extend(g for g in page_genres if g not in matched)
+        return candidates
+
+    def _pool_size(self, limit, user=None):
+        """Candidates ranked for a query: `limit`, or pool_factor times that when re-ranking for a user"""
+        return limit * self.personalizer.pool_factor if user is not None else limit
+
+    def _page_items(self, limit, user=None):
+        """Candidates read from each list page: the whole ranking pool, and never less than 10"""
+        return max(self._pool_size(limit, user), 10)
+
+    def _select_top(self, candidates, limit, user=None):
+        """Rank merged candidates and keep the top `limit`, re-ranking a larger pool for a user"""
+        pool = self.ranker.top_k(list(candidates.values()), self._pool_size(limit, user))
+        return pool if user is None else self.personalizer.rerank(user, pool, limit)
+
+    def _fetch(self, url, kind, timeout):
+        """GET a URL through the batch memo (if any) and the response cache"""
+        if self.fetch_memo is not None:
+            return self.fetch_memo.get(url, lambda: self._fetch_cached(url, kind, timeout))
+        return self._fetch_cached(url, kind, timeout)
+
+    def _fetch_cached(self, url, kind, timeout):
+        """GET a URL through the response cache, revalidating stale entries with a conditional request"""
+        body, cached = self._cached_response(url, kind, timeout)
+        return body if body is not None else self._download(url, kind, timeout, cached)
+
+    def _cached_response(self, url, kind, timeout):
+        """(body, cached entry); body is None when the URL has to be downloaded. Entries stale by less
+        than stale_while_revalidate are served while a background refresh runs"""
+        cached, fresh = self.cache.lookup_response(url, kind) if self.cache else (None, False)
+        if fresh:
+            self.metrics.cache(kind, 'hit')
+            return cached.body, cached
+        if cached and time.time() - cached.fetched_at < self.cache.ttls[kind] + self.stale_while_revalidate:
+            self.metrics.cache(kind, 'stale')
+            self.refresher.refresh(url, kind, timeout, cached)
+            return cached.body, cached
+        return None, cached
+
+    def _download(self, url, kind, timeout, cached=None):
+        """GET a URL upstream, conditionally when a cached copy exists, and store the result"""
+        headers = cached.conditional_headers() if cached else {}
+        self._count_upstream(kind)
+        start = time.perf_counter()
+        response = self.fetcher.get(url, timeout, headers, url_class=kind)
+        self.metrics.request(kind, time.perf_counter() - start, len(response.content), response.status_code)
+        return self._store_response(url, kind, cached, response.status_code, response.content, response.headers)
+
+    def _store_response(self, url, kind, cached, status, body, headers):
+        """Cache a downloaded response; returns the body to use (the cached one after a 304)"""
+        if cached and status == 304:
+            self.metrics.cache(kind, 'revalidated')
+            self.cache.touch_response(url)
+            return cached.body
+
+        if self.cache:
+            self.metrics.cache(kind, 'miss')
+            if status == 200:
+                self.cache.put_response(url, kind, body, headers.get('ETag'), headers.get('Last-Modified'))
+        return body
+
+    def _count_upstream(self, kind):
+        with self._stats_lock:
+            self.upstream_requests += 1
+        if kind == 'search':
+            self.planner.count_upstream()
+
+    def _extract_tconst(self, link):
+        """Extract the IMDb title ID (ttNNNN) from a title link"""
+        match = re.search(r'/title/(tt\d+)', link)
+        return match.group(1) if match else link
 
-                    # Extract rating
-                    rating_elem = item.select_one('.ipc-rating-star')
-                    rating = rating_elem.get_text(strip=True).split()[0] if rating_elem else "N/A"
+    def _create_search_urls(self, genres, content_type):
+        """Create IMDb search URLs based on genres and content type"""
+        return [url for url, _ in self._create_searches(genres, content_type)]
 
-                    # Get synopsis
-                    synopsis = self._get_synopsis(full_link)
+    def _create_searches(self, genres, content_type):
+        """Create (search URL, genres it covers) pairs based on genres and content type (see planner.py)"""
+        return self.planner.plan(genres, content_type).searches
 
-                    results.append({
-                        'title': title,
-                        'year': year,
-                        'rating': rating,
-                        'synopsis': synopsis,
-                        'link': full_link
-                    })
+    def _scrape_search_page(self, url, max_items=10):
+        """Scrape a single IMDb search results page into lightweight candidates (no detail page fetch)"""
+        try:
+            body = self._fetch(url, 'search', timeout=10)
+            return self._parse_search_page(body, max_items)
+        except Exception as e:
+            self.metrics.error('search_page', e)
+            self._warn(f"Error scraping {url}: {str(e)}")
+            return []
 
-                except Exception as e:
-                    print(f"⚠️ Error processing item: {str(e)}")
-                    continue
+    def _parse_search_page(self, body, max_items=10):
+        """Parse a search results page body into candidate records (max_items=None keeps the whole page)"""
+        results = []
 
-        except Exception as e:
-            print(f"⚠️ Error scraping {url}: {str(e)}")
+        with self.metrics.span('parse_search'):
+            items = self.extractor.parse_search(body)[:max_items]
+        for item in items:
+            try:
+                full_link = f"{self.base_url}{item['link'].split('?')[0]}"
+                rating = parse_rating(item['rating'])
+                record = {
+                    'tconst': self._extract_tconst(full_link),
+                    # DOM backends include the list position ("3. Title"), the embedded JSON does not
+                    'title': re.sub(r'^\d+\.\s+', '', item['title']),
+                    'year': item['year'],
+                    # The rating star text also carries the vote count, e.g. "8.7(2.9M)"
+                    'rating': f"{rating:.1f}" if rating == rating else "N/A",
+                    'votes': parse_votes(item.get('votes')),
+                    'synopsis': None,
+                    'link': full_link,
+                    'image_url': item['image_url'],
+                    # Genre tags when the page reports them (lets the planner derive intersections)
+                    'genres': item.get('genres'),
+                }
+                if self.cache:
+                    self.cache.put_title(record)
+                if record['tconst'].startswith('tt'):
+                    self.records.add(record)
+                    self.lookup.add_title(record['tconst'], record['title'], record['votes'])
+                results.append(record)
+
+            except Exception as e:
+                self.metrics.error('search_item', e)
+                self._warn(f"Error processing item: {str(e)}")
+                continue
 
         return results
 
     def _get_synopsis(self, url):
         """Get movie synopsis from its detail page"""
+        cached = self._cached_synopsis(url)
+        if cached:
+            return cached
+
         try:
-            response = self.session.get(url, timeout=5)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Try multiple selectors for synopsis
-            synopsis_selectors = [
-                '.ipc-html-content-inner-div',
-                '.plot_summary .summary_text',
-                '.canwrap .plotxl'
-            ]
-
-            for selector in synopsis_selectors:
-                synopsis_elem = soup.select_one(selector)
-                if synopsis_elem:
-                    synopsis = synopsis_elem.get_text(strip=True)
-                    # Clean up common synopsis text
-                    synopsis = re.sub(r'Written by.*$', '', synopsis)
-                    synopsis = re.sub(r'—.*$', '', synopsis)
-                    return synopsis[:200] + "..." if len(synopsis) > 200 else synopsis
-
-            return "Synopsis not available"
-        except:
-            return "Synopsis not available"
+            body = self._fetch(url, 'detail', timeout=5)
+            return self._parse_synopsis(body, url)
+        except Exception as e:
+            self.metrics.error('detail_page', e)
+            return MISSING_SYNOPSIS
+
+    def _cached_synopsis(self, url):
+        """Return the synopsis for a title link from the title cache, if known"""
+        cached = self.cache.get_title(self._extract_tconst(url)) if self.cache else None
+        return cached['synopsis'] if cached else None
+
+    def _parse_synopsis(self, body, url):
+        """Extract the synopsis from a detail page body and remember it in the title cache"""
+        with self.metrics.span('parse_detail'):
+            synopsis = self.extractor.parse_synopsis(body)
+        if synopsis:
+            # Clean up common synopsis text
+            synopsis = re.sub(r'Written by.*$', '', synopsis)
+            synopsis = re.sub(r'—.*$', '', synopsis)
+            synopsis = synopsis[:200] + "..." if len(synopsis) > 200 else synopsis
+        else:
+            synopsis = MISSING_SYNOPSIS
+
+        tconst = self._extract_tconst(url)
+        if self.cache:
+            self.cache.put_title({'tconst': tconst, 'link': url, 'synopsis': synopsis})
+        if tconst.startswith('tt'):
+            self.records.add(TitleRecord(tconst_number(tconst), synopsis=synopsis))
+        return synopsis
 
-    def display_recommendations(self, recommendations):
-        """Display formatted recommendations"""
-        if not recommendations:
-            print("⚠️ No matches found. Try different genres.")
-            return
+    def _resize_image(self, image_url, size=(100, 150)):
+        """Resize image to small thumbnail (base64 JPEG), reusing a prefetched or cached one"""
+        return self.thumbnails.get(image_url, size)
 
-        print(f"\n🎉 Here are your personalized recommendations: 🎉")
+    def display_recommendations(self, recommendations):
+        """Display formatted recommendations with images; accepts a list or a result stream, returns the list shown"""
+        if isinstance(recommendations, (list, tuple)):
+            # Build every thumbnail in the background while the text is printing
+            self.thumbnails.prefetch(rec['image_url'] for rec in recommendations)
 
+        shown = []
         for i, rec in enumerate(recommendations, 1):
+            if i == 1:
+                print(f"\n🎉 Here are your personalized recommendations: 🎉")
+            shown.append(rec)
+            self.thumbnails.prefetch([rec['image_url']])
+
             print(f"\n{i}. {rec['title']} ({rec['year']})")
             print(f"   {self.emoji_map['star']} IMDb Rating: {rec['rating']}/10")
             print(f"   {self.emoji_map['star']} Synopsis: {rec['synopsis']}")
             print(f"   {self.emoji_map['star']} Link: {rec['link']}")
 
-    def run(self):
-        """Main recommendation workflow"""
+            # Display image if available
+            if rec['image_url']:
+                print(f"   {self.emoji_map['camera']} Image: {rec['image_url']}")
+
+                # Try to display a small thumbnail in terminal
+                img_data = self._resize_image(rec['image_url'])
+                if img_data:
+                    print("\n   [Small thumbnail preview]")
+                    # This will display the image in terminals that support base64 images
+                    print(f"\033]1337;File=inline=1;width=30;height=40;:{img_data}\a")
+
+        if not shown:
+            print("⚠️ No matches found. Try different genres.")
+        return shown
+
+    def run(self, user=None):
+        """Main recommendation workflow; with a user, results are personalized and likes are remembered"""
         while True:
             # Get user preferences
             genres, content_type = self.get_user_preferences()
 
             # Search and display recommendations
-            recommendations = self.search_imdb(genres, content_type)
-            self.display_recommendations(recommendations)
+            recommendations = self.stream_imdb(genres, content_type, user)
+            recommendations = self.display_recommendations(recommendations)
+            if user is not None and recommendations:
+                self._ask_feedback(user, recommendations)
 
             # Ask if user wants to search again
             choice = input(f"\n{self.emoji_map['popcorn']} Would you like to search again? (yes/no): ").lower()
@@ -526,6 +639,74 @@ class ContentRecommender:
                 print(f"\n{self.emoji_map['clapper']} Enjoy your viewing! {self.emoji_map['popcorn']}")
                 break
 
+    def _ask_feedback(self, user, recommendations):
+        """Log the titles the user liked (by list number) as clicks"""
+        liked = input("\n👍 Which ones look good? (numbers, e.g. 1,3; Enter to skip): ")
+        for number in re.findall(r'\d+', liked):
+            if 1 <= int(number) <= len(recommendations):
+                self.feedback(user, recommendations[int(number) - 1]['tconst'], 'clicked')
+
 if __name__ == "__main__":
-    recommender = ContentRecommender()
-    recommender.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="IMDb content recommender (interactive unless --bulk, --serve or --daemon is given)")
+    parser.add_argument('--bulk', metavar='FILE', help="answer one query per line from FILE ('-' for stdin) as JSONL")
+    parser.add_argument('--output', metavar='FILE', help='where to write bulk JSONL results (default stdout)')
+    parser.add_argument('--serve', metavar='[HOST:]PORT', help='run the JSON HTTP service (see service.py)')
+    parser.add_argument('--daemon', metavar='SOCKET', nargs='?', const=DEFAULT_SOCKET_PATH,
+                        help='stay resident behind a Unix socket for recommend_client.py (see daemon.py)')
+    parser.add_argument('--result-ttl', type=float, default=60, help='seconds the service or daemon reuses an answer')
+    parser.add_argument('--workers', type=int, default=4, help='queries answered concurrently in bulk mode')
+    parser.add_argument('--limit', type=int, default=10, help='results per query')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads')
+    parser.add_argument('--catalog', metavar='DIR', help='answer from an offline catalog snapshot (see catalog.py)')
+    parser.add_argument('--no-cache', action='store_true', help='skip the on-disk title/response cache')
+    parser.add_argument('--metrics', metavar='FILE', help='write timings and counters on exit (*.prom: Prometheus text, else JSON)')
+    parser.add_argument('--max-in-flight', type=int, help='upper bound for concurrent upstream requests (default 10)')
+    parser.add_argument('--rate-limit', type=float, help='max requests per second to each upstream host')
+    parser.add_argument('--warm', action='store_true', help='pre-crawl every genre x content type in the background')
+    parser.add_argument('--warm-only', action='store_true', help='run one cache warming cycle, print its report and exit')
+    parser.add_argument('--warm-budget', type=int, default=300, help='upstream requests per warming cycle')
+    parser.add_argument('--warm-rate', type=float, default=2.0, help='warming requests per second')
+    parser.add_argument('--stale-while-revalidate', type=float, metavar='SECONDS',
+                        help='serve expired pages this long while refreshing them (default 1 day with --warm)')
+    parser.add_argument('--parse-workers', type=int, default=0, help='parse pages in this many processes (0: in-thread)')
+    parser.add_argument('--personalize', action='store_true', help='accept per-user feedback and re-rank for users')
+    parser.add_argument('--user', help='personalize the interactive session for this user (implies --personalize)')
+    parser.add_argument('--base-url', default="https://www.imdb.com", help='IMDb host to scrape (e.g. a local stand-in)')
+    args = parser.parse_args()
+    if (args.warm or args.warm_only) and args.no_cache:
+        parser.error("--warm needs the cache, drop --no-cache")
+
+    recommender = ContentRecommender(top_n=args.limit, engine=args.engine, catalog_path=args.catalog,
+                                     cache_path=None if args.no_cache else DEFAULT_CACHE_PATH,
+                                     base_url=args.base_url, quiet=bool(args.bulk or args.serve or args.daemon),
+                                     metrics=Metrics() if args.metrics or args.serve else None,
+                                     max_in_flight=args.max_in_flight,
+                                     rate_limit=args.rate_limit, parse_workers=args.parse_workers,
+                                     personalize=args.personalize or args.user is not None,
+                                     stale_while_revalidate=args.stale_while_revalidate
+                                     if args.stale_while_revalidate is not None
+                                     else 86400 if args.warm or args.warm_only else 0)
+    if args.warm or args.warm_only:
+        recommender.warmer = CacheWarmer(recommender, budget=args.warm_budget, rate=args.warm_rate)
+    if args.warm:
+        recommender.warmer.start()
+    try:
+        if args.warm_only:
+            recommender.warmer.run_once()
+            print(json.dumps(recommender.warmer.report(), indent=2))
+        elif args.serve:
+            host, _, port = args.serve.rpartition(':')
+            serve(recommender, host or '127.0.0.1', int(port), result_ttl=args.result_ttl)
+        elif args.daemon:
+            run_daemon(recommender, args.daemon, result_ttl=args.result_ttl)
+        elif args.bulk:
+            source = sys.stdin if args.bulk == '-' else open(args.bulk, encoding='utf-8')
+            sink = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+            with source, sink:
+                run_bulk(recommender, source, sink, workers=args.workers, default_limit=args.limit)
+        else:
+            recommender.run(args.user)
+    finally:
+        recommender.close()
+        if args.metrics:
+            recommender.metrics.write(args.metrics)
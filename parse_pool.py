@@ -0,0 +1,115 @@
+"""Process-pool parse stage: page bodies are parsed on other cores instead of under the GIL.
+
+ParsePool has the Extractor interface (parse_search / parse_synopsis), so the I/O threads keep
+calling it exactly like an in-process backend. Concurrent calls are gathered into batches by a
+dispatcher thread (up to `batch_size` pages, or whatever arrived within `batch_delay` seconds) and
+each batch is parsed by one worker process, so the pickling round trip is paid per batch rather
+than per page. Workers send back compact tuples instead of dicts.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from extractors import get_extractor
+
+SEARCH_FIELDS = ('title', 'year', 'rating', 'votes', 'link', 'image_url', 'genres')
+
+_worker_extractor = None
+
+
+def _init_worker(extractor):
+    global _worker_extractor
+    _worker_extractor = get_extractor(extractor)
+
+
+def _parse_batch(jobs):
+    """Runs in a worker process: [(kind, body)] -> [result or exception]"""
+    results = []
+    for kind, body in jobs:
+        try:
+            if kind == 'search':
+                results.append([tuple(item.get(f) for f in SEARCH_FIELDS)
+                                for item in _worker_extractor.parse_search(body)])
+            else:
+                results.append(_worker_extractor.parse_synopsis(body))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class ParsePool:
+    """Extractor that parses in a ProcessPoolExecutor, batching concurrent calls (see module docstring)"""
+    name = 'process-pool'
+
+    def __init__(self, extractor='auto', workers=None, batch_size=8, batch_delay=0.002):
+        self.extractor = extractor
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.batches = 0
+        self.pages = 0
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(extractor,))
+        self._queue = queue.Queue()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name='parse-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def parse_search(self, body):
+        return [dict(zip(SEARCH_FIELDS, row)) for row in self._submit('search', body)]
+
+    def parse_synopsis(self, body):
+        return self._submit('detail', body)
+
+    def _submit(self, kind, body):
+        future = Future()
+        self._queue.put((kind, body, future))
+        return future.result()
+
+    def _dispatch(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            # Gather whatever else arrives while the first page waits, up to a full batch
+            try:
+                while len(batch) < self.batch_size:
+                    job = self._queue.get(timeout=self.batch_delay)
+                    if job is None:
+                        self._queue.put(None)
+                        break
+                    batch.append(job)
+            except queue.Empty:
+                pass
+            self.batches += 1
+            self.pages += len(batch)
+            try:
+                submitted = self._executor.submit(_parse_batch, [(kind, body) for kind, body, _ in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            submitted.add_done_callback(lambda done, batch=batch: self._deliver(done, batch))
+
+    @staticmethod
+    def _deliver(done, batch):
+        try:
+            results = done.result()
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def close(self):
+        """Stop the dispatcher and wait for the worker processes to exit; safe to call twice"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
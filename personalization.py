@@ -0,0 +1,404 @@
+"""Per-user personalization from implicit feedback.
+
+Interactions (shown, clicked, rated, dismissed; titles by integer tconst) are appended to a small
+SQLite log. ImplicitALS factorizes the user x title confidence matrix (implicit-feedback ALS after
+Hu, Koren & Volinsky, NumPy only). A user is folded in by solving for their vector alone against
+the fixed title factors, so new feedback counts on the very next query without a retrain.
+Personalizer.rerank blends the ranker's order with predicted affinity over a candidate pool under
+a hard per-query time budget: when the budget runs out the pool keeps its original order.
+
+    python personalization.py train      # retrain from the interaction log next to the cache
+    python personalization.py stats
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from records import tconst_number
+from title_cache import DEFAULT_CACHE_PATH
+
+DEFAULT_DIR = os.path.dirname(DEFAULT_CACHE_PATH)
+
+# Preference strength of one explicit event; 'rated' maps a 1-10 rating onto -2.25..+2.25.
+# Impressions ('shown') are counted separately, see impression_strength()
+EVENT_WEIGHTS = {'shown': 0.0, 'clicked': 1.0, 'dismissed': -1.0, 'rated': None}
+# n impressions without a click add -IMPRESSION_CAP * (1 - IMPRESSION_DECAY ** n): each one counts
+# less than the last and together they never outweigh a single dismissal
+IMPRESSION_CAP = 0.3
+IMPRESSION_DECAY = 0.8
+# Titles whose explicit feedback (a dismissal, a low rating) sums to at most this are never
+# recommended to that user again; impressions never count towards it
+EXCLUDE_BELOW = -1.0
+
+
+def _strength_sql():
+    """Explicit strength and impression count columns for a GROUP BY over interactions"""
+    cases = ' '.join(f"WHEN '{kind}' THEN {weight}" for kind, weight in EVENT_WEIGHTS.items() if weight is not None)
+    return f"SUM(CASE kind {cases} WHEN 'rated' THEN (value - 5.5) / 2 ELSE 0 END), SUM(kind = 'shown')"
+
+
+def impression_strength(shown):
+    """Bounded negative strength of `shown` impressions (works on arrays too)"""
+    return -IMPRESSION_CAP * (1 - IMPRESSION_DECAY ** shown)
+
+
+class InteractionLog:
+    """Append-only SQLite log of (user, tconst, kind, value, at) events"""
+
+    def __init__(self, path=os.path.join(DEFAULT_DIR, 'interactions.sqlite3')):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS interactions (
+                user TEXT NOT NULL,
+                tconst INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                value REAL,
+                at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS interactions_user ON interactions(user, at);
+        """)
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+
+    @staticmethod
+    def _row(user, tconst, kind, value=None, at=None):
+        if kind not in EVENT_WEIGHTS:
+            raise ValueError(f"Unknown interaction {kind!r}, expected one of {', '.join(EVENT_WEIGHTS)}")
+        if kind == 'rated' and not (value is not None and 1 <= float(value) <= 10):
+            raise ValueError("A rating between 1 and 10 is required")
+        return (str(user), tconst_number(tconst), kind, None if value is None else float(value),
+                time.time() if at is None else at)
+
+    def record(self, user, tconst, kind, value=None, at=None):
+        self.record_many([(user, tconst, kind, value, at)])
+
+    def record_many(self, events):
+        """Insert (user, tconst, kind[, value[, at]]) tuples in one transaction"""
+        rows = [self._row(*event) for event in events]
+        with self._lock:
+            self._conn.executemany("INSERT INTO interactions VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def history(self, user, limit=None):
+        """{tconst: (explicit strength, impressions)} over the user's most recent `limit` events"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT tconst, {_strength_sql()} FROM "
+                f"(SELECT * FROM interactions WHERE user = ? ORDER BY at DESC LIMIT ?) GROUP BY tconst",
+                (str(user), -1 if limit is None else limit)
+            ).fetchall()
+        return {tconst: (explicit, shown) for tconst, explicit, shown in rows}
+
+    def matrix(self):
+        """(users, user index, tconst, strength) arrays with one entry per (user, title) pair"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT user, tconst, {_strength_sql()} FROM interactions GROUP BY user, tconst"
+            ).fetchall()
+        users = sorted({row[0] for row in rows})
+        user_row = {user: i for i, user in enumerate(users)}
+        user_idx = np.fromiter((user_row[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+        tconsts = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        explicit = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        shown = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+        strength = explicit + impression_strength(shown)
+        return users, user_idx, tconsts, strength
+
+    def stats(self):
+        with self._lock:
+            kinds = dict(self._conn.execute("SELECT kind, COUNT(*) FROM interactions GROUP BY kind").fetchall())
+            users, titles = self._conn.execute(
+                "SELECT COUNT(DISTINCT user), COUNT(DISTINCT tconst) FROM interactions").fetchone()
+        return {'events': kinds, 'users': users, 'titles': titles}
+
+
+def _by_row(rows, n_rows):
+    """(order, indptr) grouping entries by row index, CSR style"""
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return order, indptr
+
+
+class ImplicitALS:
+    """Implicit-feedback matrix factorization by alternating least squares.
+
+    Strength s becomes preference p = [s > 0] with confidence c = 1 + alpha * |s|, so a dismissal
+    is a confident "no" while a bare impression is a weak one. Every row solve uses the
+    YtY + Yi^T (Ci - I) Yi trick, touching only the titles that row interacted with.
+    """
+
+    def __init__(self, factors=32, regularization=0.1, alpha=20.0, iterations=10, seed=0):
+        self.factors = factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.seed = seed
+        self.item_factors = None
+        self.tconsts = np.zeros(0, dtype=np.int64)
+        self.item_row = {}
+        self._gram = None
+
+    def __len__(self):
+        return len(self.tconsts)
+
+    def fit(self, user_idx, tconsts, strength, n_users=None):
+        """Train on (user index, tconst, strength) entries; returns the user factors"""
+        start = time.perf_counter()
+        self.tconsts, item_idx = np.unique(tconsts, return_inverse=True)
+        self.item_row = {int(t): i for i, t in enumerate(self.tconsts)}
+        n_users = n_users or int(user_idx.max()) + 1
+        preference = (strength > 0).astype(np.float64)
+        confidence = 1.0 + self.alpha * np.abs(strength)
+
+        user_order, user_ptr = _by_row(user_idx, n_users)
+        item_order, item_ptr = _by_row(item_idx, len(self.tconsts))
+        rng = np.random.default_rng(self.seed)
+        users = rng.normal(scale=0.01, size=(n_users, self.factors))
+        items = rng.normal(scale=0.01, size=(len(self.tconsts), self.factors))
+        for _ in range(self.iterations):
+            users = self._solve_rows(items, user_ptr, item_idx[user_order], confidence[user_order],
+                                     preference[user_order])
+            items = self._solve_rows(users, item_ptr, user_idx[item_order], confidence[item_order],
+                                     preference[item_order])
+        self.item_factors = items
+        self._gram = items.T @ items
+        self.fit_seconds = time.perf_counter() - start
+        return users
+
+    def _solve_rows(self, fixed, indptr, indices, confidence, preference):
+        gram = fixed.T @ fixed
+        solved = np.zeros((len(indptr) - 1, self.factors))
+        for row in range(len(indptr) - 1):
+            lo, hi = indptr[row], indptr[row + 1]
+            if lo < hi:
+                solved[row] = self._solve(fixed, gram, indices[lo:hi], confidence[lo:hi], preference[lo:hi])
+        return solved
+
+    def _solve(self, fixed, gram, indices, confidence, preference):
+        selected = fixed[indices]
+        a = gram + (selected.T * (confidence - 1.0)) @ selected
+        a[np.diag_indices_from(a)] += self.regularization
+        return np.linalg.solve(a, selected.T @ (confidence * preference))
+
+    def fold_in(self, history):
+        """User vector for a {tconst: strength} history against the trained titles (None if none are known)"""
+        if self.item_factors is None:
+            return None
+        known = [(self.item_row[t], s) for t, s in history.items() if t in self.item_row]
+        if not known:
+            return None
+        rows = np.fromiter((r for r, _ in known), dtype=np.int64, count=len(known))
+        strength = np.fromiter((s for _, s in known), dtype=np.float64, count=len(known))
+        return self._solve(self.item_factors, self._gram, rows, 1.0 + self.alpha * np.abs(strength),
+                           (strength > 0).astype(np.float64))
+
+    def scores(self, vector, tconsts):
+        """Predicted preference of `vector` for each tconst (NaN for titles the model has not seen)"""
+        rows = np.fromiter((self.item_row.get(t, -1) for t in tconsts), dtype=np.int64, count=len(tconsts))
+        known = rows >= 0
+        scores = np.full(len(tconsts), np.nan)
+        scores[known] = self.item_factors[rows[known]] @ vector
+        return scores
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, tconsts=self.tconsts, item_factors=self.item_factors,
+                 params=np.array([self.factors, self.regularization, self.alpha, self.iterations, self.seed]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved model, or None if the file does not exist yet"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as saved:
+            factors, regularization, alpha, iterations, seed = saved['params'].tolist()
+            model = cls(int(factors), regularization, alpha, int(iterations), int(seed))
+            model.tconsts = saved['tconsts']
+            model.item_factors = saved['item_factors']
+        model.item_row = {int(t): i for i, t in enumerate(model.tconsts)}
+        model._gram = model.item_factors.T @ model.item_factors
+        return model
+
+
+def _unit(values):
+    """Min-max scale to [0, 1]; NaNs (unknown) become the neutral 0.5"""
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.full(len(values), 0.5)
+    lo, hi = values[finite].min(), values[finite].max()
+    scaled = np.full(len(values), 0.5)
+    scaled[finite] = (values[finite] - lo) / (hi - lo) if hi > lo else 0.5
+    return scaled
+
+
+class Personalizer:
+    """Records feedback and re-ranks candidate pools per user (see module docstring).
+
+    weight is the share of predicted affinity in the blended score (the rest is the ranker's
+    score); pool_factor is how many candidates per requested result are re-ranked.
+    """
+
+    def __init__(self, log, model=None, model_path=None, weight=0.5, budget_ms=5.0, max_history=500,
+                 pool_factor=3):
+        self.log = log
+        self.model = model
+        self.model_path = model_path
+        self.weight = weight
+        self.budget_ms = budget_ms
+        self.max_history = max_history
+        self.pool_factor = pool_factor
+        self.stats = {'reranked': 0, 'unchanged': 0, 'over_budget': 0, 'folded_in': 0}
+        # Folded-in user vectors and excluded titles, dropped whenever the user gives new feedback
+        self._users = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, directory=DEFAULT_DIR, **options):
+        """Personalizer over the log and model kept in `directory` (None: in memory only)"""
+        if directory is None:
+            return cls(InteractionLog(':memory:'), **options)
+        model_path = os.path.join(directory, 'personalization.npz')
+        return cls(InteractionLog(os.path.join(directory, 'interactions.sqlite3')), ImplicitALS.load(model_path),
+                   model_path, **options)
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def record(self, user, tconst, kind, value=None):
+        self.log.record(user, tconst, kind, value)
+        self._users.pop(str(user), None)
+
+    def record_shown(self, user, results):
+        # Impressions barely move a profile, so the cached one stays until the next real feedback
+        self.log.record_many([(user, item['tconst'], 'shown') for item in results])
+
+    def profile(self, user):
+        """(vector or None, excluded tconsts), folded in from the recent history on first use"""
+        user = str(user)
+        profile = self._users.get(user)
+        if profile is None:
+            history = self.log.history(user, self.max_history)
+            strength = {t: explicit + impression_strength(shown) for t, (explicit, shown) in history.items()}
+            vector = self.model.fold_in(strength) if self.model is not None else None
+            excluded = {t for t, (explicit, _) in history.items() if explicit <= EXCLUDE_BELOW}
+            profile = self._users[user] = (vector, excluded)
+            self._count('folded_in')
+        return profile
+
+    def rerank(self, user, candidates, limit):
+        """Best `limit` of the ranked candidate dicts for this user, within budget_ms"""
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        vector, excluded = self.profile(user)
+        if excluded:
+            candidates = [c for c in candidates if tconst_number(c['tconst']) not in excluded]
+        if vector is None or len(candidates) < 2:
+            self._count('unchanged')
+            return candidates[:limit]
+        if time.perf_counter() > deadline:
+            # The profile is cached now, so the next query for this user fits
+            self._count('over_budget')
+            return candidates[:limit]
+
+        affinity = self.model.scores(vector, [tconst_number(c['tconst']) for c in candidates])
+        base = np.array([c.get('score') if c.get('score') is not None else np.nan for c in candidates], dtype=np.float64)
+        blended = (1 - self.weight) * _unit(base) + self.weight * _unit(affinity)
+        order = np.argsort(-blended, kind='stable')[:limit]
+        if time.perf_counter() > deadline:
+            self._count('over_budget')
+            return candidates[:limit]
+
+        results = []
+        for i in order:
+            candidate = candidates[i]
+            candidate['affinity'] = round(float(affinity[i]), 3) if np.isfinite(affinity[i]) else None
+            results.append(candidate)
+        self._count('reranked')
+        return results
+
+    def train(self, **options):
+        """Full retrain from the log; replaces the model and forgets every folded-in profile"""
+        users, user_idx, tconsts, strength = self.log.matrix()
+        if not users:
+            return None
+        model = ImplicitALS(**options)
+        model.fit(user_idx, tconsts, strength, len(users))
+        if self.model_path:
+            model.save(self.model_path)
+        self.model = model
+        self._users.clear()
+        return model
+
+
+def synthetic_interactions(n_users=2000, n_titles=5000, n_tastes=12, per_user=40, seed=0):
+    """Event tuples from users with one or two hidden tastes each, plus the tastes of every title.
+
+    Titles belong to one taste and have Zipf-like popularity. Users mostly see titles of their
+    tastes, click those far more often than others, rate clicked titles by fit and dismiss some
+    of what does not fit.
+    """
+    rng = np.random.default_rng(seed)
+    title_taste = rng.integers(n_tastes, size=n_titles)
+    popularity = 1.0 / np.arange(1, n_titles + 1) ** 0.8
+    rng.shuffle(popularity)
+    by_taste = [np.flatnonzero(title_taste == taste) for taste in range(n_tastes)]
+    tconsts = np.arange(1, n_titles + 1) * 7 + 100000
+
+    events, at = [], 0.0
+    for user in range(n_users):
+        tastes = rng.choice(n_tastes, size=rng.integers(1, 3), replace=False)
+        pool = np.concatenate([by_taste[t] for t in tastes])
+        weights = popularity[pool] / popularity[pool].sum()
+        n_fit = int(per_user * 0.8)
+        shown = np.concatenate([rng.choice(pool, size=min(n_fit, len(pool)), replace=False, p=weights),
+                                rng.choice(n_titles, size=per_user - n_fit, replace=False,
+                                           p=popularity / popularity.sum())])
+        for title in np.unique(shown):
+            at += 1.0
+            fits = title_taste[title] in tastes
+            tconst = int(tconsts[title])
+            events.append((f"user{user}", tconst, 'shown', None, at))
+            if rng.random() < (0.6 if fits else 0.08):
+                events.append((f"user{user}", tconst, 'clicked', None, at))
+                if rng.random() < 0.3:
+                    rating = rng.integers(7, 11) if fits else rng.integers(2, 7)
+                    events.append((f"user{user}", tconst, 'rated', float(rating), at))
+            elif not fits and rng.random() < 0.2:
+                events.append((f"user{user}", tconst, 'dismissed', None, at))
+    return events, dict(zip(tconsts.tolist(), title_taste.tolist()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['train', 'stats'])
+    parser.add_argument('--dir', default=DEFAULT_DIR, help='directory holding interactions.sqlite3')
+    parser.add_argument('--factors', type=int, default=32)
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    personalizer = Personalizer.open(args.dir)
+    if args.command == 'train':
+        model = personalizer.train(factors=args.factors, iterations=args.iterations)
+        if model is None:
+            print("⚠️ No interactions recorded yet")
+        else:
+            print(f"Trained on {len(model)} titles in {model.fit_seconds:.1f}s -> {personalizer.model_path}")
+    else:
+        print(json.dumps(dict(personalizer.log.stats(), model_titles=len(personalizer.model or ())), indent=2))
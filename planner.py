@@ -0,0 +1,167 @@
+"""Search planning: which IMDb list pages a query really needs.
+
+A query used to cost one search per selected genre plus one combined search. The planner
+
+  * maps genre aliases onto the IMDb genre they search ("gangster" and "crime" are both
+    genres=crime) and drops duplicate URLs, including the combined search of a single genre
+  * derives the combined (intersection) list locally from the per-genre lists when their pages are
+    already cached: search items carry their genres (__NEXT_DATA__), and every title of the
+    intersection rated above the lowest per-genre cut-off is guaranteed to be on one of them
+  * counts requested, planned and issued searches, and the search pages really downloaded
+    ('upstream': cache misses and revalidations), so the savings show up in the stats
+
+Derivation rarely fires when every per-genre list fills its first page. The lists are sorted by
+rating, so the certain part of the intersection is only what both top-50s share above the
+lower cut-off. On the benchmark fixture that reaches 10 titles for 1 of 395 genre pairs. It
+mostly fires when one genre's list fits on one page: the intersection is then fully known (91 of
+175 such pairs). It is attempted only when the per-genre pages are cached anyway (or with
+prefer_fewer_requests), so a miss costs nothing beyond the combined search made regardless.
+
+Lists are read page by page through ListCursors: a further page (IMDb's start= offset) is only
+requested while the merged candidates cannot fill the ranking pool.
+"""
+import threading
+
+from ranking import parse_rating
+
+# Titles per IMDb search result page, and how many the combined search contributes to the pool
+SEARCH_PAGE_SIZE = 50
+COMBINED_ITEMS = 10
+
+
+class SearchPlan:
+    """The search pages one query needs"""
+
+    def __init__(self, per_genre, combined, requested):
+        # [(url, imdb genre, [user genres it covers])]
+        self.per_genre = per_genre
+        # (url, [imdb genres], [user genres]) or None when there is nothing to intersect
+        self.combined = combined
+        # Searches the one-per-genre-plus-combined scheme would have issued
+        self.requested = requested
+
+    @property
+    def searches(self):
+        """(url, user genres) pairs of every distinct search, combined last"""
+        searches = [(url, genres) for url, _, genres in self.per_genre]
+        if self.combined:
+            searches.append((self.combined[0], self.combined[2]))
+        return searches
+
+
+class ListCursor:
+    """One search list read page by page (start= offsets), best rated first, up to `wanted` items"""
+
+    def __init__(self, url, genres, wanted, first_page):
+        self.url = url
+        self.genres = genres
+        self.wanted = wanted
+        self.next_start = len(first_page) + 1
+        self.items = first_page[:wanted]
+        # A short page is the last one
+        self.exhausted = len(first_page) < SEARCH_PAGE_SIZE
+
+    @property
+    def open(self):
+        """Whether reading another page could add items this list still contributes"""
+        return not self.exhausted and len(self.items) < self.wanted
+
+    def next_url(self):
+        return f"{self.url}&start={self.next_start}"
+
+    def add(self, page):
+        self.next_start += len(page)
+        self.items.extend(page[:self.wanted - len(self.items)])
+        self.exhausted = len(page) < SEARCH_PAGE_SIZE
+
+
+class QueryPlanner:
+    """Builds SearchPlans for a ContentRecommender and derives intersections from per-genre pages.
+
+    With prefer_fewer_requests=True the combined search always waits for the per-genre pages and is
+    only fetched when it cannot be derived; by default that only happens when they are cached, so
+    a cold query never pays an extra round trip.
+    """
+
+    def __init__(self, recommender, prefer_fewer_requests=False):
+        self.recommender = recommender
+        self.prefer_fewer_requests = prefer_fewer_requests
+        self.stats = {'requested': 0, 'planned': 0, 'issued': 0, 'derived': 0, 'upstream': 0}
+        self._lock = threading.Lock()
+
+    def imdb_genre(self, genre):
+        """The IMDb genre a user genre searches, e.g. 'gangster' -> 'crime'"""
+        return self.recommender.genre_params.get(genre, f'genres={genre}').split('=', 1)[1]
+
+    def search_url(self, imdb_genres, content_type):
+        title_type = {'M': "&title_type=feature", 'S': "&title_type=tv_series"}.get(content_type, "")
+        params = '&'.join(f"genres={g}" for g in imdb_genres)
+        return f"{self.recommender.base_url}/search/title/?{params}{title_type}&sort=user_rating,desc"
+
+    def plan(self, genres, content_type):
+        """SearchPlan for 1+ user genres and content type M/S/B"""
+        canonical = {}
+        for genre in genres:
+            canonical.setdefault(self.imdb_genre(genre), []).append(genre)
+        per_genre = [(self.search_url([g], content_type), g, covered) for g, covered in canonical.items()]
+
+        # Only genres with a known IMDb parameter take part in the intersection, as before
+        known = sorted({self.imdb_genre(g) for g in genres if g in self.recommender.genre_params})
+        combined = None
+        if len(known) > 1:
+            combined = (self.search_url(known, content_type), known, list(genres))
+        requested = len(genres) + (1 if known else 0)
+        return SearchPlan(per_genre, combined, requested)
+
+    def should_defer(self, plan):
+        """Wait for the per-genre pages before deciding on the combined search?"""
+        if plan.combined is None:
+            return False
+        if self.prefer_fewer_requests:
+            return True
+        cache = self.recommender.cache
+        grace = self.recommender.stale_while_revalidate
+        return cache is not None and all(cache.has_fresh_response(url, 'search', grace) for url, _, _ in plan.per_genre)
+
+    def derive(self, plan, pages, items=COMBINED_ITEMS):
+        """Top `items` of the combined search computed from the full per-genre pages, or None if unknowable
+        (usually the case when all of them are full pages, see module docstring)"""
+        wanted = set(plan.combined[1])
+        cutoff = None
+        intersection = {}
+        for page in pages:
+            ratings = [r for r in (parse_rating(item['rating']) for item in page) if r == r]
+            if len(page) >= SEARCH_PAGE_SIZE and ratings:
+                # A full page may continue: titles rated at or below its last rating can be missing
+                cutoff = min(ratings) if cutoff is None else min(cutoff, min(ratings))
+            for item in page:
+                if item.get('genres') is None:
+                    return None  # this page backend does not report genres
+                if wanted <= {g.lower() for g in item['genres']}:
+                    intersection.setdefault(item['tconst'], item)
+
+        rated = [item for item in intersection.values() if parse_rating(item['rating']) == parse_rating(item['rating'])]
+        rated.sort(key=lambda item: (-parse_rating(item['rating']), -item.get('votes', 0)))
+        if cutoff is not None:
+            certain = [item for item in rated if parse_rating(item['rating']) > cutoff]
+            if len(certain) < items:
+                return None
+            rated = certain
+        return [dict(item) for item in rated[:items]]
+
+    def record(self, plan, issued, derived):
+        """Count one executed plan; `issued` is the search pages it asked for, cached or not"""
+        with self._lock:
+            self.stats['requested'] += plan.requested
+            self.stats['planned'] += len(plan.searches)
+            self.stats['issued'] += issued
+            self.stats['derived'] += int(derived)
+        metrics = self.recommender.metrics
+        metrics.increment('searches_total', {'stage': 'requested'}, plan.requested)
+        metrics.increment('searches_total', {'stage': 'issued'}, issued)
+
+    def count_upstream(self):
+        """Count one search page actually requested upstream (a cache miss or a revalidation)"""
+        with self._lock:
+            self.stats['upstream'] += 1
+        self.recommender.metrics.increment('searches_total', {'stage': 'upstream'})
@@ -0,0 +1,113 @@
+import re
+
+import numpy as np
+
+RATING_RE = re.compile(r'\d+(?:\.\d+)?')
+VOTES_RE = re.compile(r'([\d.,]+)\s*([KM]?)', re.I)
+VOTE_MULTIPLIERS = {'': 1, 'K': 1000, 'M': 1000000}
+
+STRATEGIES = ('rating', 'bayesian')
+
+
+def parse_rating(value):
+    """Numeric rating from '8.7', '8.7(2.9M)', 8.7 or 'N/A' (NaN when missing)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = RATING_RE.search(value or '')
+    return float(match.group()) if match else float('nan')
+
+
+def parse_votes(value):
+    """Vote count from 1234, '1,234', '(950K)' or '2.9M' (0 when missing)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = VOTES_RE.search(value or '')
+    if not match:
+        return 0
+    number = match.group(1).replace(',', '')
+    try:
+        return int(float(number) * VOTE_MULTIPLIERS[match.group(2).upper()])
+    except ValueError:
+        return 0
+
+
+def popcount32(values):
+    """Number of set bits in each element of a uint32 array"""
+    v = values.astype(np.uint32)
+    v = v - ((v >> 1) & 0x55555555)
+    v = (v & 0x33333333) + ((v >> 2) & 0x33333333)
+    v = (v + (v >> 4)) & 0x0F0F0F0F
+    return ((v * 0x01010101) & 0xFFFFFFFF) >> 24
+
+
+class Ranker:
+    """Scores candidates in one vectorized pass and selects the top-k without a full sort.
+
+    Strategies:
+      'rating'    raw IMDb rating
+      'bayesian'  IMDb-style weighted rating v/(v+m)*R + m/(v+m)*C, which stops a 9.8 with
+                  40 votes from outranking a 9.0 with two million
+    genre_bonus is added for every requested genre a title matches beyond the first; canonical maps a
+    requested genre to the IMDb genre it searches, so aliases ('gangster', 'crime') count once.
+    """
+
+    def __init__(self, strategy='bayesian', min_votes=25000, prior=None, genre_bonus=0.1, canonical=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown ranking strategy {strategy!r}, expected one of {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+        self.min_votes = min_votes
+        self.prior = prior
+        self.genre_bonus = genre_bonus
+        self.canonical = canonical
+
+    def score(self, ratings, votes, overlaps=None):
+        """Scores for parallel rating/vote/genre-overlap arrays; titles without a rating score -inf"""
+        ratings = np.asarray(ratings, dtype=np.float64)
+        if self.strategy == 'bayesian':
+            votes = np.asarray(votes, dtype=np.float64)
+            rated = ~np.isnan(ratings)
+            prior = self.prior if self.prior is not None else (ratings[rated].mean() if rated.any() else 0.0)
+            scores = (votes * ratings + self.min_votes * prior) / (votes + self.min_votes)
+        else:
+            scores = ratings.copy()
+
+        if overlaps is not None and self.genre_bonus:
+            scores += self.genre_bonus * np.maximum(np.asarray(overlaps, dtype=np.float64) - 1, 0)
+        scores[np.isnan(scores)] = -np.inf
+        return scores
+
+    def overlap(self, genres):
+        """Distinct IMDb genres among matched/requested genre names"""
+        return len({self.canonical(g) for g in genres} if self.canonical else set(genres))
+
+    def top_indices(self, scores, votes, k):
+        """Indices of the k best scores, best first; more votes wins ties"""
+        if k <= 0 or len(scores) == 0:
+            return np.zeros(0, dtype=np.intp)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        order = np.lexsort((-np.asarray(votes, dtype=np.float64)[top], -scores[top]))
+        return top[order]
+
+    def score_candidates(self, candidates):
+        """(scores, votes) arrays for candidate dicts with rating, votes and matched_genres keys"""
+        n = len(candidates)
+        ratings = np.fromiter((parse_rating(c['rating']) for c in candidates), dtype=np.float64, count=n)
+        votes = np.fromiter((parse_votes(c.get('votes')) for c in candidates), dtype=np.float64, count=n)
+        overlaps = np.fromiter((self.overlap(c.get('matched_genres') or ()) for c in candidates), dtype=np.float64, count=n)
+        return self.score(ratings, votes, overlaps), votes
+
+    def top_k(self, candidates, k):
+        """Rank candidate dicts (rating, votes and matched_genres keys) and return the best k"""
+        if not candidates:
+            return []
+        scores, votes = self.score_candidates(candidates)
+        top = self.top_indices(scores, votes, k)
+        results = []
+        for i in top:
+            candidate = candidates[i]
+            candidate['score'] = round(float(scores[i]), 3) if np.isfinite(scores[i]) else None
+            results.append(candidate)
+        return results
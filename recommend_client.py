@@ -0,0 +1,164 @@
+"""Thin client for the recommender daemon (python movie_recommendation_3.py --daemon).
+
+Only the standard library's socket/json are imported, so a query costs an interpreter start plus
+one round trip over a Unix domain socket; the daemon keeps the recommender, its connection pools
+and caches warm between queries.
+
+    python recommend_client.py action drama --type M --limit 5
+    python recommend_client.py film noir, crime      # commas separate genres; the daemon also reads "film noir" as one
+    python recommend_client.py --spawn comedy        # start the daemon first if it is not running
+    python recommend_client.py comedy --user alice   # personalized (daemon started with --personalize)
+    python recommend_client.py --user alice --feedback rated tt0468569 9
+    python recommend_client.py --lookup "the drak kni"     # typo-tolerant genre/title autocomplete
+    python recommend_client.py --stats
+"""
+import json
+import os
+import socket
+import sys
+import time
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'imdb-recommender', 'daemon.sock')
+
+
+class DaemonClient:
+    """One connection to the daemon; requests and responses are single JSON lines"""
+
+    def __init__(self, path=DEFAULT_SOCKET_PATH, timeout=120):
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.reader = self.sock.makefile('rb')
+
+    def request(self, op, **params):
+        """Send one request and return the decoded response; raises RuntimeError on a daemon error"""
+        self.sock.sendall(json.dumps(dict(params, op=op)).encode('utf-8') + b'\n')
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'unknown daemon error'))
+        return response
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def spawn_daemon(path=DEFAULT_SOCKET_PATH, extra_args=(), wait=30):
+    """Start the daemon in the background and return a connected client once it answers"""
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.log", 'ab') as log:
+        subprocess.Popen([sys.executable, os.path.join(here, 'movie_recommendation_3.py'), '--daemon', path,
+                          *extra_args], stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True)
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            return DaemonClient(path)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"The daemon did not come up within {wait}s, see {path}.log")
+            time.sleep(0.05)
+
+
+def print_results(results):
+    """Same layout as ContentRecommender.display_recommendations"""
+    if not results:
+        print("⚠️ No matches found. Try different genres.")
+        return
+    print("\n🎉 Here are your personalized recommendations: 🎉")
+    for i, rec in enumerate(results, 1):
+        print(f"\n{i}. {rec['title']} ({rec['year']})")
+        print(f"   ⭐ IMDb Rating: {rec['rating']}/10")
+        print(f"   ⭐ Synopsis: {rec['synopsis']}")
+        print(f"   ⭐ Link: {rec['link']}")
+        if rec.get('image_url'):
+            print(f"   📷 Image: {rec['image_url']}")
+            if rec.get('thumbnail'):
+                print("\n   [Small thumbnail preview]")
+                print(f"\033]1337;File=inline=1;width=30;height=40;:{rec['thumbnail']}\a")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('genres', nargs='*', help='one or more genres, e.g. action drama or film noir, crime')
+    parser.add_argument('--type', default='B', type=str.upper, choices=['M', 'S', 'B'], help='Movies, Series or Both')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help='daemon socket path')
+    parser.add_argument('--user', help='personalize for this user')
+    parser.add_argument('--feedback', nargs='+', metavar='KIND TCONST [RATING]',
+                        help='record clicked/dismissed/rated feedback for --user, e.g. rated tt0468569 9')
+    parser.add_argument('--lookup', metavar='TEXT', help='autocomplete a genre or title (typos allowed)')
+    parser.add_argument('--thumbnails', action='store_true', help='ask the daemon for inline poster thumbnails')
+    parser.add_argument('--json', action='store_true', help='print the raw JSON response')
+    parser.add_argument('--spawn', action='store_true', help='start the daemon if it is not running')
+    parser.add_argument('--stats', action='store_true', help="print the daemon's stats")
+    parser.add_argument('--stop', action='store_true', help='shut the daemon down')
+    parser.add_argument('--timing', action='store_true', help='report round-trip and daemon-side time on stderr')
+    args = parser.parse_args(argv)
+    if not (args.genres or args.stats or args.stop or args.feedback or args.lookup):
+        parser.error("give at least one genre (or --feedback / --lookup / --stats / --stop)")
+    if args.feedback and (args.user is None or not 2 <= len(args.feedback) <= 3):
+        parser.error("--feedback needs --user and KIND TCONST [RATING]")
+
+    start = time.perf_counter()
+    try:
+        client = DaemonClient(args.socket)
+    except OSError:
+        if not args.spawn:
+            print(f"⚠️ No daemon at {args.socket}; start one with "
+                  f"`python movie_recommendation_3.py --daemon` or pass --spawn", file=sys.stderr)
+            return 2
+        client = spawn_daemon(args.socket)
+    connected = time.perf_counter()
+
+    with client:
+        try:
+            if args.stop:
+                response = client.request('shutdown')
+            elif args.stats:
+                response = client.request('stats')
+            elif args.lookup:
+                response = client.request('lookup', q=args.lookup, k=args.limit)
+            elif args.feedback:
+                kind, tconst, *value = args.feedback
+                response = client.request('feedback', user=args.user, tconst=tconst, kind=kind,
+                                          value=float(value[0]) if value else None)
+            else:
+                # "film noir, crime" arrives as three words; commas, when given, say where genres end
+                genres = ' '.join(args.genres).split(',') if any(',' in g for g in args.genres) else args.genres
+                response = client.request('recommend', genres=genres, content_type=args.type,
+                                          limit=args.limit, thumbnails=args.thumbnails, user=args.user)
+        except RuntimeError as e:
+            print(f"⚠️ {e}", file=sys.stderr)
+            return 1
+    done = time.perf_counter()
+
+    if args.lookup and not args.json:
+        for match in response['results']:
+            print(f"{'🎭' if match['kind'] == 'genre' else '🎬'} {match['name']}  {match.get('tconst', '')}")
+    elif args.json or not args.genres or args.stats or args.stop or args.feedback:
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    else:
+        print_results(response['results'])
+    if args.timing:
+        print(f"⏱️ connect {(connected - start) * 1000:.1f} ms, query {(done - connected) * 1000:.1f} ms "
+              f"(daemon {response.get('seconds', 0) * 1000:.1f} ms)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""Compact storage for every title the recommender has seen.
+
+RecordStore keeps titles in parallel typed arrays keyed by the integer part of the tconst: numeric
+year/rating/votes, a genre bitmask and a title type code, with titles, synopses and poster URLs
+interned in one StringArena. A row costs a few dozen bytes plus its (shared) strings instead of a
+dict per title. The store round-trips through a flat binary format (see encode) that is used for
+the on-disk snapshot and is cheap enough to ship between processes.
+
+TitleRecord is the slotted value type handed out by the store; results at the API boundaries stay
+plain dicts (TitleRecord.from_result / to_result convert).
+"""
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+
+from catalog import GENRE_BITS, IMDB_GENRES, TITLE_TYPE_CODES, TITLE_TYPES
+from ranking import parse_rating, parse_votes
+
+MAGIC = b'TREC'
+VERSION = 1
+# magic, version, rows, arena offsets, arena bytes
+HEADER = struct.Struct('<4sHIII')
+# (attribute, array typecode) in file order
+COLUMNS = [
+    ('tconst', 'I'), ('year', 'h'), ('end_year', 'h'), ('rating', 'f'), ('votes', 'I'),
+    ('genres', 'I'), ('title_type', 'B'), ('title', 'I'), ('synopsis', 'I'), ('image_url', 'I'),
+]
+# Columns holding StringArena ids
+STRING_COLUMNS = ('title', 'synopsis', 'image_url')
+
+NO_STRING = 0  # arena id 0 is reserved for None
+INTERN_MAX = 64  # UTF-8 bytes up to which arena strings are deduplicated
+UNKNOWN_TYPE = 255
+OPEN_ENDED = -1  # end_year of a series that is still running ("2019–")
+YEAR_RE = re.compile(r'(\d{4})(?:\s*[–-]\s*(\d{4})?)?')
+TCONST_RE = re.compile(r'tt(\d+)')
+
+
+def tconst_number(tconst):
+    """7 from 'tt0000007', '/title/tt0000007/' or 7"""
+    if isinstance(tconst, int):
+        return tconst
+    match = TCONST_RE.search(tconst)
+    if not match:
+        raise ValueError(f"Not an IMDb title ID: {tconst!r}")
+    return int(match.group(1))
+
+
+def parse_years(value):
+    """(year, end_year) from '2008', '2008–2013', '2019–' or 'N/A' (0 when unknown)"""
+    match = YEAR_RE.match(str(value or '').strip())
+    if not match:
+        return 0, 0
+    end = match.group(2)
+    if end:
+        return int(match.group(1)), int(end)
+    return int(match.group(1)), OPEN_ENDED if match.group(0) != match.group(1) else 0
+
+
+def format_years(year, end_year):
+    if not year:
+        return "N/A"
+    if end_year == OPEN_ENDED:
+        return f"{year}–"
+    return f"{year}–{end_year}" if end_year else str(year)
+
+
+class StringArena:
+    """Strings packed into one UTF-8 buffer and addressed by integer ids; id 0 is None.
+
+    Short strings (titles, placeholders like "Synopsis not available") are interned so repeats
+    share one copy; long ones (synopses, poster URLs) rarely repeat and are appended as they come.
+    """
+
+    def __init__(self, offsets=None, blob=None):
+        # offsets[i]:offsets[i + 1] is string i; the empty slot 0 stands for None
+        self.offsets = offsets if offsets is not None else array('I', [0, 0])
+        self.blob = blob if blob is not None else bytearray()
+        self._ids = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _interned(self):
+        if self._ids is None:
+            offsets, blob = self.offsets, self.blob
+            self._ids = {bytes(blob[offsets[i]:offsets[i + 1]]): i for i in range(1, len(offsets) - 1)
+                         if offsets[i + 1] - offsets[i] <= INTERN_MAX}
+        return self._ids
+
+    def add(self, text):
+        if text is None:
+            return NO_STRING
+        encoded = text.encode('utf-8')
+        if len(encoded) <= INTERN_MAX:
+            ids = self._interned()
+            found = ids.get(encoded)
+            if found is not None:
+                return found
+            ids[encoded] = len(self.offsets) - 1
+        self.blob += encoded
+        self.offsets.append(len(self.blob))
+        return len(self.offsets) - 2
+
+    def get(self, string_id):
+        if string_id == NO_STRING:
+            return None
+        return self.blob[self.offsets[string_id]:self.offsets[string_id + 1]].decode('utf-8')
+
+
+class TitleRecord:
+    """One title with numeric fields; strings are plain str (the store interns them)"""
+    __slots__ = ('tconst', 'title', 'year', 'end_year', 'rating', 'votes', 'genres', 'title_type',
+                 'synopsis', 'image_url')
+
+    def __init__(self, tconst, title=None, year=0, end_year=0, rating=float('nan'), votes=0, genres=0,
+                 title_type=UNKNOWN_TYPE, synopsis=None, image_url=None):
+        self.tconst = tconst
+        self.title = title
+        self.year = year
+        self.end_year = end_year
+        self.rating = rating
+        self.votes = votes
+        self.genres = genres
+        self.title_type = title_type
+        self.synopsis = synopsis
+        self.image_url = image_url
+
+    def __repr__(self):
+        return f"TitleRecord(tt{self.tconst:07d}, {self.title!r}, {format_years(self.year, self.end_year)})"
+
+    @classmethod
+    def from_result(cls, result, title_type=None):
+        """Record for a ContentRecommender result / cache dict"""
+        year, end_year = parse_years(result.get('year'))
+        genres = 0
+        for genre in result.get('genres') or ():
+            genres |= GENRE_BITS.get(genre.lower().replace(' ', '-'), 0)
+        synopsis = result.get('synopsis')
+        return cls(tconst_number(result['tconst']), result.get('title'), year, end_year,
+                   parse_rating(result.get('rating')), parse_votes(result.get('votes')), genres,
+                   TITLE_TYPE_CODES.get(title_type, UNKNOWN_TYPE), synopsis, result.get('image_url'))
+
+    @property
+    def genre_names(self):
+        return [genre for i, genre in enumerate(IMDB_GENRES) if self.genres >> i & 1]
+
+    @property
+    def title_type_name(self):
+        return TITLE_TYPES[self.title_type] if self.title_type < len(TITLE_TYPES) else None
+
+    def to_result(self, base_url="https://www.imdb.com"):
+        """The result dict ContentRecommender would have built for this title"""
+        tconst = f"tt{self.tconst:07d}"
+        return {
+            'tconst': tconst,
+            'title': self.title,
+            'year': format_years(self.year, self.end_year),
+            'rating': f"{self.rating:.1f}" if self.rating == self.rating else "N/A",
+            'votes': self.votes,
+            'synopsis': self.synopsis,
+            'link': f"{base_url}/title/{tconst}/",
+            'image_url': self.image_url,
+            'genres': self.genre_names or None,
+        }
+
+
+class RecordStore:
+    """Column store of TitleRecords keyed by integer tconst (see module docstring)"""
+
+    def __init__(self, path=None):
+        self.path = path
+        for name, typecode in COLUMNS:
+            setattr(self, f'_{name}', array(typecode))
+        self.arena = StringArena()
+        self.row_of = {}
+        self._lock = threading.Lock()
+        self._unsaved = False
+        self._replaced = 0
+
+    def __len__(self):
+        return len(self._tconst)
+
+    def __contains__(self, tconst):
+        try:
+            return tconst_number(tconst) in self.row_of
+        except ValueError:
+            return False
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self._record(row)
+
+    def add(self, record):
+        """Insert or update a TitleRecord (or result dict); None/unknown fields keep their stored value"""
+        if isinstance(record, dict):
+            record = TitleRecord.from_result(record)
+        arena = self.arena
+        with self._lock:
+            row = self.row_of.get(record.tconst)
+            if row is None:
+                row = self.row_of[record.tconst] = len(self._tconst)
+                self._tconst.append(record.tconst)
+                self._year.append(record.year)
+                self._end_year.append(record.end_year)
+                self._rating.append(record.rating)
+                self._votes.append(record.votes)
+                self._genres.append(record.genres)
+                self._title_type.append(record.title_type)
+                self._title.append(arena.add(record.title))
+                self._synopsis.append(arena.add(record.synopsis))
+                self._image_url.append(arena.add(record.image_url))
+            else:
+                if record.year:
+                    self._year[row], self._end_year[row] = record.year, record.end_year
+                if record.rating == record.rating:
+                    self._rating[row] = record.rating
+                if record.votes:
+                    self._votes[row] = record.votes
+                self._genres[row] |= record.genres
+                if record.title_type != UNKNOWN_TYPE:
+                    self._title_type[row] = record.title_type
+                for name in STRING_COLUMNS:
+                    value = getattr(record, name)
+                    if value is not None:
+                        column = getattr(self, f'_{name}')
+                        previous, column[row] = column[row], arena.add(value)
+                        # The replaced string stays in the arena until encode() compacts it away
+                        self._replaced += previous not in (NO_STRING, column[row])
+            self._unsaved = True
+        return row
+
+    def get(self, tconst, default=None):
+        row = self.row_of.get(tconst_number(tconst))
+        return default if row is None else self._record(row)
+
+    def _record(self, row):
+        get = self.arena.get
+        return TitleRecord(self._tconst[row], get(self._title[row]), self._year[row], self._end_year[row],
+                           self._rating[row], self._votes[row], self._genres[row], self._title_type[row],
+                           get(self._synopsis[row]), get(self._image_url[row]))
+
+    # --- Binary format ---
+    #   header | each column's raw little-endian array | arena offsets (uint32) | arena UTF-8 blob
+
+    def encode(self):
+        with self._lock:
+            if self._replaced:
+                self._compact()
+            arena = self.arena
+            parts = [HEADER.pack(MAGIC, VERSION, len(self._tconst), len(arena.offsets), len(arena.blob))]
+            for name, _ in COLUMNS:
+                parts.append(_little_endian(getattr(self, f'_{name}'), copy=True).tobytes())
+            parts.append(_little_endian(arena.offsets, copy=True).tobytes())
+            parts.append(arena.blob)
+        return b''.join(parts)
+
+    def _compact(self):
+        """Rebuild the arena with only the strings some row still references"""
+        old, arena = self.arena, StringArena()
+        for name in STRING_COLUMNS:
+            setattr(self, f'_{name}', array('I', (arena.add(old.get(i)) for i in getattr(self, f'_{name}'))))
+        self.arena = arena
+        self._replaced = 0
+
+    @classmethod
+    def decode(cls, data, path=None):
+        view = memoryview(data)
+        magic, version, rows, n_offsets, blob_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} title record file")
+        store = cls(path)
+        position = HEADER.size
+        for name, typecode in COLUMNS:
+            column = array(typecode)
+            size = rows * column.itemsize
+            column.frombytes(view[position:position + size])
+            setattr(store, f'_{name}', _little_endian(column))
+            position += size
+        offsets = array('I')
+        offsets.frombytes(view[position:position + n_offsets * offsets.itemsize])
+        position += n_offsets * offsets.itemsize
+        store.arena = StringArena(_little_endian(offsets), bytearray(view[position:position + blob_size]))
+        store.row_of = dict(zip(store._tconst, range(rows)))
+        return store
+
+    def save(self, path=None):
+        path = path or self.path
+        # Cleared before the snapshot is taken, so a concurrent add marks the store unsaved again
+        self._unsaved = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            data = self.encode()
+            with open(f"{path}.tmp", 'wb') as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+        except Exception:
+            self._unsaved = True
+            raise
+
+    def save_if_changed(self):
+        if self.path and self._unsaved:
+            self.save()
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved store, or start an empty one if the file does not exist yet"""
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, 'rb') as f:
+            return cls.decode(f.read(), path)
+
+
+def _little_endian(column, copy=False):
+    """The file format is little-endian; byte-swap (a copy of) the column on big-endian hosts"""
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column) if copy else column
+        column.byteswap()
+    return column
@@ -0,0 +1,219 @@
+"""HTTP service mode: ContentRecommender.recommend() behind a small JSON API.
+
+    GET /recommend?genres=action,drama&type=M&limit=10
+    GET /recommend?genres=comedy&user=alice          (personalized, needs --personalize)
+    GET /feedback?user=alice&tconst=tt0468569&kind=clicked   (kind: clicked, rated&value=8, dismissed)
+    GET /similar?tconst=tt0468569&k=10
+    GET /lookup?q=the+drak+kni&kind=title&k=10   (typo-tolerant autocomplete; kind: genre, title or both)
+    GET /stats
+    GET /metrics          (Prometheus text format; ?format=json for JSON)
+    GET /health
+
+Concurrent identical queries run once and share the answer, which is then kept for a short while;
+concurrent fetches of the same upstream URL (e.g. the "action" list needed by "action, drama" and
+"action, comedy") likewise share a single request.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bulk import FetchMemo, parse_query
+
+
+class LatencyStats:
+    """Per-endpoint request latencies over a sliding window of the most recent requests"""
+
+    def __init__(self, window=2048):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def snapshot(self):
+        """{endpoint: {count, p50_ms, p90_ms, p99_ms, max_ms}}"""
+        with self._lock:
+            samples = {endpoint: sorted(values) for endpoint, values in self._samples.items()}
+            counts = dict(self._counts)
+        report = {}
+        for endpoint, values in samples.items():
+            report[endpoint] = {'count': counts[endpoint]}
+            for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+                report[endpoint][f"{name}_ms"] = round(values[min(int(q * len(values)), len(values) - 1)] * 1000, 2)
+            report[endpoint]['max_ms'] = round(values[-1] * 1000, 2)
+        return report
+
+
+class RecommenderEndpoints:
+    """Request handling shared by the HTTP service and the Unix socket daemon (daemon.py).
+
+    Handlers take a dict of parameters and return a JSON-ready dict; a transport only maps its own
+    request format onto the parameters and writes the answer back.
+    """
+
+    def share_recommender(self, recommender, result_ttl=60, fetch_ttl=300):
+        self.recommender = recommender
+        # Whole answers, keyed by the normalised query
+        self.results = FetchMemo(max_items=1024, ttl=result_ttl)
+        # Upstream pages shared between different queries that need the same list or detail page
+        recommender.fetch_memo = FetchMemo(ttl=fetch_ttl)
+        self.latency = LatencyStats()
+        self.started = time.time()
+
+    def handle_recommend(self, params):
+        """genres (list or comma separated), content_type, limit, user; the answer is shared, do not mutate it"""
+        if not params.get('genres'):
+            raise ValueError("genres is required, e.g. action,drama")
+        genres, content_type, limit = parse_query(
+            json.dumps({'genres': self._resolve_genres(params['genres']),
+                        'content_type': params.get('content_type', 'B'),
+                        'limit': params.get('limit', self.recommender.top_n)})
+        )
+        if not 1 <= limit <= 50:
+            raise ValueError("limit must be between 1 and 50")
+        user = params.get('user')
+
+        def answer():
+            results = self.recommender.recommend(list(genres), content_type, limit, user)
+            return {'query': {'genres': list(genres), 'content_type': content_type, 'limit': limit, 'user': user},
+                    'results': results}
+
+        return self.results.get((genres, content_type, limit, user), answer)
+
+    def _resolve_genres(self, genres):
+        """Canonical genres for typed ones; two adjacent words are tried as one genre first ('film', 'noir')"""
+        words = [g.strip() for g in (genres.split(',') if isinstance(genres, str) else genres) if g.strip()]
+        resolved = []
+        i = 0
+        while i < len(words):
+            pair = f"{words[i]} {words[i + 1]}" if i + 1 < len(words) and ' ' not in words[i] + words[i + 1] else None
+            genre = pair and self.recommender.lookup.resolve_genre(pair)
+            if genre:
+                i += 2
+            else:
+                genre = self.recommender.lookup.resolve_genre(words[i])
+                if genre is None:
+                    raise ValueError(f"Unknown genre {words[i]!r}")
+                i += 1
+            resolved.append(genre)
+        return resolved
+
+    def handle_feedback(self, params):
+        self.recommender.feedback(params['user'], params['tconst'], params['kind'], params.get('value'))
+        # The user's cached answers were ranked without this feedback
+        self.results.forget(lambda key: key[3] == params['user'])
+        return {'recorded': True}
+
+    def handle_similar(self, params):
+        tconst = params['tconst']
+        if tconst not in self.recommender.similarity:
+            raise ValueError(f"{tconst} has not come up in any recommendation yet")
+        return {'tconst': tconst, 'results': self.recommender.similar_to(tconst, int(params.get('k', 10)))}
+
+    def handle_lookup(self, params):
+        k = int(params.get('k', 10))
+        if not 1 <= k <= 50:
+            raise ValueError("k must be between 1 and 50")
+        return {'q': params['q'], 'results': self.recommender.lookup.lookup(params['q'], k, params.get('kind'))}
+
+    def handle_stats(self, params):
+        rec = self.recommender
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'latency': self.latency.snapshot(),
+            'queries': {'computed': self.results.misses, 'shared_or_cached': self.results.hits},
+            'upstream': {'requests': rec.upstream_requests,
+                         'fetches': rec.fetch_memo.misses, 'shared_fetches': rec.fetch_memo.hits},
+            'searches': dict(rec.planner.stats),
+            'personalization': dict(rec.personalizer.stats) if rec.personalizer else None,
+            'warmer': rec.warmer.report() if rec.warmer else None,
+            'cache': rec.cache.stats() if rec.cache else None,
+            'cache_hit_ratio': rec.metrics.to_json().get('cache_hit_ratio'),
+        }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        start = time.perf_counter()
+        parts = urlsplit(self.path)
+        endpoint = parts.path.rstrip('/') or '/'
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        routes = {
+            '/recommend': lambda query: self.server.handle_recommend(
+                dict(query, content_type=query.get('type', 'B'))),
+            '/feedback': self.server.handle_feedback,
+            '/similar': self.server.handle_similar,
+            '/lookup': self.server.handle_lookup,
+            '/stats': self.server.handle_stats,
+            '/metrics': self.server.handle_metrics,
+            '/health': lambda query: {'status': 'ok'},
+        }
+
+        route = routes.get(endpoint)
+        if route is None:
+            status, body = 404, {'error': f"Unknown endpoint {endpoint}"}
+        else:
+            try:
+                status, body = 200, route(query)
+            except KeyError as e:
+                status, body = 400, {'error': f"Missing parameter {e}"}
+            except ValueError as e:
+                status, body = 400, {'error': str(e)}
+            except Exception as e:
+                status, body = 502, {'error': f"{type(e).__name__}: {e}"}
+
+        content_type = 'application/json; charset=utf-8'
+        if isinstance(body, str):
+            data, content_type = body.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.latency.record(endpoint if route else 'unknown', time.perf_counter() - start)
+
+
+class RecommendationService(RecommenderEndpoints, ThreadingHTTPServer):
+    """Threaded HTTP server sharing one ContentRecommender between all requests"""
+    daemon_threads = True
+
+    def __init__(self, address, recommender, result_ttl=60, fetch_ttl=300):
+        super().__init__(address, ServiceHandler)
+        self.share_recommender(recommender, result_ttl, fetch_ttl)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_metrics(self, query):
+        metrics = self.recommender.metrics
+        return metrics.to_json() if query.get('format') == 'json' else metrics.to_prometheus()
+
+
+def serve(recommender, host='127.0.0.1', port=8080, result_ttl=60):
+    """Run the service in the foreground until interrupted"""
+    server = RecommendationService((host, port), recommender, result_ttl=result_ttl)
+    print(f"🎬 Recommendation service listening on {server.base_url}/recommend?genres=action,drama&type=M")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        recommender.fetch_memo = None
+        recommender.close()
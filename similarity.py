@@ -0,0 +1,238 @@
+import math
+import os
+import re
+import threading
+import zlib
+from array import array
+from collections import Counter
+
+import numpy as np
+
+N_FEATURES = 1 << 18
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have he her his in into is it its of on or she so than that
+    the their them then there they this to was were when where which who will with after before while
+""".split())
+
+
+def _feature(term, n_features):
+    # crc32 is stable across processes, unlike hash(), so persisted indexes stay valid
+    return zlib.crc32(term.encode('utf-8')) % n_features
+
+
+def hashed_features(text, genres=(), n_features=N_FEATURES):
+    """Sparse (indices, sublinear tf weights) of the word unigrams, bigrams and genres of a text"""
+    tokens = [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])] + [f"genre:{g.lower()}" for g in genres]
+
+    counts = Counter(_feature(term, n_features) for term in terms)
+    indices = np.fromiter(counts.keys(), dtype=np.uint32, count=len(counts))
+    weights = np.fromiter((1.0 + math.log(c) for c in counts.values()), dtype=np.float32, count=len(counts))
+    order = np.argsort(indices)
+    return indices[order], weights[order]
+
+
+class BruteForceBackend:
+    """Exact cosine scores against every live document via the term postings.
+
+    A backend's candidates() may instead return the rows worth scoring; only those are scored then.
+    """
+    name = 'brute'
+
+    def candidates(self, index, indices, weights):
+        return None  # None means "score everything"
+
+
+BACKENDS = {'brute': BruteForceBackend}
+
+
+class SimilarityIndex:
+    """Incrementally updatable TF-IDF index over hashed synopsis n-grams answering "more like this".
+
+    Documents are stored once as hashed term weights (CSR rows). Adding a document only vectorizes
+    that document; the term postings, IDF and document norms are recomputed from the stored
+    weights on the next query, which is a vectorized O(nnz) pass.
+    """
+
+    def __init__(self, path=None, backend='brute', n_features=N_FEATURES):
+        self.path = path
+        self.n_features = n_features
+        self.backend = BACKENDS[backend]() if isinstance(backend, str) else backend
+        self.tconsts = []
+        self.row_of = {}
+        self._indptr = array('q', [0])
+        self._indices = array('I')
+        self._data = array('f')
+        self._alive = array('b')
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._unsaved = False
+
+    def __len__(self):
+        return len(self.tconsts)
+
+    def __contains__(self, tconst):
+        return tconst in self.row_of
+
+    # The CSR arrays as NumPy views, shared with the backends
+    @property
+    def indptr(self):
+        return np.frombuffer(self._indptr, dtype=np.int64)
+
+    @property
+    def indices(self):
+        return np.frombuffer(self._indices, dtype=np.uint32)
+
+    @property
+    def data(self):
+        return np.frombuffer(self._data, dtype=np.float32)
+
+    def add(self, tconst, text, genres=()):
+        """Add or replace the document for a title"""
+        indices, weights = hashed_features(text, genres, self.n_features)
+        with self._lock:
+            if tconst in self.row_of:
+                # Rows are append-only; the old version just stops matching
+                self._alive[self.row_of[tconst]] = 0
+            self.row_of[tconst] = len(self.tconsts)
+            self.tconsts.append(tconst)
+            self._indices.extend(indices.tolist())
+            self._data.extend(weights.tolist())
+            self._indptr.append(len(self._indices))
+            self._alive.append(1)
+            self._dirty = True
+            self._unsaved = True
+
+    def _refresh(self):
+        """Rebuild postings, IDF and norms from the stored term weights if documents were added"""
+        if not self._dirty:
+            return
+        indptr, indices, data = self.indptr, self.indices, self.data
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        row_ids = np.repeat(np.arange(len(self.tconsts)), np.diff(indptr))
+
+        live = alive[row_ids]
+        df = np.bincount(indices[live], minlength=self.n_features)
+        n_docs = max(int(alive.sum()), 1)
+        self._idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        weighted = data * self._idf[indices]
+        norms = np.sqrt(np.bincount(row_ids, weights=weighted.astype(np.float64) ** 2, minlength=len(self.tconsts)))
+        norms[norms == 0] = 1.0
+        self._norms = norms
+        self._alive_mask = alive
+
+        # Term-major postings (CSC) for scoring a query against every document
+        order = np.argsort(indices, kind='stable')
+        self._post_rows = row_ids[order]
+        self._post_weights = weighted[order]
+        self._term_ptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=self.n_features), out=self._term_ptr[1:])
+        self._dirty = False
+
+    def _row_terms(self, row):
+        lo, hi = self._indptr[row], self._indptr[row + 1]
+        return self.indices[lo:hi], self.data[lo:hi]
+
+    def _score(self, indices, weights, rows=None):
+        """Cosine similarity of a sparse query against all rows, or only `rows` (others score -inf)"""
+        q = weights * self._idf[indices]
+        q = q / (np.linalg.norm(q) or 1.0)
+        if rows is not None:
+            return self._score_rows(indices, q, rows)
+        scores = np.zeros(len(self.tconsts), dtype=np.float64)
+
+        starts, ends = self._term_ptr[indices], self._term_ptr[indices.astype(np.int64) + 1]
+        lengths = ends - starts
+        if lengths.sum():
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            contributions = self._post_weights[positions] * np.repeat(q, lengths)
+            scores = np.bincount(self._post_rows[positions], weights=contributions, minlength=len(self.tconsts))
+        scores = scores / self._norms
+        scores[~self._alive_mask] = -np.inf
+        return scores
+
+    def _score_rows(self, indices, q, rows):
+        """Cosine scores of a normalised query against the given rows only, via their own (CSR) terms"""
+        scores = np.full(len(self.tconsts), -np.inf)
+        rows = rows[self._alive_mask[rows]]
+        if not len(rows):
+            return scores
+        indptr = self.indptr
+        starts, lengths = indptr[rows], indptr[rows + 1] - indptr[rows]
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        terms = self.indices[positions]
+        # Query indices are sorted (hashed_features), so a document term is looked up by bisection
+        slots = np.minimum(np.searchsorted(indices, terms), len(indices) - 1)
+        hit = indices[slots] == terms
+        contributions = np.where(hit, self.data[positions] * self._idf[terms] * q[slots], 0.0)
+        dots = np.bincount(np.repeat(np.arange(len(rows)), lengths), weights=contributions, minlength=len(rows))
+        scores[rows] = dots / self._norms[rows]
+        return scores
+
+    def _top(self, scores, k, exclude=None):
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.tconsts[i], round(float(scores[i]), 4)) for i in top if scores[i] > 0]
+
+    def similar(self, tconst, k=10):
+        """[(tconst, cosine)] of the k titles most similar to an indexed title"""
+        with self._lock:
+            if tconst not in self.row_of:
+                raise KeyError(f"{tconst} is not in the similarity index")
+            self._refresh()
+            row = self.row_of[tconst]
+            indices, weights = self._row_terms(row)
+            scores = self._score(indices, weights, self.backend.candidates(self, indices, weights))
+            return self._top(scores, k, exclude=row)
+
+    def similar_to_text(self, text, genres=(), k=10):
+        """[(tconst, cosine)] of the k titles most similar to free text"""
+        indices, weights = hashed_features(text, genres, self.n_features)
+        with self._lock:
+            self._refresh()
+            scores = self._score(indices, weights, self.backend.candidates(self, indices, weights))
+            return self._top(scores, k)
+
+    def save(self, path=None):
+        """Persist the stored term weights; IDF and postings are derived again on load"""
+        path = path or self.path
+        # Copy under the lock, write outside it, so queries and adds are not held up by the disk
+        with self._lock:
+            arrays = dict(tconsts=np.array(self.tconsts, dtype=str), indptr=self.indptr.copy(),
+                          indices=self.indices.copy(), data=self.data.copy(),
+                          alive=np.frombuffer(self._alive, dtype=np.int8).copy(), n_features=self.n_features)
+            self._unsaved = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._unsaved = True
+            raise
+
+    def save_if_changed(self):
+        if self.path and self._unsaved:
+            self.save()
+
+    @classmethod
+    def load(cls, path, backend='brute'):
+        """Load a saved index, or start an empty one if the file does not exist yet"""
+        if not os.path.exists(path):
+            return cls(path, backend)
+        with np.load(path) as saved:
+            index = cls(path, backend, int(saved['n_features']))
+            index.tconsts = saved['tconsts'].tolist()
+            index._indptr = array('q', saved['indptr'].tobytes())
+            index._indices = array('I', saved['indices'].tobytes())
+            index._data = array('f', saved['data'].tobytes())
+            index._alive = array('b', saved['alive'].tobytes())
+        index.row_of = {t: i for i, t in enumerate(index.tconsts) if index._alive[i]}
+        return index
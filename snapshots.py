@@ -0,0 +1,79 @@
+"""Debounced background saving of the on-disk indexes (similarity, title records, lookup).
+
+Queries only mark the indexes as changed. A background thread writes the snapshots once no
+change has come in for `delay` seconds (and at most `max_delay` after the first one), so a busy
+stretch of queries costs one write instead of one per query and never waits for it. close()
+writes whatever is still pending.
+"""
+import atexit
+import threading
+import time
+
+from metrics import NullMetrics
+
+
+class SnapshotSaver:
+    """Calls save_if_changed() on each index off the request path (see module docstring)"""
+
+    def __init__(self, indexes, delay=2.0, max_delay=30.0, metrics=None):
+        self.indexes = list(indexes)
+        self.delay = delay
+        self.max_delay = max_delay
+        self.metrics = metrics or NullMetrics()
+        self.saves = 0
+        self._first = self._last = None
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+        # One writer at a time: the background thread and a flush() from close() share temp files
+        self._save_lock = threading.Lock()
+
+    def touch(self):
+        """Note that an index changed; it is written later on the background thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._last = time.monotonic()
+            if self._first is None:
+                self._first = self._last
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='snapshots', daemon=True)
+                self._thread.start()
+                # Daemon threads die with the interpreter; do not lose the last changes
+                atexit.register(self.close)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._first is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                wait = min(self._last + self.delay, self._first + self.max_delay) - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                self._first = self._last = None
+            self.flush()
+
+    def flush(self):
+        """Write every index with unsaved changes now"""
+        with self._save_lock:
+            for index in self.indexes:
+                try:
+                    index.save_if_changed()
+                except Exception as e:
+                    self.metrics.error('snapshot', e)
+            self.saves += 1
+
+    def close(self):
+        """Stop the background thread and write what is still pending"""
+        with self._cond:
+            self._closed = True
+            self._first = self._last = None
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
@@ -0,0 +1,69 @@
+import gzip
+import os
+
+import pytest
+
+from catalog import CONTENT_TYPES, GENRE_BITS, OfflineCatalog, genre_mask
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+BASICS = os.path.join(FIXTURES, 'title.basics.sample.tsv.gz')
+RATINGS = os.path.join(FIXTURES, 'title.ratings.sample.tsv.gz')
+
+
+def read_tsv(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = f.readline().rstrip('\n').split('\t')
+        return [dict(zip(header, line.rstrip('\n').split('\t'))) for line in f]
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return OfflineCatalog.build(BASICS, RATINGS)
+
+
+def expected_top(genres, content_type, min_votes, limit):
+    """(rating, tconst) of the best rated matching titles, straight from the TSVs"""
+    ratings = {row['tconst']: (float(row['averageRating']), int(row['numVotes'])) for row in read_tsv(RATINGS)}
+    wanted = {g.replace(' ', '-') for g in genres}
+    rows = []
+    for row in read_tsv(BASICS):
+        rating, votes = ratings.get(row['tconst'], (None, 0))
+        if (row['titleType'] in CONTENT_TYPES[content_type] and rating is not None and votes >= min_votes
+                and wanted & {g.lower() for g in row['genres'].split(',')}):
+            rows.append((rating, row['tconst']))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def test_build_keeps_included_title_types(catalog):
+    included = [row for row in read_tsv(BASICS)
+                if row['titleType'] in ('movie', 'tvSeries', 'tvMiniSeries', 'tvMovie', 'tvSpecial')]
+    assert len(catalog) == len(included)
+    first = catalog.tconst_at(0)
+    assert first == included[0]['tconst']
+    assert catalog.title_at(0) == included[0]['primaryTitle']
+
+
+@pytest.mark.parametrize('genres, content_type', [(['action', 'drama'], 'M'), (['film noir'], 'B'), (['comedy'], 'S')])
+def test_search_matches_the_tsv(catalog, genres, content_type):
+    results = catalog.search(genres, content_type, limit=10)
+    expected = expected_top(genres, content_type, 1000, 10)
+    assert [float(r['rating']) for r in results] == [rating for rating, _ in expected]
+    mask = genre_mask(genres)
+    for result in results:
+        row = catalog.tconst.tolist().index(int(result['tconst'][2:]))
+        assert catalog.genres[row] & mask
+        assert catalog.votes[row] >= 1000
+        assert result['link'] == f"https://www.imdb.com/title/{result['tconst']}/"
+
+
+def test_saved_snapshot_answers_the_same(catalog, tmp_path):
+    catalog.save(str(tmp_path))
+    loaded = OfflineCatalog.load(str(tmp_path))
+    assert len(loaded) == len(catalog)
+    assert loaded.search(['action', 'drama'], 'M', limit=20) == catalog.search(['action', 'drama'], 'M', limit=20)
+
+
+def test_unknown_genre_is_rejected():
+    assert genre_mask(['Sci-Fi', 'film noir']) == GENRE_BITS['sci-fi'] | GENRE_BITS['film-noir']
+    with pytest.raises(ValueError):
+        genre_mask(['gangster'])
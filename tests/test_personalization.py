@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from personalization import ImplicitALS, InteractionLog, Personalizer, synthetic_interactions
+
+
+@pytest.fixture(scope='module')
+def trained():
+    """Personalizer trained on synthetic users, plus the taste of every title"""
+    events, tastes = synthetic_interactions(n_users=300, n_titles=400, n_tastes=4, per_user=30, seed=1)
+    personalizer = Personalizer(InteractionLog(':memory:'))
+    personalizer.log.record_many(events)
+    personalizer.train(factors=8, iterations=8)
+    return personalizer, tastes
+
+
+def candidates(tconsts):
+    return [{'tconst': f"tt{t:07d}", 'score': 5.0} for t in tconsts]
+
+
+def test_fold_in_prefers_the_users_taste(trained):
+    personalizer, tastes = trained
+    titles = sorted(tastes)
+    liked = [t for t in titles if tastes[t] == 0]
+    for tconst in liked[:8]:
+        personalizer.record('newcomer', tconst, 'clicked')
+
+    vector, excluded = personalizer.profile('newcomer')
+    assert vector is not None and not excluded
+    scores = personalizer.model.scores(vector, titles)
+    same = np.mean([s for t, s in zip(titles, scores) if tastes[t] == 0 and t not in liked[:8]])
+    other = np.mean([s for t, s in zip(titles, scores) if tastes[t] != 0])
+    assert same > other
+
+
+def test_fold_in_solves_the_weighted_least_squares():
+    model = ImplicitALS(factors=3, iterations=5, regularization=0.1, alpha=20.0)
+    model.fit(np.array([0, 0, 1, 1, 2, 2, 2]), np.array([1, 2, 2, 3, 1, 3, 4]),
+              np.array([1.0, 1.0, 1.0, -1.0, 1.0, 1.0, -1.0]))
+    history = {1: 1.0, 3: -1.0}
+    folded = model.fold_in(history)
+
+    # Dense (Y^T C Y + reg I) x = Y^T C p over every trained title; unseen ones have c = 1, p = 0
+    y = model.item_factors
+    confidence = np.ones(len(model))
+    preference = np.zeros(len(model))
+    for tconst, strength in history.items():
+        confidence[model.item_row[tconst]] = 1 + model.alpha * abs(strength)
+        preference[model.item_row[tconst]] = float(strength > 0)
+    a = y.T @ (confidence[:, None] * y) + model.regularization * np.eye(model.factors)
+    assert np.allclose(folded, np.linalg.solve(a, y.T @ (confidence * preference)))
+    assert model.fold_in({99: 1.0}) is None
+
+
+def test_dismissed_and_badly_rated_titles_are_excluded(trained):
+    personalizer, tastes = trained
+    titles = sorted(tastes)[:20]
+    personalizer.record('picky', titles[0], 'clicked')
+    first = personalizer.rerank('picky', candidates(titles), 20)
+    assert len(first) == 20
+
+    personalizer.record('picky', titles[1], 'dismissed')
+    personalizer.record('picky', titles[2], 'rated', 2)
+    personalizer.record('picky', titles[3], 'rated', 9)
+    shown = {int(c['tconst'][2:]) for c in personalizer.rerank('picky', candidates(titles), 20)}
+    assert titles[1] not in shown and titles[2] not in shown
+    assert titles[0] in shown and titles[3] in shown
+
+
+def test_impressions_alone_never_exclude(trained):
+    personalizer, tastes = trained
+    title = sorted(tastes)[0]
+    personalizer.log.record_many([('bored', title, 'shown')] * 50)
+    _, excluded = personalizer.profile('bored')
+    assert title not in excluded
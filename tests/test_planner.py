@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from movie_recommendation_3 import ContentRecommender
+from planner import SEARCH_PAGE_SIZE, QueryPlanner
+
+
+@pytest.fixture(scope='module')
+def planner():
+    recommender = ContentRecommender(cache_path=None, quiet=True, base_url='http://127.0.0.1:9')
+    yield QueryPlanner(recommender)
+    recommender.close()
+
+
+def item(n, rating, genres, votes=1000):
+    return {'tconst': f"tt{n:07d}", 'rating': str(rating), 'votes': votes, 'genres': genres}
+
+
+def ranked(items):
+    return sorted(items, key=lambda i: (-float(i['rating']), -i['votes']))
+
+
+def test_plan_merges_aliases(planner):
+    plan = planner.plan(['gangster', 'crime', 'drama'], 'M')
+    assert [genre for _, genre, _ in plan.per_genre] == ['crime', 'drama']
+    assert plan.combined[1] == ['crime', 'drama']
+    assert plan.requested == 4 and len(plan.searches) == 3
+    assert planner.plan(['gangster', 'crime'], 'S').combined is None
+
+
+def test_short_pages_give_the_whole_intersection(planner):
+    plan = planner.plan(['action', 'drama'], 'M')
+    both = [item(n, 9.5 - n / 10, ['Action', 'Drama'], votes=n) for n in range(12)]
+    action = both + [item(100 + n, 9.9, ['Action']) for n in range(5)]
+    drama = both[::2] + [item(200, 9.8, ['Drama', 'Romance'])]
+    derived = planner.derive(plan, [ranked(action), ranked(drama)])
+    assert derived == ranked(both)[:10]
+    derived[0]['rating'] = 'changed'
+    assert both[0]['rating'] != 'changed'
+
+
+def test_full_pages_only_trust_titles_above_the_cutoff(planner):
+    plan = planner.plan(['action', 'drama'], 'M')
+    action = [item(n, 9.0 - n / 100, ['Action', 'Drama'] if n < 5 else ['Action']) for n in range(SEARCH_PAGE_SIZE)]
+    drama = [item(500 + n, 8.0, ['Drama']) for n in range(10)]
+    # Only 5 intersection titles beat the full action page's lowest rating: not enough to be sure
+    assert planner.derive(plan, [action, drama]) is None
+    assert planner.derive(plan, [action, drama], items=5) == action[:5]
+
+
+def test_pages_without_genres_cannot_be_derived(planner):
+    plan = planner.plan(['action', 'drama'], 'M')
+    page = [item(1, 8.0, ['Action', 'Drama']), dict(item(2, 7.0, None))]
+    assert planner.derive(plan, [page, page[:1]]) is None
+
+
+def test_derived_lists_match_the_real_intersection(planner):
+    plan = planner.plan(['action', 'drama'], 'M')
+    rng = random.Random(4)
+    derived_any = 0
+    for trial in range(200):
+        titles = []
+        for n in range(rng.choice([30, 80, 200])):
+            genres = rng.choice([['Action'], ['Drama'], ['Action', 'Drama'], ['Action', 'Drama', 'Crime']])
+            titles.append(item(trial * 1000 + n, round(rng.uniform(5, 9.9), 1), genres, votes=rng.randint(1, 10 ** 6)))
+        # Each per-genre search only shows its first page
+        pages = [ranked([t for t in titles if genre in t['genres']])[:SEARCH_PAGE_SIZE] for genre in ('Action', 'Drama')]
+        derived = planner.derive(plan, pages)
+        if derived is not None:
+            derived_any += 1
+            truth = ranked([t for t in titles if {'Action', 'Drama'} <= set(t['genres'])])[:10]
+            assert [t['rating'] for t in derived] == [t['rating'] for t in truth]
+    assert derived_any
@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+from records import OPEN_ENDED, RecordStore, TitleRecord, parse_years
+
+
+def results():
+    return [
+        {'tconst': 'tt0468569', 'title': 'The Dark Knight', 'year': '2008', 'rating': '9.0', 'votes': '2.9M',
+         'synopsis': 'Batman faces the Joker.', 'image_url': 'https://m.media-amazon.com/a.jpg',
+         'genres': ['Action', 'Crime', 'Drama']},
+        {'tconst': 'tt0903747', 'title': 'Breaking Bad', 'year': '2008–2013', 'rating': '9.5', 'votes': 2100000,
+         'synopsis': None, 'image_url': None, 'genres': ['Crime', 'Drama', 'Thriller']},
+        {'tconst': '/title/tt9999999/', 'title': 'Ünïcödé – 東京', 'year': '2019–', 'rating': 'N/A',
+         'votes': None, 'synopsis': 'x' * 200, 'image_url': 'https://m.media-amazon.com/a.jpg'},
+    ]
+
+
+def same(a, b):
+    for name in TitleRecord.__slots__:
+        x, y = getattr(a, name), getattr(b, name)
+        if isinstance(x, float) and math.isnan(x):
+            assert math.isnan(y), name
+        else:
+            assert x == y, name
+
+
+def test_encode_decode_round_trip():
+    store = RecordStore()
+    for result in results():
+        store.add(result)
+    decoded = RecordStore.decode(store.encode())
+    assert len(decoded) == len(store)
+    for original, copy in zip(store, decoded):
+        same(original, copy)
+    assert decoded.get('tt0903747').to_result() == store.get('tt0903747').to_result()
+    assert decoded.get(9999999).end_year == OPEN_ENDED
+
+
+def test_round_trip_after_updates_compacts_replaced_strings():
+    store = RecordStore()
+    for result in results():
+        store.add(result)
+    size = len(store.encode())
+    store.add({'tconst': 'tt0468569', 'synopsis': 'A longer, rewritten synopsis. ' * 10, 'rating': '9.1'})
+    store.add({'tconst': 'tt0468569', 'synopsis': 'Short again.'})
+    decoded = RecordStore.decode(store.encode())
+    record = decoded.get('tt0468569')
+    assert record.synopsis == 'Short again.' and record.title == 'The Dark Knight'
+    assert record.rating == pytest.approx(9.1)
+    # Only the live strings are written
+    assert len(store.encode()) < size + 20
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'records.bin')
+    store = RecordStore(path)
+    assert not RecordStore.load(path)
+    for result in results():
+        store.add(result)
+    store.save_if_changed()
+    loaded = RecordStore.load(path)
+    for original, copy in zip(store, loaded):
+        same(original, copy)
+
+
+def test_decode_rejects_other_data():
+    with pytest.raises(ValueError):
+        RecordStore.decode(b'NOPE' + bytes(32))
+
+
+@pytest.mark.parametrize('value, years', [('2008', (2008, 0)), ('2008–2013', (2008, 2013)),
+                                           ('2019–', (2019, OPEN_ENDED)), ('N/A', (0, 0))])
+def test_parse_years(value, years):
+    assert parse_years(value) == years
@@ -0,0 +1,92 @@
+import pytest
+
+import title_cache
+from title_cache import MISSING_SYNOPSIS, TitleCache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(title_cache.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache():
+    cache = TitleCache(':memory:', ttls={'title': 3600, 'detail': 600})
+    yield cache
+    cache.close()
+
+
+def record(n, synopsis=None):
+    return {'tconst': f"tt{n:07d}", 'title': f"Title {n}", 'year': '2001', 'rating': '7.5',
+            'synopsis': synopsis, 'link': f"/title/tt{n:07d}/", 'image_url': None}
+
+
+def test_synopsis_expires_before_the_title(cache, clock):
+    cache.put_title(record(1, "A heist goes wrong."))
+    assert cache.get_title('tt0000001')['synopsis'] == "A heist goes wrong."
+
+    clock.now += 601
+    stale = cache.get_title('tt0000001')
+    assert stale['title'] == "Title 1" and stale['synopsis'] is None
+
+    clock.now += 3000
+    assert cache.get_title('tt0000001') is None
+
+
+def test_refreshing_a_title_keeps_the_synopsis_age(cache, clock):
+    cache.put_title(record(1, "A heist goes wrong."))
+    clock.now += 500
+    # A search page refresh has no synopsis: the title is fresh again, the synopsis is not
+    cache.put_title(record(1))
+    clock.now += 200
+    assert cache.get_title('tt0000001')['synopsis'] is None
+
+    cache.put_title(record(1, "A better heist."))
+    assert cache.get_title('tt0000001')['synopsis'] == "A better heist."
+
+
+def test_missing_synopsis_is_never_cached(cache, clock):
+    cache.put_title(record(1, "Known plot."))
+    cache.put_title(record(1, MISSING_SYNOPSIS))
+    assert cache.get_title('tt0000001')['synopsis'] == "Known plot."
+    cache.put_title(record(2, MISSING_SYNOPSIS))
+    assert cache.get_title('tt0000002')['synopsis'] is None
+
+
+def test_least_recently_used_titles_are_evicted(cache, clock, monkeypatch):
+    monkeypatch.setattr(title_cache, 'EVICT_EVERY', 1)
+    cache.max_titles = 3
+    for n in range(1, 4):
+        clock.now += 1
+        cache.put_title(record(n))
+    clock.now += 1
+    # Read access times are buffered; eviction must still see this one
+    assert cache.get_title('tt0000001') is not None
+
+    clock.now += 1
+    cache.put_title(record(4))
+    assert cache.get_title('tt0000002') is None
+    assert all(cache.get_title(f"tt{n:07d}") is not None for n in (1, 3, 4))
+
+
+def test_eviction_waits_for_every_evict_every_inserts(cache, clock, monkeypatch):
+    monkeypatch.setattr(title_cache, 'EVICT_EVERY', 4)
+    cache.max_titles = 2
+    for n in range(1, 4):
+        clock.now += 1
+        cache.put_title(record(n))
+    # Counted without reading, so the access times stay in insertion order
+    assert cache._conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0] == 3
+    clock.now += 1
+    cache.put_title(record(4))
+    assert [n for n in range(1, 5) if cache.get_title(f"tt{n:07d}") is not None] == [3, 4]
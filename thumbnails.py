@@ -0,0 +1,137 @@
+import base64
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from metrics import NullMetrics
+
+# IMDb posters are served by Amazon's image CDN, which renders any size on request through the
+# modifier block between "._V1_" and the extension, e.g. "..._V1_QL75_UX140_CR0,1,140,207_.jpg"
+V1_MODIFIERS_RE = re.compile(r'\._V1_[^/]*?(\.[A-Za-z]+)$')
+EXTENSION_RE = re.compile(r'(\.[A-Za-z]+)$')
+
+
+def sized_image_url(url, size):
+    """Rewrite an IMDb poster URL so the CDN returns a rendition close to `size` instead of the original"""
+    parts = urlsplit(url)
+    if '/images/M/' not in parts.path:
+        return url
+    modifiers = f"._V1_QL75_UX{size[0]}_"
+    if V1_MODIFIERS_RE.search(parts.path):
+        path = V1_MODIFIERS_RE.sub(lambda m: modifiers + m.group(1), parts.path)
+    else:
+        path = EXTENSION_RE.sub(lambda m: modifiers + m.group(1), parts.path)
+    return parts._replace(path=path).geturl()
+
+
+class ThumbnailPipeline:
+    """Concurrent poster thumbnailing with a bounded in-memory LRU backed by a disk cache.
+
+    `fetch(url)` must return the raw image bytes. Thumbnails are base64 JPEG strings, keyed by
+    URL and size.
+    """
+
+    def __init__(self, fetch, size=(100, 150), cache_dir=None, max_items=256, workers=8, metrics=None):
+        self.fetch = fetch
+        self.metrics = metrics or NullMetrics()
+        self.size = tuple(size)
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnails')
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, url, size):
+        return hashlib.sha1(f"{url}|{size[0]}x{size[1]}".encode('utf-8')).hexdigest()
+
+    def prefetch(self, urls, size=None):
+        """Start building thumbnails for all URLs in the background"""
+        for url in urls:
+            if url:
+                self._submit(url, tuple(size or self.size))
+
+    def _submit(self, url, size):
+        key = self._key(url, size)
+        with self._lock:
+            if key in self._memory:
+                return None
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._executor.submit(self._build, url, size, key)
+            return future
+
+    def get(self, url, size=None):
+        """Base64 JPEG thumbnail for an image URL (None if it could not be made); waits for a prefetch"""
+        size = tuple(size or self.size)
+        key = self._key(url, size)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        future = self._submit(url, size)
+        return future.result() if future else self._memory.get(key)
+
+    def _build(self, url, size, key):
+        try:
+            thumbnail = self._read_disk(key)
+            if thumbnail is None:
+                data = self.fetch(sized_image_url(url, size))
+                with self.metrics.span('thumbnail_render'):
+                    thumbnail = self._render(data, size)
+                self._write_disk(key, thumbnail)
+            self._remember(key, thumbnail)
+            return thumbnail
+        except Exception as e:
+            self.metrics.error('thumbnail', e)
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _render(self, data, size):
+        # Pillow is imported on first use: most invocations never render a poster
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(data))
+        # Let the JPEG decoder downscale by a power of two while decoding instead of after
+        img.draft('RGB', size)
+        img.thumbnail(size)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        # Convert to base64 for terminal display
+        buffered = io.BytesIO()
+        img.save(buffered, format="JPEG")
+        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+
+    def _remember(self, key, thumbnail):
+        with self._lock:
+            self._memory[key] = thumbnail
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.b64")) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, thumbnail):
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, f"{key}.b64")
+        with open(f"{path}.tmp", 'w') as f:
+            f.write(thumbnail)
+        os.replace(f"{path}.tmp", path)
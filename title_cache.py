@@ -0,0 +1,268 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'imdb-recommender', 'cache.sqlite3')
+
+# Seconds before an entry is considered stale, per record type
+DEFAULT_TTLS = {
+    'search': 6 * 3600,
+    'detail': 7 * 24 * 3600,
+    'image': 30 * 24 * 3600,
+    'title': 7 * 24 * 3600,
+}
+
+TITLE_FIELDS = ['title', 'year', 'rating', 'synopsis', 'link', 'image_url']
+
+# Shown when a detail page has no synopsis; never cached, so the next query tries again
+MISSING_SYNOPSIS = "Synopsis not available"
+# Size bounds are enforced every this many title inserts rather than on each one
+EVICT_EVERY = 256
+# Access times of reads are written with the next write, or once this many have piled up
+MAX_PENDING_ACCESSES = 512
+
+
+class CachedResponse:
+    """A raw HTTP response body stored with its validators"""
+
+    def __init__(self, url, kind, body, etag, last_modified, fetched_at):
+        self.url = url
+        self.kind = kind
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def conditional_headers(self):
+        """Headers for a conditional GET that revalidates this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class TitleCache:
+    """SQLite cache of parsed title records (keyed by tconst) and raw HTTP responses (keyed by URL)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, max_titles=100000, max_responses=5000,
+                 max_response_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_titles = max_titles
+        self.max_responses = max_responses
+        self.max_response_bytes = max_response_bytes
+        self.hits = {kind: 0 for kind in self.ttls}
+        self.misses = {kind: 0 for kind in self.ttls}
+        self._lock = threading.Lock()
+        self._title_puts = 0
+        # LRU access times noted by reads, {key: time} per table
+        self._accessed = {'titles': {}, 'responses': {}}
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS titles (
+                tconst TEXT PRIMARY KEY,
+                title TEXT, year TEXT, rating TEXT, synopsis TEXT, link TEXT, image_url TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                synopsis_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS titles_accessed ON titles(accessed_at);
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at);
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(titles)")}
+        if 'synopsis_at' not in columns:
+            # Caches created before synopses had their own timestamp
+            self._conn.execute("ALTER TABLE titles ADD COLUMN synopsis_at REAL")
+            self._conn.execute("UPDATE titles SET synopsis_at = fetched_at WHERE synopsis IS NOT NULL")
+        self._conn.commit()
+
+    def _count(self, kind, hit):
+        counters = self.hits if hit else self.misses
+        counters[kind] = counters.get(kind, 0) + 1
+
+    def is_fresh(self, fetched_at, kind):
+        """Whether an entry fetched at `fetched_at` is still within the TTL for its record type"""
+        return time.time() - fetched_at < self.ttls.get(kind, 0)
+
+    # --- Parsed title records ---
+
+    def get_title(self, tconst):
+        """Return the cached title record for a tconst, or None if missing or expired.
+        The synopsis expires on its own (detail TTL): a stale one comes back as None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(TITLE_FIELDS)}, fetched_at, synopsis_at FROM titles WHERE tconst = ?", (tconst,)
+            ).fetchone()
+            if row is None or not self.is_fresh(row[-2], 'title'):
+                self._count('title', False)
+                return None
+            self._note_access('titles', tconst)
+            self._count('title', True)
+
+        record = dict(zip(TITLE_FIELDS, row[:-2]))
+        record['tconst'] = tconst
+        if record['synopsis'] == MISSING_SYNOPSIS or row[-1] is None or not self.is_fresh(row[-1], 'detail'):
+            record['synopsis'] = None
+        return record
+
+    def put_title(self, record):
+        """Insert or update a title record; fields that are None keep their cached value"""
+        now = time.time()
+        values = [record.get(field) for field in TITLE_FIELDS]
+        synopsis = values[TITLE_FIELDS.index('synopsis')]
+        if synopsis == MISSING_SYNOPSIS:
+            values[TITLE_FIELDS.index('synopsis')] = synopsis = None
+        updates = ', '.join(f"{field} = COALESCE(excluded.{field}, titles.{field})" for field in TITLE_FIELDS)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO titles (tconst, {', '.join(TITLE_FIELDS)}, fetched_at, accessed_at, synopsis_at) "
+                f"VALUES (?, {', '.join('?' for _ in TITLE_FIELDS)}, ?, ?, ?) "
+                f"ON CONFLICT(tconst) DO UPDATE SET {updates}, fetched_at = excluded.fetched_at, "
+                f"synopsis_at = COALESCE(excluded.synopsis_at, titles.synopsis_at)",
+                [record['tconst'], *values, now, now, None if synopsis is None else now]
+            )
+            self._title_puts += 1
+            if self._title_puts % EVICT_EVERY == 0:
+                self._evict_titles()
+            self._flush_accesses()
+            self._conn.commit()
+
+    def _note_access(self, table, key):
+        """Remember a read for LRU eviction without a write transaction of its own"""
+        pending = self._accessed[table]
+        pending[key] = time.time()
+        if len(pending) >= MAX_PENDING_ACCESSES:
+            self._flush_accesses()
+            self._conn.commit()
+
+    def _flush_accesses(self):
+        """Write the noted access times as part of the current transaction (caller commits)"""
+        for table, key in (('titles', 'tconst'), ('responses', 'url')):
+            pending = self._accessed[table]
+            if pending:
+                self._conn.executemany(f"UPDATE {table} SET accessed_at = ? WHERE {key} = ?",
+                                       [(at, k) for k, at in pending.items()])
+                pending.clear()
+
+    def _evict_titles(self):
+        self._flush_accesses()
+        count = self._conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+        if count > self.max_titles:
+            self._conn.execute(
+                "DELETE FROM titles WHERE tconst IN "
+                "(SELECT tconst FROM titles ORDER BY accessed_at LIMIT ?)", (count - self.max_titles,)
+            )
+
+    # --- Raw HTTP responses ---
+
+    def lookup_response(self, url, kind, count=True):
+        """Return (entry, fresh) for a URL; entry is None when nothing is cached.
+        count=False keeps housekeeping lookups out of the hit/miss stats."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                if count:
+                    self._count(kind, False)
+                return None, False
+            fresh = self.is_fresh(row[3], kind)
+            if count:
+                self._count(kind, fresh)
+            self._note_access('responses', url)
+
+        return CachedResponse(url, kind, bytes(row[0]), row[1], row[2], row[3]), fresh
+
+    def response_age(self, url):
+        """Seconds since a cached response was fetched or revalidated (None if not cached); not counted"""
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM responses WHERE url = ?", (url,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def has_fresh_response(self, url, kind, grace=0):
+        """True if a response for the URL is cached and at most `grace` seconds past its TTL"""
+        age = self.response_age(url)
+        return age is not None and age < self.ttls.get(kind, 0) + grace
+
+    def put_response(self, url, kind, body, etag=None, last_modified=None):
+        """Store a response body together with its ETag/Last-Modified validators"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, kind, body, size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, kind, sqlite3.Binary(body), len(body), etag, last_modified, now, now)
+            )
+            self._flush_accesses()
+            self._evict_responses()
+            self._conn.commit()
+
+    def touch_response(self, url):
+        """Mark a cached response as fresh again after a 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+            self._flush_accesses()
+            self._conn.commit()
+
+    def _evict_responses(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_responses and total <= self.max_response_bytes:
+            return
+
+        # Drop least recently used entries until both bounds hold again
+        excess_count = max(0, count - self.max_responses)
+        excess_bytes = total - self.max_response_bytes
+        doomed = []
+        for url, size in self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+            if excess_count <= 0 and excess_bytes <= 0:
+                break
+            doomed.append((url,))
+            excess_count -= 1
+            excess_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+
+    # --- Housekeeping ---
+
+    def stats(self):
+        """Hit/miss counters and hit ratio per record type"""
+        stats = {}
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits.get(kind, 0), self.misses.get(kind, 0)
+            total = hits + misses
+            stats[kind] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
+        return stats
+
+    def clear(self):
+        """Remove every cached title and response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM titles")
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_accesses()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,188 @@
+"""Keeping the response cache warm: stale-while-revalidate refreshes and a periodic pre-crawl.
+
+The search space is small and fixed (each genre x M/S/B), so CacheWarmer crawls every single-genre
+search page, plus optionally the detail pages of its top titles, under a request budget and rate.
+Interactive queries then find their per-genre pages cached, the planner derives the combined
+search from them, and nothing but missing detail pages goes upstream.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fetcher import TokenBucket
+
+CONTENT_TYPES = ('M', 'S', 'B')
+
+
+class BackgroundRefresher:
+    """Re-downloads stale responses off the request path, at most once per URL at a time"""
+
+    def __init__(self, recommender, workers=2):
+        self.recommender = recommender
+        self.workers = workers
+        self.refreshed = 0
+        self.failed = 0
+        self._executor = None
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def refresh(self, url, kind, timeout, cached):
+        with self._lock:
+            if url in self._inflight:
+                return
+            self._inflight.add(url)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='refresh')
+        self._executor.submit(self._refresh, url, kind, timeout, cached)
+
+    def _refresh(self, url, kind, timeout, cached):
+        ok = False
+        try:
+            self.recommender._download(url, kind, timeout, cached)
+            ok = True
+        except Exception as e:
+            self.recommender.metrics.error('refresh', e)
+        finally:
+            with self._lock:
+                self._inflight.discard(url)
+                if ok:
+                    self.refreshed += 1
+                else:
+                    self.failed += 1
+
+
+class CacheWarmer:
+    """Periodically pre-crawls every single-genre search (and top detail pages) into the response cache.
+
+    Each cycle refreshes the missing and stale pages, oldest first, spending at most `budget`
+    upstream requests at no more than `rate` requests per second. Search pages come before
+    detail pages so a tight budget still covers every list.
+    """
+
+    def __init__(self, recommender, content_types=CONTENT_TYPES, budget=300, rate=2.0, interval=6 * 3600,
+                 details=10):
+        if recommender.cache is None:
+            raise ValueError("The cache warmer needs the response cache (cache_path must not be None)")
+        self.recommender = recommender
+        self.content_types = content_types
+        self.budget = budget
+        self.rate = rate
+        self.interval = interval
+        self.details = details
+        self.last_cycle = None
+        self._bucket = TokenBucket(rate, burst=1) if rate else None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def targets(self):
+        """[(url, imdb genre, content type)] of every distinct single-genre search"""
+        rec = self.recommender
+        targets, seen = [], set()
+        for content_type in self.content_types:
+            for genre in rec.valid_genres:
+                for url, imdb_genre, _ in rec.planner.plan([genre], content_type).per_genre:
+                    if url not in seen:
+                        seen.add(url)
+                        targets.append((url, imdb_genre, content_type))
+        return targets
+
+    def _wait_turn(self):
+        if self._bucket:
+            wait = self._bucket.reserve()
+            if wait:
+                time.sleep(wait)
+
+    def run_once(self):
+        """One warming cycle; returns (and remembers) what it did"""
+        rec, cache = self.recommender, self.recommender.cache
+        search_ttl = cache.ttls['search']
+        started = time.time()
+        spent = refreshed = failed = 0
+
+        # Missing pages first, then the stalest
+        pending = []
+        for url, _, _ in self.targets():
+            age = cache.response_age(url)
+            if age is None or age >= search_ttl:
+                pending.append((age is not None, -(age or 0), url))
+        pending.sort()
+
+        detail_links = []
+        for _, _, url in pending:
+            if self._stop.is_set() or spent >= self.budget:
+                break
+            self._wait_turn()
+            spent += 1
+            try:
+                cached, _ = cache.lookup_response(url, 'search', count=False)
+                body = rec._download(url, 'search', 10, cached)
+                refreshed += 1
+                if self.details:
+                    detail_links.extend(item['link'] for item in rec._parse_search_page(body, self.details))
+            except Exception as e:
+                failed += 1
+                rec.metrics.error('warm', e)
+
+        for link in dict.fromkeys(detail_links):
+            if self._stop.is_set() or spent >= self.budget:
+                break
+            if rec._cached_synopsis(link):
+                continue
+            self._wait_turn()
+            spent += 1
+            rec._get_synopsis(link)
+
+        self.last_cycle = {
+            'started': round(started, 1),
+            'seconds': round(time.time() - started, 1),
+            'requests': spent,
+            'search_pages_refreshed': refreshed,
+            'search_pages_failed': failed,
+            'search_pages_left': max(0, len(pending) - refreshed - failed),
+        }
+        return self.last_cycle
+
+    def report(self):
+        """Coverage and freshness of the warmed searches, overall and per content type"""
+        cache = self.recommender.cache
+        search_ttl = cache.ttls['search']
+        grace = self.recommender.stale_while_revalidate
+        groups = {}
+        for url, _, content_type in self.targets():
+            age = cache.response_age(url)
+            group = groups.setdefault(content_type, {'targets': 0, 'cached': 0, 'fresh': 0, 'servable': 0,
+                                                     'oldest_seconds': 0})
+            group['targets'] += 1
+            if age is None:
+                continue
+            group['cached'] += 1
+            group['fresh'] += age < search_ttl
+            group['servable'] += age < search_ttl + grace
+            group['oldest_seconds'] = max(group['oldest_seconds'], round(age))
+
+        total = {key: sum(g[key] for g in groups.values()) for key in ('targets', 'cached', 'fresh', 'servable')}
+        total['oldest_seconds'] = max((g['oldest_seconds'] for g in groups.values()), default=0)
+        for group in list(groups.values()) + [total]:
+            group['coverage'] = round(group['cached'] / group['targets'], 3) if group['targets'] else 0.0
+            group['fresh_ratio'] = round(group['fresh'] / group['targets'], 3) if group['targets'] else 0.0
+        return {'total': total, 'by_content_type': groups, 'last_cycle': self.last_cycle,
+                'refreshes': {'done': self.recommender.refresher.refreshed,
+                              'failed': self.recommender.refresher.failed}}
+
+    def start(self):
+        """Run warming cycles every `interval` seconds on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='cache-warmer', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.recommender.metrics.error('warm', e)
+            self._stop.wait(self.interval)